@@ -0,0 +1,130 @@
+"""
+Gov Terms AI - Admission control
+An adaptive concurrency limit with a bounded FIFO queue in front of the RAG
+pipeline (retrieval + generation). The limit follows AIMD on observed
+latency: it grows by one every `limit` fast successes and shrinks by
+`backoff` when a pipeline fails or runs past the latency target. Requests
+beyond the queue, or that wait longer than the queue deadline, are shed
+with a Retry-After estimate instead of piling up until they time out.
+Exact matches and cached answers never pass through here.
+"""
+
+import asyncio
+import collections
+import logging
+import math
+import time
+from typing import Any, Deque, Dict
+
+from upstream import stage_timeout
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """A request was shed; retry_after is the suggested wait in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """AIMD concurrency limit with a bounded, deadline-aware FIFO queue. Use from the event loop only."""
+
+    def __init__(self, initial_limit: int = 16, min_limit: int = 2, max_limit: int = 64,
+                 max_queue: int = 64, queue_timeout: float = 2.0, latency_target: float = 5.0,
+                 backoff: float = 0.9):
+        self.limit = float(max(min(initial_limit, max_limit), min_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._last_decrease = 0.0
+        self._avg_latency = latency_target / 2
+        self.admitted = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0}
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead of a new request should have drained."""
+        waves = (len(self._waiters) + 1) / max(int(self.limit), 1)
+        return min(max(math.ceil(waves * self._avg_latency), 1), 60)
+
+    def _shed(self, reason: str) -> Overloaded:
+        self.shed[reason] += 1
+        return Overloaded(reason, self.retry_after())
+
+    async def acquire(self) -> float:
+        """
+        Take a slot, queueing up to queue_timeout (capped by the request
+        deadline); raises Overloaded. Returns the admission time to pass to release.
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return time.monotonic()
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, stage_timeout(self.queue_timeout))
+        except asyncio.TimeoutError:
+            raise self._shed("queue_timeout")
+        except asyncio.CancelledError:
+            # The client went away just as a slot was handed over: give it back
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self.admitted += 1
+        return time.monotonic()
+
+    def release(self, started: float, ok: bool):
+        """Return a slot and adapt the limit to how the request admitted at `started` went."""
+        self.in_flight -= 1
+        latency = time.monotonic() - started
+        self._avg_latency += 0.1 * (latency - self._avg_latency)
+        if not ok or latency > self.latency_target:
+            # Shrink once per overload episode: only requests admitted after the last decrease count
+            if started > self._last_decrease:
+                self.limit = max(self.limit * self.backoff, float(self.min_limit))
+                self._last_decrease = time.monotonic()
+                logger.warning(f"Admission limit lowered to {int(self.limit)} (latency {latency:.2f}s, ok={ok})")
+        else:
+            self.limit = min(self.limit + 1 / self.limit, float(self.max_limit))
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Limit, load and shed counters for /health and /metrics."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "avg_latency_s": round(self._avg_latency, 3),
+        }
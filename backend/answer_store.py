@@ -0,0 +1,199 @@
+"""
+Gov Terms AI - Precomputed answer store
+Answers generated offline for every glossary term by
+scripts/precompute_answers.py, so queries for a known term are a lookup
+instead of a Pinecone search and a Gemini call.
+
+Same file conventions as the glossary snapshot: 8-byte magic, little-endian
+u64 header length, JSON header, then 8-byte aligned flat arrays. The sorted
+keys (`plain:<term>` / `elaborate:<term>`) map through a uint32 array to
+answers stored once each as compact JSON, since a term without an exact
+match gets the same answer with or without `elaborate`. The header records
+what the answers were generated against: the backend ignores a store built
+for another glossary (by content hash), index or prompt mode, and stops
+serving it once the index generation moves on (a re-index or a cache
+invalidation).
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from glossary_snapshot import StringTable, source_digest
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GTANSW\x00\x01"
+FORMAT_VERSION = 2
+
+_HEADER_LEN = struct.Struct("<Q")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def answer_key(normalized_query: str, elaborate: bool) -> str:
+    """Store key of a normalized query (see glossary_index.normalize_term)."""
+    return f"{'elaborate' if elaborate else 'plain'}:{normalized_query}"
+
+
+def _strings(values: List[str]) -> Tuple[array, array]:
+    offsets = array("I", [0])
+    blob = bytearray()
+    for value in values:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, array("B", bytes(blob))
+
+
+def write_answer_store(path: str, entries: Iterable[Tuple[List[str], Dict[str, Any]]],
+                       metadata: Dict[str, Any]) -> int:
+    """
+    Write (keys, payload) entries to path atomically and return the number of
+    answers. metadata (glossary hash, index, namespace, prompt mode, index
+    generation) goes into the header.
+    """
+    answers: List[str] = []
+    targets: Dict[str, int] = {}
+    for keys, payload in entries:
+        answers.append(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+        for key in keys:
+            targets[key] = len(answers) - 1
+    keys = sorted(targets)
+    key_offsets, key_data = _strings(keys)
+    answer_offsets, answer_data = _strings(answers)
+    sections = {
+        "keys.offsets": key_offsets,
+        "keys.data": key_data,
+        "keys.answer": array("I", (targets[key] for key in keys)),
+        "answers.offsets": answer_offsets,
+        "answers.data": answer_data,
+    }
+
+    layout, offset = {}, 0
+    for name, values in sections.items():
+        nbytes = len(values) * values.itemsize
+        layout[name] = [offset, nbytes, values.typecode]
+        offset = _align(offset + nbytes)
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "keys": len(keys),
+        "answers": len(answers),
+        **metadata,
+        "sections": layout,
+    }).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        data_start = f.tell()
+        for name, values in sections.items():
+            f.write(b"\0" * (data_start + layout[name][0] - f.tell()))
+            values.tofile(f)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote answer store with {len(answers)} answers under {len(keys)} keys to {path}")
+    return len(answers)
+
+
+class AnswerStore:
+    """Memory-mapped precomputed answers, looked up by binary search over the sorted keys."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not an answer store")
+        (header_len,) = _HEADER_LEN.unpack_from(buffer, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LEN.size
+        self.header = json.loads(bytes(buffer[header_start:header_start + header_len]))
+        if self.header.get("version") != FORMAT_VERSION or self.header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path}: unsupported answer store version or byte order")
+        data_start = _align(header_start + header_len)
+        sections = {
+            name: buffer[data_start + offset:data_start + offset + nbytes].cast(typecode)
+            for name, (offset, nbytes, typecode) in self.header["sections"].items()
+        }
+        self.keys = StringTable(sections["keys.offsets"], sections["keys.data"])
+        self.targets = sections["keys.answer"]
+        self.answers = StringTable(sections["answers.offsets"], sections["answers.data"])
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def get(self, normalized_query: str, elaborate: bool) -> Optional[Dict[str, Any]]:
+        """The stored response payload for a normalized query, or None."""
+        i = self.keys.find(answer_key(normalized_query, elaborate))
+        if i < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(self.answers[self.targets[i]])
+
+    @property
+    def index_generation(self) -> int:
+        """Index generation the answers were generated against."""
+        return self.header.get("index_generation") or 0
+
+    def mismatch(self, expected: Dict[str, Any]) -> Optional[str]:
+        """Why the store doesn't fit the running configuration, or None when it does."""
+        for name, value in expected.items():
+            if value is not None and self.header.get(name) is not None and self.header[name] != value:
+                return f"{name} is {self.header[name]!r}, expected {value!r}"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, provenance and lookup counters for /health."""
+        return {
+            "answers": len(self),
+            "keys": len(self.keys),
+            "created_at": self.header.get("created_at"),
+            "index_generation": self.index_generation,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def store_metadata(glossary_path: str, index_name: str, namespace: str, prompt_mode: str) -> Dict[str, Any]:
+    """
+    What a store's answers depend on, recorded by the writer and checked by
+    the backend at load. The index generation changes at runtime, so it is
+    recorded separately and checked per lookup.
+    """
+    return {
+        "glossary_sha256": source_digest(glossary_path),
+        "index_name": index_name,
+        "namespace": namespace,
+        "prompt_mode": prompt_mode,
+    }
+
+
+def load_answer_store(path: str, glossary_path: str, index_name: str, namespace: str,
+                      prompt_mode: str) -> Optional[AnswerStore]:
+    """
+    Open the store at path, or None if it is missing, unreadable or built for
+    another configuration. The glossary is only hashed once a store has opened.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        store = AnswerStore(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Answer store {path} unusable: {e}; generating every answer live")
+        return None
+    reason = store.mismatch(store_metadata(glossary_path, index_name, namespace, prompt_mode))
+    if reason:
+        logger.warning(f"Answer store {path} is out of date ({reason}); generating every answer live")
+        return None
+    logger.info(f"Memory-mapped answer store with {len(store)} answers from {path}")
+    return store
@@ -5,22 +5,52 @@ Core RAG pipeline with 4 functions only.
 """
 
 import os
+import asyncio
+import contextvars
+import functools
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional
 import json
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pinecone import Pinecone
-import google.generativeai as genai
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
+from admission import AdmissionController, Overloaded
+from answer_store import load_answer_store
+from cache import (
+    IndexGeneration, ResponseCache, RetrievalCache, SingleFlight, create_redis_client, index_generation_key
+)
+from glossary_index import GlossaryIndex, load_glossary, normalize_term
+from glossary_snapshot import load_snapshot
+from health import DependencyMonitor
+from lexical_index import HybridRetriever, LexicalIndex
+from metrics import Metrics, MetricsMiddleware, label_request, stage_timings, timed_stage
+from prompts import PromptTemplate, extract_json
+from providers import LazyRetriever, ProviderUnavailable, Providers
+from retrievers import PineconeRetriever, glossary_record_fields, load_local_retriever
+from streaming import PartialAnswerParser, answer_deltas, sse_event
+from structured_logging import PayloadSamplingMiddleware, configure_logging, log_payload
+from suggest import MAX_SUGGESTIONS, build_term_trie
+from upstream import (
+    AttemptTimeout, DeadlineExceeded, Hedger, RetryBudget, RetryPolicy, stage_timeout, start_deadline
+)
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: JSON lines written by a background thread; full payloads only for sampled requests
+configure_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    fmt=os.getenv("LOG_FORMAT", "json"),
+    payload_sample_rate=float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0")),
+    max_field_chars=int(os.getenv("LOG_FIELD_MAX_CHARS", "500")),
+)
 logger = logging.getLogger(__name__)
 
 # Environment variables
@@ -28,19 +58,289 @@ PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
 PINECONE_INDEX_NAME = "all-e5-large"
 PINECONE_NAMESPACE = "gov-terms2"
+# Override the index host / Gemini API endpoint, e.g. to point at the benchmark stub servers
+PINECONE_HOST = os.getenv("PINECONE_HOST")
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+RETRIEVAL_TOP_K = 3
+GLOSSARY_PATH = os.getenv(
+    "GLOSSARY_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "combined_glossary.json"),
+)
+GLOSSARY_SNAPSHOT_PATH = os.getenv(
+    "GLOSSARY_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "combined_glossary.snap"),
+)
+# Set in the Docker image, which ships the glossary: refuse to start without it
+# rather than silently serving every query through Pinecone and Gemini
+GLOSSARY_REQUIRED = os.getenv("GLOSSARY_REQUIRED", "false").lower() in ("1", "true", "yes")
+ANSWER_STORE_PATH = os.getenv(
+    "ANSWER_STORE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "answer_store.bin"),
+)
+REDIS_URL = os.getenv("REDIS_URL")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+MAX_BATCH_QUERIES = int(os.getenv("MAX_BATCH_QUERIES", "200"))
+BATCH_PACK_SIZE = int(os.getenv("BATCH_PACK_SIZE", "5"))
+MAX_SUGGEST_PREFIX = int(os.getenv("MAX_SUGGEST_PREFIX", "100"))
+RETRIEVER = os.getenv("RETRIEVER", "pinecone")
+LOCAL_VECTOR_STORE = os.getenv(
+    "LOCAL_VECTOR_STORE",
+    os.path.join(os.path.dirname(__file__), "..", "data", "vector_store"),
+)
+LOCAL_EMBEDDER = os.getenv("LOCAL_EMBEDDER", "sentence-transformers")
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+
+WARM_PROVIDERS = os.getenv("WARM_PROVIDERS", "true").lower() in ("1", "true", "yes")
+READINESS_INTERVAL = float(os.getenv("READINESS_INTERVAL", "30"))
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "5"))
+READINESS_FAILURE_THRESHOLD = int(os.getenv("READINESS_FAILURE_THRESHOLD", "3"))
+
+# Upstream call policy: the request budget caps every stage's deadline
+REQUEST_BUDGET = float(os.getenv("REQUEST_BUDGET", "20"))
+RETRIEVAL_TIMEOUT = float(os.getenv("RETRIEVAL_TIMEOUT", "3"))
+RETRIEVAL_ATTEMPT_TIMEOUT = float(os.getenv("RETRIEVAL_ATTEMPT_TIMEOUT", "0")) or RETRIEVAL_TIMEOUT
+GENERATION_TIMEOUT = float(os.getenv("GENERATION_TIMEOUT", "15"))
+GENERATION_ATTEMPT_TIMEOUT = float(os.getenv("GENERATION_ATTEMPT_TIMEOUT", "0")) or GENERATION_TIMEOUT
+UPSTREAM_ATTEMPTS = int(os.getenv("UPSTREAM_ATTEMPTS", "3"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+HEDGE_RETRIEVAL_AFTER = float(os.getenv("HEDGE_RETRIEVAL_AFTER", "0"))
+
+# Prompt template: static instructions compiled once into the model's system instruction
+prompt_template = PromptTemplate(
+    mode=os.getenv("PROMPT_MODE", "compact"),
+    max_text_chars=int(os.getenv("PROMPT_TEXT_MAX_CHARS", "500")),
+)
+
+# Upstream services are created lazily (or warmed in the background at startup),
+# so a missing key or SDK only makes the endpoints that need it unavailable.
+def create_pinecone_client():
+    if not PINECONE_API_KEY:
+        raise ProviderUnavailable("PINECONE_API_KEY is not set")
+    from pinecone import Pinecone
+    return Pinecone(api_key=PINECONE_API_KEY)
+
+def create_vector_retriever():
+    if RETRIEVER == "local":
+        pc = providers.get("pinecone") if LOCAL_EMBEDDER == "pinecone" else None
+        return load_local_retriever(LOCAL_VECTOR_STORE, LOCAL_EMBEDDER, pc)
+    # Keep one pooled keep-alive connection per concurrent search instead of reconnecting past urllib3's default
+    index = providers.get("pinecone").Index(
+        PINECONE_INDEX_NAME, host=PINECONE_HOST, connection_pool_maxsize=PINECONE_POOL_SIZE
+    )
+    return PineconeRetriever(index, PINECONE_INDEX_NAME, PINECONE_NAMESPACE)
+
+def create_gemini_model():
+    if not GEMINI_API_KEY:
+        raise ProviderUnavailable("GOOGLE_API_KEY is not set")
+    import google.generativeai as genai
+    if GEMINI_API_ENDPOINT:
+        genai.configure(api_key=GEMINI_API_KEY, transport="rest", # type: ignore
+                        client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=GEMINI_API_KEY) # type: ignore
+    return genai.GenerativeModel( # type: ignore
+        'gemini-2.0-flash', system_instruction=prompt_template.system_instruction
+    )
+
+def gemini_request_options() -> Dict[str, Any]:
+    """Per-attempt Gemini timeout within the request deadline; retries are ours, not the SDK's."""
+    return {"timeout": max(min(GENERATION_ATTEMPT_TIMEOUT, stage_timeout(GENERATION_TIMEOUT)), 0.001), "retry": None}
+
+def retrieval_attempt_timeout() -> float:
+    """Per-attempt search timeout within the request deadline, so a slow attempt can be retried."""
+    return max(min(RETRIEVAL_ATTEMPT_TIMEOUT, stage_timeout(RETRIEVAL_TIMEOUT)), 0.001)
+
+providers = Providers()
+providers.register("pinecone", create_pinecone_client)
+providers.register("retriever", create_vector_retriever)
+providers.register("gemini_model", create_gemini_model)
+if RETRIEVER == "local":
+    retriever = LazyRetriever("local", os.path.basename(os.path.normpath(LOCAL_VECTOR_STORE)), providers["retriever"])
+else:
+    retriever = LazyRetriever(PINECONE_INDEX_NAME, PINECONE_NAMESPACE, providers["retriever"])
+
+# Gemini token usage, reported on /health to track cost per query
+gemini_usage = {"calls": 0, "prompt_tokens": 0, "output_tokens": 0}
+gemini_usage_lock = threading.Lock()
+
+def record_gemini_usage(response: Any):
+    """Accumulate token counts from a Gemini response's usage metadata."""
+    usage = getattr(response, "usage_metadata", None)
+    with gemini_usage_lock:
+        gemini_usage["calls"] += 1
+        if usage is not None:
+            gemini_usage["prompt_tokens"] += getattr(usage, "prompt_token_count", 0) or 0
+            gemini_usage["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+
+# Upstream concurrency: the Pinecone and Gemini SDK calls are blocking, so they
+# run on a shared thread pool with a semaphore bounding each stage.
+RETRIEVAL_CONCURRENCY = int(os.getenv("RETRIEVAL_CONCURRENCY", "16"))
+GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "8"))
+upstream_executor = ThreadPoolExecutor(
+    max_workers=RETRIEVAL_CONCURRENCY + GENERATION_CONCURRENCY,
+    thread_name_prefix="upstream",
+)
+retrieval_limiter = asyncio.Semaphore(RETRIEVAL_CONCURRENCY)
+generation_limiter = asyncio.Semaphore(GENERATION_CONCURRENCY)
+PINECONE_POOL_SIZE = int(os.getenv("PINECONE_POOL_SIZE", "0")) or RETRIEVAL_CONCURRENCY
+
+# Bounded retries with jitter, each upstream with its own retry budget, and optional hedged retrieval
+retrieval_retries = RetryPolicy("retrieval", UPSTREAM_ATTEMPTS, budget=RetryBudget(RETRY_BUDGET_RATIO))
+generation_retries = RetryPolicy("generation", UPSTREAM_ATTEMPTS, budget=RetryBudget(RETRY_BUDGET_RATIO))
+retrieval_hedger = Hedger(HEDGE_RETRIEVAL_AFTER)
+# Pinecone's search_records takes no timeout, so each attempt is bounded here; sized like its connection pool
+retrieval_attempts = AttemptTimeout("retrieval", retrieval_attempt_timeout, PINECONE_POOL_SIZE)
+
+# Admission control in front of the RAG pipeline: an adaptive (AIMD) limit on
+# concurrent retrieval + generation runs and a bounded queue; the rest is shed with a 503
+admission = AdmissionController(
+    initial_limit=int(os.getenv("ADMISSION_INITIAL_LIMIT", str(GENERATION_CONCURRENCY))),
+    min_limit=int(os.getenv("ADMISSION_MIN_LIMIT", "2")),
+    max_limit=int(os.getenv("ADMISSION_MAX_LIMIT", str(2 * GENERATION_CONCURRENCY))),
+    max_queue=int(os.getenv("ADMISSION_QUEUE_SIZE", "32")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2")),
+    latency_target=float(os.getenv("ADMISSION_LATENCY_TARGET", "5")),
+)
+
+# In-process glossary indexes: exact-match fast path and lexical retrieval.
+# Prefer the memory-mapped snapshot (scripts/data_utils.py export-snapshot) over parsing the JSON.
+glossary_snapshot = load_snapshot(GLOSSARY_SNAPSHOT_PATH, GLOSSARY_PATH)
+if glossary_snapshot is not None:
+    glossary_index = GlossaryIndex.from_snapshot(glossary_snapshot)
+    lexical_index = LexicalIndex.from_snapshot(glossary_snapshot)
+else:
+    glossary_records = load_glossary(GLOSSARY_PATH, required=GLOSSARY_REQUIRED)
+    glossary_index = GlossaryIndex(glossary_records)
+    lexical_index = LexicalIndex([glossary_record_fields(rec) for rec in glossary_records if rec.get("Term")])
+# Typo-tolerant autocomplete over the same terms as the exact-match index
+term_trie = build_term_trie(glossary_index.terms.items())
+if RETRIEVAL_MODE == "hybrid" and len(lexical_index):
+    retriever = HybridRetriever(retriever, lexical_index, candidates=HYBRID_CANDIDATES)
+
+# Answers precomputed for every glossary term (scripts/precompute_answers.py), if built for this configuration
+answer_store = load_answer_store(
+    ANSWER_STORE_PATH, GLOSSARY_PATH, retriever.name, retriever.namespace, prompt_template.mode
+)
+
+# Shared Redis client for cross-replica caching (optional)
+redis_client = None
+if REDIS_URL:
+    try:
+        redis_client = create_redis_client(REDIS_URL)
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; shared cache disabled")
+
+# Index generation stamp, bumped by scripts/update_pinecone.py after re-indexing
+index_generation = IndexGeneration(
+    index_generation_key(PINECONE_NAMESPACE),
+    client=redis_client,
+    poll_interval=float(os.getenv("INDEX_GENERATION_POLL_INTERVAL", "30")),
+)
+
+def answer_store_generation_changed(generation: int):
+    if answer_store is not None and generation != answer_store.index_generation:
+        logger.warning(f"Answer store was built for index generation {answer_store.index_generation}, "
+                       f"now {generation}; generating every answer live until it is rebuilt")
+
+index_generation.subscribe(answer_store_generation_changed)
+
+# Response cache: in-process LRU plus optional shared Redis tier
+response_cache = ResponseCache(
+    max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    generation=index_generation,
+    redis_client=redis_client,
+    redis_ttl=int(os.getenv("RESPONSE_CACHE_REDIS_TTL", "86400")),
+)
 
-# Validate configs
-if not PINECONE_API_KEY or not GEMINI_API_KEY:
-    raise ValueError("PINECONE_API_KEY and GEMINI_API_KEY are required")
+# Retrieval cache: Pinecone hits only change when the index is re-indexed
+retrieval_cache = RetrievalCache(
+    max_size=int(os.getenv("RETRIEVAL_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("RETRIEVAL_CACHE_TTL", "86400")),
+    generation=index_generation,
+)
+
+# Single-flight coalescing of identical in-flight requests (trending terms)
+answer_flight = SingleFlight("answer")
+retrieval_flight = SingleFlight("retrieval")
+
+# Dependency checks for /readyz and /health, refreshed in the background
+# so probes never call Pinecone themselves
+dependency_monitor = DependencyMonitor(
+    upstream_executor,
+    interval=READINESS_INTERVAL,
+    timeout=READINESS_TIMEOUT,
+    failure_threshold=READINESS_FAILURE_THRESHOLD,
+)
+dependency_monitor.add("retriever", retriever.describe)
+# Not required: exact matches, /api/suggest and precomputed answers are served without Gemini
+dependency_monitor.add("gemini", lambda: providers.get("gemini_model") and {"model": "gemini-2.0-flash"},
+                       required=False)
+if redis_client is not None:
+    async def ping_redis():
+        return {"ping": await redis_client.ping()}
+    dependency_monitor.add("redis", ping_redis, required=False)
+
+# Per-stage latency histograms for /metrics and the Server-Timing header
+metrics = Metrics()
+
+def cache_samples():
+    caches = {f"response_{tier}": stats for tier, stats in response_cache.stats().items()}
+    caches["retrieval"] = retrieval_cache.stats()
+    if answer_store is not None:
+        caches["answer_store"] = answer_store.stats()
+    for cache, stats in caches.items():
+        for result in ("hits", "misses"):
+            yield {"cache": cache, "result": result}, stats[result]
+
+metrics.add_collector("gov_terms_cache_lookups_total", "Response and retrieval cache lookups.", "counter", cache_samples)
+metrics.add_collector("gov_terms_gemini_usage_total", "Gemini calls and tokens.", "counter",
+                      lambda: [({"kind": kind}, value) for kind, value in gemini_usage.items()])
+def coalescing_samples():
+    for flight in (answer_flight, retrieval_flight):
+        stats = flight.stats()
+        for role in ("leaders", "followers"):
+            yield {"flight": flight.name, "role": role[:-1]}, stats[role]
+
+metrics.add_collector("gov_terms_coalesced_calls_total",
+                      "Single-flight calls: leaders ran the work, followers shared it.", "counter", coalescing_samples)
+metrics.add_collector("gov_terms_coalesced_errors_total", "Single-flight tasks that failed for all their waiters.",
+                      "counter", lambda: [({"flight": f.name}, f.errors) for f in (answer_flight, retrieval_flight)])
+metrics.add_collector("gov_terms_coalesced_in_flight", "Single-flight tasks in progress.", "gauge",
+                      lambda: [({"flight": f.name}, f.stats()["in_flight"]) for f in (answer_flight, retrieval_flight)])
+metrics.add_collector("gov_terms_upstream_retries_total", "Upstream calls retried after a transient failure.",
+                      "counter", lambda: [({"upstream": p.name}, p.retries) for p in (retrieval_retries, generation_retries)])
+metrics.add_collector("gov_terms_retrieval_hedges_total", "Hedged retrieval calls sent, and how many won.", "counter",
+                      lambda: [({"outcome": "sent"}, retrieval_hedger.hedged), ({"outcome": "won"}, retrieval_hedger.hedge_wins)])
+metrics.add_collector("gov_terms_upstream_attempt_timeouts_total", "Upstream attempts abandoned after their own timeout.",
+                      "counter", lambda: [({"upstream": retrieval_attempts.name}, retrieval_attempts.timeouts)])
+def admission_samples():
+    stats = admission.stats()
+    for state in ("in_flight", "queued"):
+        yield {"state": state}, stats[state]
+
+metrics.add_collector("gov_terms_admission_limit", "Current adaptive limit on concurrent RAG pipelines.", "gauge",
+                      lambda: [({}, admission.stats()["limit"])])
+metrics.add_collector("gov_terms_admission_requests", "RAG pipelines running or waiting for admission.", "gauge",
+                      admission_samples)
+metrics.add_collector("gov_terms_admission_shed_total", "Requests shed with a 503 before reaching the RAG pipeline.",
+                      "counter", lambda: [({"reason": reason}, count) for reason, count in admission.shed.items()])
+metrics.add_collector("gov_terms_index_generation", "Current index generation stamp.", "gauge",
+                      lambda: [({}, index_generation.value)])
 
-# Initialize services
-pc = Pinecone(api_key=PINECONE_API_KEY)
-pinecone_index = pc.Index(PINECONE_INDEX_NAME)
-genai.configure(api_key=GEMINI_API_KEY) # type: ignore
-gemini_model = genai.GenerativeModel('gemini-2.0-flash') # type: ignore
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the upstream clients and start dependency checks without delaying the first request."""
+    tasks = [asyncio.create_task(dependency_monitor.run())]
+    if WARM_PROVIDERS:
+        tasks.append(asyncio.create_task(providers.warm(upstream_executor)))
+    yield
+    for task in tasks:
+        task.cancel()
 
 # FastAPI app
-app = FastAPI(title="Gov Terms AI", version="2.1.0")
+app = FastAPI(title="Gov Terms AI", version="2.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -53,31 +353,87 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware, metrics=metrics,
+                   paths=["/api/query", "/api/query/stream", "/api/query/batch", "/api/suggest"])
+app.add_middleware(PayloadSamplingMiddleware)
 
 # ============================================================================
 # Health Check Endpoint
 # ============================================================================
 
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe: constant time, no dependency calls."""
+    return dependency_monitor.liveness()
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe: the cached result of the background dependency checks."""
+    readiness = dependency_monitor.readiness()
+    if not readiness["ready"]:
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Docker and load balancers."""
     try:
-        # Basic health check - verify Pinecone connection
-        index_stats = pinecone_index.describe_index_stats()
+        # Cached dependency status; the retriever stats come from the last background check
+        readiness = dependency_monitor.readiness()
+        if not readiness["ready"]:
+            raise RuntimeError(f"dependencies not ready: {readiness['dependencies']}")
+        retriever_status = dependency_monitor.result("retriever") or {}
         return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "service": "Gov Terms AI Backend",
             "version": "2.1.0",
             "Deployment Date": "15 July 2025",
-            "pinecone_status": "connected",
-            "vector_count": index_stats.total_vector_count if hasattr(index_stats, 'total_vector_count') else "unknown"
+            "retriever_status": "connected",
+            **retriever_status,
+            "glossary_terms": len(glossary_index),
+            "glossary_source": "snapshot" if glossary_snapshot is not None else "json",
+            "suggest_terms": len(term_trie),
+            "index_generation": index_generation.value,
+            "answer_store": answer_store.stats() if answer_store is not None else None,
+            "response_cache": response_cache.stats(),
+            "retrieval_cache": retrieval_cache.stats(),
+            "coalescing": {"answer": answer_flight.stats(), "retrieval": retrieval_flight.stats()},
+            "admission": admission.stats(),
+            "upstream": {
+                "retrieval_retries": {**retrieval_retries.stats(), **retrieval_attempts.stats()},
+                "generation_retries": generation_retries.stats(),
+                "retrieval_hedging": retrieval_hedger.stats(),
+            },
+            "prompt_mode": prompt_template.mode,
+            "gemini_usage": gemini_usage,
+            "services": providers.status(),
+            "check_age_s": readiness["check_age_s"]
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/cache/invalidate")
+async def invalidate_cache(x_admin_token: str = Header(default="")):
+    """Drop all cached responses and retrieval hits, e.g. after the Pinecone namespace is re-indexed."""
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    try:
+        generation = await index_generation.bump()
+    except Exception as e:
+        logger.error(f"Cache invalidation failed: {e}")
+        raise HTTPException(status_code=503, detail="Cache invalidation failed")
+    logger.info(f"Caches invalidated, index generation is now {generation}")
+    return {"index_generation": generation, "shared": redis_client is not None}
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -93,7 +449,7 @@ def get_user_query(request_body: dict) -> str:
         query = request_body.get("query", "").strip()
         if not query:
             raise ValueError("Query is required")
-        logger.info(f"Received query: {query[:50]}...")
+        logger.debug("Received query", extra={"query": query})
         return query
     except Exception as e:
         logger.error(f"Error getting user query: {e}")
@@ -102,161 +458,318 @@ def get_user_query(request_body: dict) -> str:
 
 
 def search_database(user_query) -> List[Dict[str, Any]]:
-    """Function 3: Search Pinecone database."""
+    """Function 3: Search the vector database (Pinecone or the local store)."""
     try:
-        reference_text = []
-        records = pinecone_index.search_records(
-            namespace="gov-terms2",
-            query={
-                "inputs": {"text": user_query},
-                "top_k": 3
-            } # type: ignore
-        )
-        hits = records.get('result', {}).get('hits', [])
-        for hit in hits:
-            score = hit.get('_score')
-            fields = hit.get('fields', {})
-            reference_text.append({
-                "score": round(score, 3),
-                "text": fields.get("text", ""),
-                "entity": fields.get("Entity", ""),
-                "body_type": fields.get("BodyType", ""),
-                "portfolio": fields.get("Portfolio", ""),
-                "url": fields.get("Url", "")
-            })
-         # Sort reference_text by score in descending order
-        reference_text.sort(key=lambda x: x["score"], reverse=True)
-        logger.info(f"✅ Found {len(reference_text)} relevant terms")
-        logger.info(f"{reference_text}")
+        with timed_stage("search_database"):
+            reference_text = retrieval_retries.call(retrieval_attempts.call, retriever.search, user_query,
+                                                    RETRIEVAL_TOP_K)
+        logger.debug("Search results", extra={"hits": len(reference_text)})
+        log_payload(logger, "Search results payload", query=user_query, hits=reference_text)
         return reference_text
+    except ProviderUnavailable as e:
+        logger.error(f"Database search unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Search backend unavailable")
     except Exception as e:
         logger.error(f"Database search failed: {e}")
         raise HTTPException(status_code=500, detail="Database search failed")
 
+def select_source(answer: Dict[str, Any], search_results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Find the source Gemini chose, by index, falling back to its entity name."""
+    source_index = answer.get("source_index")
+    if isinstance(source_index, int) and 1 <= source_index <= len(search_results):
+        return search_results[source_index - 1]
+    # Legacy answers only name the entity
+    selected_source_entity = answer.get("source_entity")
+    if selected_source_entity:
+        return next((source for source in search_results if source["entity"] == selected_source_entity), None)
+    return None
+
+def answer_to_result(answer: Dict[str, Any], search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Normalize a parsed Gemini answer into ai_response JSON plus its selected source."""
+    return {
+        "ai_response": json.dumps(answer),
+        "selected_source": select_source(answer, search_results)
+    }
+
+def parse_gemini_response(response_text: str, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse Gemini's JSON answer and find the source it selected."""
+    answer = extract_json(response_text)
+    if not isinstance(answer, dict):
+        # If JSON parsing fails, return raw response without selected source
+        return {
+            "ai_response": response_text,
+            "selected_source": None
+        }
+    return answer_to_result(answer, search_results)
+
 def send_gemini_prompt(user_query: str, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Function 4: Send prompt to Gemini with search results as context."""
     try:
-        # Build context from search results
-        if search_results:
-            context = "\n".join([
-                f"{term['text']} Score: {term['score']} Entity: {term['entity']} BodyType:{term['body_type']} "
-                for term in search_results
-            ])
+        with timed_stage("prompt_build"):
+            prompt = prompt_template.build(user_query, search_results)
+        
+        # Generate response
+        with timed_stage("send_gemini_prompt"):
+            response = generation_retries.call(lambda: providers.get("gemini_model").generate_content(
+                prompt, generation_config=prompt_template.generation_config(),
+                request_options=gemini_request_options()
+            ))
+        record_gemini_usage(response)
+        log_payload(logger, "Gemini prompt payload", query=user_query, context=search_results,
+                    response_text=response.text)
+        
+        with timed_stage("parse"):
+            return parse_gemini_response(response.text, search_results)
             
-            prompt =f"""
-            You are an expert AI assistant for defining Australian government terminology. Your mission is to provide a clear and concise definition for a given term, acting as a trusted resource for the public.
-
-                Primary Goal:
-                Your task is to define the term provided in the "User Query" using only the information available 
-                in the "Reference Context".
-
-                Critical Rules:
-
-                Strict Sourcing: Use the "Reference Context" to identify and select the correct term definition. If the 
-                term is not defined there, you must respond with the exact phrase: "I apologise, but the term 
-                you're asking about is not defined in the knowledge I currently have."
-
-                Elaboration Guidelines: For the elaboration field, you may use your general knowledge to provide 
-                a helpful 1-2 sentence explanation of what the term is or what it does. The elaboration should be 
-                informative and help the public understand the concept, even if the Reference Context doesn't 
-                contain detailed explanatory information.
-
-                Tone: Your tone must be helpful, professional, and easy for a member of the public to understand.
-
-                Definition Selection Logic:
-                Your first and most important step is to classify the User Query and then follow the appropriate
-                  set of rules below.
-
-                Step 1: Classify the User Query
-
-                First, determine if the query is an 'ACRONYM' or a 'GENERAL TERM'.
+    except ProviderUnavailable as e:
+        logger.error(f"Gemini unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Generation backend unavailable")
+    except Exception as e:
+        logger.error(f"Gemini prompt failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate response")
 
-                An 'ACRONYM' is a short-form abbreviation, usually in all-caps (e.g., 'IGA', 'PBS', 'ATO').
+def parse_gemini_batch_response(response_text: str, items: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Map item ids to parsed answers from a batched Gemini response."""
+    answers = extract_json(response_text)
+    if not isinstance(answers, list):
+        return {}
+    items_by_id = {item["id"]: item for item in items}
+    results = {}
+    for answer in answers:
+        if not isinstance(answer, dict) or answer.get("id") not in items_by_id:
+            continue
+        item = items_by_id[answer.pop("id")]
+        results[item["id"]] = answer_to_result(answer, item["search_results"])
+    return results
 
-                A 'GENERAL TERM' is a standard word or phrase (e.g., 'tax', 'grant', 'commonwealth entity').
+def send_gemini_batch_prompt(items: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """
+    Define several queries with one Gemini call.
+    Items missing from the result should be retried with send_gemini_prompt.
+    """
+    try:
+        prompt = prompt_template.build_batch(items)
+        response = generation_retries.call(lambda: providers.get("gemini_model").generate_content(
+            prompt, generation_config=prompt_template.generation_config(batch=True),
+            request_options=gemini_request_options()
+        ))
+        record_gemini_usage(response)
+        results = parse_gemini_batch_response(response.text, items)
+        logger.info("Gemini batch response generated", extra={"answered": len(results), "items": len(items)})
+        return results
+    except Exception as e:
+        logger.error(f"Gemini batch prompt failed: {e}")
+        return {}
 
-                Step 2: Apply Logic Based on Classification
+def answer_exact_match(match: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the response payload for an unambiguous glossary hit."""
+    selected_source = match["selected_source"]
+    return {
+        "ai_response": json.dumps({
+            "definition": match["definition"],
+            "elaboration": "",
+            "source_entity": selected_source["entity"]
+        }),
+        "sources": match["sources"],
+        "selected_source": selected_source,
+        "served_by": "exact_match",
+        "cache": "bypass"
+    }
 
-                IF the query is an 'ACRONYM':
-                Follow these rules in precise sequential order:
+def log_query_answered(user_query: str, payload: Dict[str, Any], cache_tier: str):
+    """One compact line per generated answer; the full answer and sources only when sampled."""
+    sources = payload["sources"]
+    selected_source = payload["selected_source"] or {}
+    logger.info("Query answered", extra={
+        "query": user_query,
+        "served_by": payload["served_by"],
+        "cache": cache_tier,
+        "sources": len(sources),
+        "top_score": sources[0].get("score") if sources else None,
+        "selected_entity": selected_source.get("entity"),
+    })
+    log_payload(logger, "Query answer payload", query=user_query, ai_response=payload["ai_response"],
+                sources=sources, selected_source=payload["selected_source"])
 
-                Prioritise Generality: First, identify the definition with the shortest definition text.
-                A shorter, more concise definition is considered more foundational.
+def precomputed_answer(user_query: str, elaborate: bool) -> Optional[Dict[str, Any]]:
+    """
+    Answer from the precomputed store for a query that is a glossary term, or
+    None. The store is skipped once the index generation differs from the one
+    it was built for, so a re-index or /admin/cache/invalidate retires it
+    like the caches; refresh index_generation before calling.
+    """
+    if answer_store is None or answer_store.index_generation != index_generation.value:
+        return None
+    with timed_stage("answer_store"):
+        stored = answer_store.get(normalize_term(user_query), elaborate)
+    if stored is None:
+        return None
+    return {**stored, "cache": "precomputed"}
 
-                Break Ties with Score: If multiple definitions share the same shortest length, select 
-                the one with the highest 'score' from that group.
+def response_cache_key(user_query: str, elaborate: bool) -> str:
+    """Response cache key for a query against the configured index namespace."""
+    return ResponseCache.make_key(
+        normalize_term(user_query), retriever.name, retriever.namespace,
+        variant="elaborate" if elaborate else ""
+    )
 
-                Conditionally Break Ties with Entity Type: If a tie still persists, check if all tied candidates
-                  have a populated 'BodyType' field. If they do, choose the 'Non-corporate Commonwealth entity'.
-                    Otherwise, skip this rule.
+# ============================================================================
+# Async Stage Wrappers
+# ============================================================================
 
-                Final Tie-Breaker: If the tie still cannot be resolved, select the definition from the more
-                  central government body (e.g., 'Department of the Prime Minister and Cabinet').
+async def run_stage(limiter: asyncio.Semaphore, func: Callable[..., Any], *args: Any,
+                    timeout: Optional[float] = None) -> Any:
+    """
+    Run a blocking pipeline stage on the upstream pool without blocking the event loop.
+    With a timeout (further capped by the request deadline) raise DeadlineExceeded
+    when it runs out. The worker thread can't be interrupted, so it keeps its
+    limiter slot until it returns and the limiter still bounds real upstream load.
+    """
+    loop = asyncio.get_running_loop()
+    
+    async def submit():
+        await limiter.acquire()
+        # Copy the context so the worker thread sees this request's timings and deadline
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(upstream_executor, functools.partial(context.run, func, *args))
+        future.add_done_callback(lambda _: limiter.release())
+        return await asyncio.shield(future)
+    
+    if timeout is None:
+        return await submit()
+    budget = stage_timeout(timeout)
+    try:
+        return await asyncio.wait_for(submit(), budget)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"{func.__name__} exceeded {budget:.2f}s")
 
-                IF the query is a 'GENERAL TERM':
-                Follow these rules in precise sequential order:
+def overloaded_error(e: Overloaded) -> HTTPException:
+    """503 for a shed request, with a Retry-After hint for clients and proxies."""
+    logger.debug(f"Shedding query: {e}")
+    return HTTPException(status_code=503, detail="Server busy, please retry shortly",
+                         headers={"Retry-After": str(e.retry_after)})
 
-                Prioritise Highest Score: First, identify the definition with the highest 'score'.
+async def admitted(func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """Run an upstream pipeline under the admission limit; raise a 503 if it is shed."""
+    with timed_stage("admission"):
+        try:
+            started = await admission.acquire()
+        except Overloaded as e:
+            raise overloaded_error(e)
+    ok = False
+    try:
+        result = await func(*args)
+        ok = True
+        return result
+    finally:
+        admission.release(started, ok)
 
-                Break Ties with Entity Type: If multiple definitions share the exact same highest score, check 
-                if all tied candidates have a populated 'BodyType' field. If they do, choose the 'Non-corporate
-                  Commonwealth entity'. Otherwise, skip this rule.
+async def search_database_async(user_query: str) -> List[Dict[str, Any]]:
+    """Async variant of search_database, memoized and bounded by RETRIEVAL_CONCURRENCY."""
+    normalized_query = normalize_term(user_query)
+    hits = retrieval_cache.get(retriever.namespace, normalized_query, RETRIEVAL_TOP_K)
+    if hits is not None:
+        return hits
+    
+    async def fetch() -> List[Dict[str, Any]]:
+        generation = index_generation.value
+        try:
+            # A slow search gets a hedged duplicate after HEDGE_RETRIEVAL_AFTER seconds
+            fetched = await retrieval_hedger.run(
+                lambda: run_stage(retrieval_limiter, search_database, user_query, timeout=RETRIEVAL_TIMEOUT)
+            )
+        except DeadlineExceeded as e:
+            logger.error(f"Database search timed out: {e}")
+            raise HTTPException(status_code=504, detail="Search backend timed out")
+        # Don't stamp hits fetched before a re-index with the new generation
+        if index_generation.value == generation:
+            retrieval_cache.set(retriever.namespace, normalized_query, RETRIEVAL_TOP_K, fetched)
+        return fetched
+    
+    # Concurrent misses for the same query share one search
+    hits, _ = await retrieval_flight.do(f"{retriever.namespace}:{RETRIEVAL_TOP_K}:{normalized_query}", fetch)
+    return hits
 
-                Final Tie-Breaker: If the tie still cannot be resolved, select the definition from the more
-                  central government body (e.g., 'Department of the Prime Minister and Cabinet').
+async def send_gemini_prompt_async(user_query: str, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Async variant of send_gemini_prompt bounded by GENERATION_CONCURRENCY and GENERATION_TIMEOUT."""
+    try:
+        return await run_stage(generation_limiter, send_gemini_prompt, user_query, search_results,
+                               timeout=GENERATION_TIMEOUT)
+    except DeadlineExceeded as e:
+        logger.error(f"Gemini prompt timed out: {e}")
+        raise HTTPException(status_code=504, detail="Generation backend timed out")
 
-                **Response Format:**
-                After choosing the correct source document using the logic above, you **must** structure your final output as a single JSON object. Do not include any text or formatting outside of this JSON object. The JSON must have the following structure:
+async def generate_answer(user_query: str, match: Optional[Dict[str, Any]], cache_key: str) -> Dict[str, Any]:
+    """Retrieval + generation for a response cache miss; the answer is cached before returning."""
+    if match:
+        # Elaborate on the known definition without a vector search
+        served_by = "exact_match+gemini"
+        search_results = [match["selected_source"]]
+        gemini_result = await send_gemini_prompt_async(user_query, search_results)
+    else:
+        served_by = "rag"
+        # Function 2: Search database
+        search_results = await search_database_async(user_query)
+        
+        # Function 3: Send Gemini prompt with context
+        gemini_result = await send_gemini_prompt_async(user_query, search_results)
+    
+    # Structure and send response to frontend
+    response_payload = {
+        "ai_response": gemini_result["ai_response"], 
+        "sources": search_results,  # All 3 sources for debugging
+        "selected_source": gemini_result["selected_source"],  # The source Gemini actually used
+        "served_by": served_by  # exact_match, exact_match+gemini or rag
+    }
+    await response_cache.set(cache_key, response_payload)
+    log_query_answered(user_query, response_payload, "miss")
+    return response_payload
 
-                * A top-level key `"definition"` containing ONLY the term expansion or short definition (e.g., "NDIS: National Disability Insurance Scheme" or "Tax: A compulsory financial charge").
-                * A top-level key `"elaboration"` containing 1-2 sentences that provide a general explanation of what the term is or what it does. Use your knowledge to make this explanation helpful and informative for the public, even if the Reference Context lacks detailed explanatory information.
-                * A top-level key `"source_entity"` containing only the **string value** of the `entity` field from the source document you chose.
+async def stream_gemini_prompt(user_query: str, search_results: List[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Yield Gemini output text chunks as they are generated."""
+    with timed_stage("prompt_build"):
+        prompt = prompt_template.build(user_query, search_results)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
 
-                **Example JSON Output Structure:**
-                ```json
-                {{
-                "definition": "NDIS: National Disability Insurance Scheme",
-                "elaboration": "This is a scheme that provides services and support for people with permanent and significant disability, their families and carers. It aims to help people with disability achieve their goals and participate more fully in the community.",
-                "source_entity": "Department of Social Services"
-                }}
+    timeout = stage_timeout(GENERATION_TIMEOUT)
+    expires_at = loop.time() + timeout
 
-                User Query: "{user_query}"
+    def produce():
+        try:
+            response = providers.get("gemini_model").generate_content(
+                prompt, stream=True, generation_config=prompt_template.generation_config(),
+                request_options={"timeout": max(timeout, 0.001), "retry": None}
+            )
+            for chunk in response:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+            # Usage metadata is complete once the stream is exhausted
+            record_gemini_usage(response)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
 
-                Reference Context:
-                {context}
-                        """
-        # Generate response
-        response = gemini_model.generate_content(prompt) # type: ignore
-        logger.info("✅ Gemini response generated")
-        logger.info(f"The context was: {context}") # type: ignore
-        
-        # Parse JSON response from Gemini
+    async with generation_limiter:
+        producer = loop.run_in_executor(upstream_executor, produce)
         try:
-            gemini_data = json.loads(response.text)
-            selected_source_entity = gemini_data.get("source_entity")
-            
-            # Find which source was selected by matching entity
-            selected_source = None
-            if selected_source_entity:
-                for source in search_results:
-                    if source["entity"] == selected_source_entity:
-                        selected_source = source
-                        break
-            
-            return {
-                "ai_response": response.text,
-                "selected_source": selected_source
-            }
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return raw response without selected source
-            return {
-                "ai_response": response.text,
-                "selected_source": None
-            }
-            
-    except Exception as e:
-        logger.error(f"Gemini prompt failed: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate response")
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(expires_at - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(f"Gemini stream exceeded {timeout:.2f}s")
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Stop the producer if the client went away mid-stream
+            cancelled.set()
+            await producer
 
 # ============================================================================
 # API Endpoints
@@ -267,28 +780,42 @@ async def query_endpoint(request: dict):
     """Main endpoint: RAG pipeline with 4 functions."""
     try:
         # Function 1: Get user query from frontend
-        user_query = get_user_query(request)
+        with timed_stage("get_user_query"):
+            user_query = get_user_query(request)
+        elaborate = bool(request.get("elaborate", False))
+        start_deadline(REQUEST_BUDGET)
         
-        # Function 2: Search database
-        search_results = search_database(user_query)
+        # Fast path: unambiguous exact term/acronym match skips Pinecone
+        with timed_stage("exact_match"):
+            match = glossary_index.lookup(user_query)
+        if match and not elaborate:
+            label_request("exact_match", "bypass")
+            return answer_exact_match(match)
         
-        # Function 3: Send Gemini prompt with context
-        gemini_result = send_gemini_prompt(user_query, search_results)
+        # Glossary terms answered offline: a lookup instead of retrieval + generation,
+        # valid only for the index generation the store was built against
+        await index_generation.refresh()
+        stored = precomputed_answer(user_query, elaborate)
+        if stored is not None:
+            label_request(stored["served_by"], "precomputed")
+            return stored
         
-        # Log response received from Gemini 
-        logger.info(f"Gemini Response is: {gemini_result['ai_response']}")
-        logger.info(f"Selected source: {gemini_result['selected_source']}")
+        # Response cache in front of the generation pipeline
+        with timed_stage("response_cache"):
+            cache_key = response_cache_key(user_query, elaborate)
+            cached, cache_tier = await response_cache.get(cache_key)
+        if cached is not None:
+            label_request(cached["served_by"], cache_tier)
+            return {**cached, "cache": cache_tier}
         
-        # Structure and send response to frontend
-        response_payload = {
-            "ai_response": gemini_result["ai_response"], 
-            "sources": search_results,  # All 3 sources for debugging
-            "selected_source": gemini_result["selected_source"]  # The source Gemini actually used
-        }
-        logger.info(f"The sources are {response_payload['sources']} type of score is {response_payload['sources'][0]['score'] if response_payload['sources'] else 'N/A'}")
-        return response_payload
-
-    
+        # Concurrent misses for the same key share one retrieval + generation, which
+        # waits for admission once for all of them; failures are raised in every waiting request
+        response_payload, shared = await answer_flight.do(
+            cache_key, lambda: admitted(generate_answer, user_query, match, cache_key)
+        )
+        cache_tier = "coalesced" if shared else cache_tier
+        label_request(response_payload["served_by"], cache_tier)
+        return {**response_payload, "cache": cache_tier}
         
     except HTTPException:
         raise
@@ -296,5 +823,281 @@ async def query_endpoint(request: dict):
         logger.error(f"Pipeline error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/api/suggest")
+async def suggest_endpoint(prefix: str = "", limit: int = 8):
+    """Autocomplete: glossary terms starting with prefix, allowing for a typo or two."""
+    with timed_stage("suggest"):
+        normalized = normalize_term(prefix[:MAX_SUGGEST_PREFIX])
+        suggestions = term_trie.search(normalized, max(1, min(limit, MAX_SUGGESTIONS)))
+    label_request("suggest", "bypass")
+    return {"prefix": prefix, "suggestions": suggestions}
+
+@app.post("/api/query/batch")
+async def query_batch_endpoint(request: dict):
+    """Bulk lookup: dedupe queries, retrieve in parallel and pack terms into fewer Gemini calls."""
+    started = time.perf_counter()
+    queries = request.get("queries")
+    if not isinstance(queries, list) or not queries:
+        raise HTTPException(status_code=400, detail="queries must be a non-empty list")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    elaborate = bool(request.get("elaborate", False))
+    
+    # Dedupe on the normalized query, keeping the first spelling seen
+    unique: Dict[str, str] = {}
+    for query in queries:
+        if isinstance(query, str) and query.strip():
+            unique.setdefault(normalize_term(query), query.strip())
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    pending: List[Dict[str, Any]] = []
+    
+    # Exact matches, precomputed and cached answers need no upstream calls
+    await index_generation.refresh()
+    for key, query in unique.items():
+        match = glossary_index.lookup(query)
+        if match and not elaborate:
+            results[key] = answer_exact_match(match)
+            continue
+        stored = precomputed_answer(query, elaborate)
+        if stored is not None:
+            results[key] = stored
+            continue
+        cached, cache_tier = await response_cache.get(response_cache_key(query, elaborate))
+        if cached is not None:
+            results[key] = {**cached, "cache": cache_tier}
+            continue
+        pending.append({"key": key, "query": query, "match": match})
+    
+    async def generate_pending() -> Dict[str, Any]:
+        """Retrieval and generation for the items not answered above; fills results and errors."""
+        # Retrieval, bounded by RETRIEVAL_CONCURRENCY
+        retrieval_started = time.perf_counter()
+    
+        async def retrieve(item: Dict[str, Any]):
+            if item["match"]:
+                item["served_by"] = "exact_match+gemini"
+                item["search_results"] = [item["match"]["selected_source"]]
+            else:
+                item["served_by"] = "rag"
+                item["search_results"] = await search_database_async(item["query"])
+    
+        outcomes = await asyncio.gather(*(retrieve(item) for item in pending), return_exceptions=True)
+        ready = []
+        for item, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                errors[item["key"]] = getattr(outcome, "detail", "Database search failed")
+            else:
+                item["id"] = len(ready) + 1
+                ready.append(item)
+        retrieval_ms = (time.perf_counter() - retrieval_started) * 1000
+    
+        # Generation: pack several terms per Gemini call, bounded by GENERATION_CONCURRENCY
+        generation_started = time.perf_counter()
+        pack_size = max(BATCH_PACK_SIZE, 1)
+        packs = [ready[i:i + pack_size] for i in range(0, len(ready), pack_size)]
+        multi_item_packs = [pack for pack in packs if len(pack) > 1]
+    
+        async def answer_pack(pack: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+            try:
+                return await run_stage(generation_limiter, send_gemini_batch_prompt, pack, timeout=GENERATION_TIMEOUT)
+            except DeadlineExceeded as e:
+                # Its items are retried one by one below
+                logger.error(f"Gemini batch prompt timed out: {e}")
+                return {}
+    
+        pack_answers = await asyncio.gather(*(answer_pack(pack) for pack in multi_item_packs))
+        answers: Dict[int, Dict[str, Any]] = {}
+        for pack_answer in pack_answers:
+            answers.update(pack_answer)
+    
+        # Single items and anything a packed answer missed get their own prompt
+        singles = [item for item in ready if item["id"] not in answers]
+        single_answers = await asyncio.gather(*(
+            send_gemini_prompt_async(item["query"], item["search_results"]) for item in singles
+        ), return_exceptions=True)
+        for item, answer in zip(singles, single_answers):
+            if isinstance(answer, Exception):
+                errors[item["key"]] = getattr(answer, "detail", "Failed to generate response")
+            else:
+                answers[item["id"]] = answer
+        generation_ms = (time.perf_counter() - generation_started) * 1000
+    
+        for item in ready:
+            if item["id"] not in answers:
+                continue
+            payload = {
+                "ai_response": answers[item["id"]]["ai_response"],
+                "sources": item["search_results"],
+                "selected_source": answers[item["id"]]["selected_source"],
+                "served_by": item["served_by"]
+            }
+            await response_cache.set(response_cache_key(item["query"], elaborate), payload)
+            results[item["key"]] = {**payload, "cache": "miss"}
+        return {
+            "generated": len(ready),
+            "gemini_calls": len(multi_item_packs) + len(singles),
+            "retrieval_ms": retrieval_ms,
+            "generation_ms": generation_ms,
+        }
+    
+    # The upstream part of a batch holds one admission slot, like a single query's pipeline,
+    # so batches can't crowd out interactive queries; a shed batch gets a 503 with Retry-After
+    upstream = {"generated": 0, "gemini_calls": 0, "retrieval_ms": 0.0, "generation_ms": 0.0}
+    if pending:
+        upstream = await admitted(generate_pending)
+    
+    # Per-item results in request order; duplicates share one answer
+    items_out = []
+    for query in queries:
+        key = normalize_term(query) if isinstance(query, str) and query.strip() else None
+        if key in results:
+            items_out.append({"query": query, **results[key]})
+        else:
+            items_out.append({"query": query, "error": errors.get(key, "Invalid query")})
+    
+    timing = {
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "retrieval_ms": round(upstream["retrieval_ms"], 1),
+        "generation_ms": round(upstream["generation_ms"], 1)
+    }
+    stats = {
+        "queries": len(queries),
+        "unique": len(unique),
+        "generated": upstream["generated"],
+        "gemini_calls": upstream["gemini_calls"],
+        "errors": sum(1 for item in items_out if "error" in item)
+    }
+    label_request("batch", "mixed")
+    logger.info("Batch served", extra={"stats": stats, "timing": timing})
+    return {"results": items_out, "timing": timing, "stats": stats}
+
+async def replay_events(payload: Dict[str, Any]) -> AsyncIterator[str]:
+    """An exact match or cached answer replayed in the same event shape as a generated one."""
+    label_request(payload["served_by"], payload["cache"])
+    yield sse_event("sources", {"sources": payload["sources"], "served_by": payload["served_by"]})
+    for field, text in answer_deltas(payload["ai_response"]):
+        yield sse_event("delta", {"field": field, "text": text})
+    yield sse_event("done", {**{key: value for key, value in payload.items() if key != "sources"},
+                             "timing": stage_timings()})
+
+async def query_events(user_query: str, match: Optional[Dict[str, Any]], cache_key: str,
+                       cache_tier: str, outcome: Dict[str, bool]) -> AsyncIterator[str]:
+    """
+    SSE event stream for one admitted query: a `sources` event once retrieval
+    is done, `delta` events with definition/elaboration text as Gemini
+    produces it, and a final `done` event carrying the full answer and
+    `selected_source`. Failures set outcome["ok"] to False for the admission controller.
+    """
+    try:
+        if match:
+            served_by = "exact_match+gemini"
+            search_results = [match["selected_source"]]
+        else:
+            served_by = "rag"
+            search_results = await search_database_async(user_query)
+        yield sse_event("sources", {"sources": search_results, "served_by": served_by})
+        
+        label_request(served_by, cache_tier)
+        parser = PartialAnswerParser()
+        chunks = []
+        # Includes time the client takes to read the deltas
+        with timed_stage("send_gemini_prompt"):
+            async for chunk in stream_gemini_prompt(user_query, search_results):
+                chunks.append(chunk)
+                for field, text in parser.feed(chunk):
+                    yield sse_event("delta", {"field": field, "text": text})
+        with timed_stage("parse"):
+            gemini_result = parse_gemini_response("".join(chunks), search_results)
+        response_payload = {
+            "ai_response": gemini_result["ai_response"],
+            "sources": search_results,
+            "selected_source": gemini_result["selected_source"],
+            "served_by": served_by
+        }
+        await response_cache.set(cache_key, response_payload)
+        log_query_answered(user_query, response_payload, cache_tier)
+        yield sse_event("done", {
+            "ai_response": gemini_result["ai_response"],
+            "selected_source": gemini_result["selected_source"],
+            "served_by": served_by,
+            "cache": cache_tier,
+            "timing": stage_timings()
+        })
+    except HTTPException as e:
+        outcome["ok"] = False
+        yield sse_event("error", {"detail": e.detail})
+    except DeadlineExceeded as e:
+        outcome["ok"] = False
+        logger.error(f"Streaming generation timed out: {e}")
+        yield sse_event("error", {"detail": "Generation backend timed out"})
+    except ProviderUnavailable as e:
+        outcome["ok"] = False
+        logger.error(f"Gemini unavailable: {e}")
+        yield sse_event("error", {"detail": "Generation backend unavailable"})
+    except Exception as e:
+        outcome["ok"] = False
+        logger.error(f"Streaming pipeline error: {e}")
+        yield sse_event("error", {"detail": "Internal server error"})
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for an admitted pipeline. The admission slot is released
+    when the response ends, however it ends, even if the client disconnects
+    before the event stream has started.
+    """
+    
+    def __init__(self, events: AsyncIterator[str], started: float, outcome: Dict[str, bool], **kwargs: Any):
+        super().__init__(events, **kwargs)
+        self.started = started
+        self.outcome = outcome
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            admission.release(self.started, self.outcome["ok"])
+
+@app.post("/api/query/stream")
+async def query_stream_endpoint(request: dict):
+    """Streaming variant of /api/query using Server-Sent Events."""
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    with timed_stage("get_user_query"):
+        user_query = get_user_query(request)
+    elaborate = bool(request.get("elaborate", False))
+    start_deadline(REQUEST_BUDGET)
+    
+    # Exact matches, precomputed and cached answers are replayed even while generation is saturated
+    with timed_stage("exact_match"):
+        match = glossary_index.lookup(user_query)
+    await index_generation.refresh()
+    stored = None if match and not elaborate else precomputed_answer(user_query, elaborate)
+    if match and not elaborate:
+        events = replay_events(answer_exact_match(match))
+    elif stored is not None:
+        events = replay_events(stored)
+    else:
+        with timed_stage("response_cache"):
+            cache_key = response_cache_key(user_query, elaborate)
+            cached, cache_tier = await response_cache.get(cache_key)
+        if cached is not None:
+            events = replay_events({**cached, "cache": cache_tier})
+        else:
+            # Wait for admission before the 200 goes out, so a shed query gets a 503 with Retry-After
+            with timed_stage("admission"):
+                try:
+                    started = await admission.acquire()
+                except Overloaded as e:
+                    raise overloaded_error(e)
+            # A client disconnecting mid-stream doesn't count against the admission limit
+            outcome = {"ok": True}
+            return AdmittedStreamingResponse(
+                query_events(user_query, match, cache_key, cache_tier, outcome), started, outcome,
+                media_type="text/event-stream", headers=headers
+            )
+    return StreamingResponse(events, media_type="text/event-stream", headers=headers)
+
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # log_config=None keeps uvicorn's loggers on the queue handler set up above
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True, log_config=None)
\ No newline at end of file
@@ -0,0 +1,321 @@
+"""
+Gov Terms AI - Response and retrieval caching
+In-process LRU/TTL caches with an optional shared Redis tier, plus
+single-flight coalescing of identical requests that are still in flight.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Return a fresh cached value or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any):
+        """Store a value, evicting the least recently used entries beyond max_size."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for /health."""
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def index_generation_key(namespace: str) -> str:
+    """Redis key of the generation stamp bumped by scripts/update_pinecone.py."""
+    return f"govterms:{namespace}:generation"
+
+
+def create_redis_client(url: str):
+    """Create an asyncio Redis client; raises ImportError without the redis package."""
+    import redis.asyncio as redis  # Optional dependency, only needed with REDIS_URL
+
+    return redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+
+class IndexGeneration:
+    """
+    Generation stamp of the Pinecone namespace contents.
+    The ingestion script bumps the shared counter in Redis after re-indexing;
+    replicas poll it and notify subscribed caches when it changes.
+    """
+
+    def __init__(self, key: str, client=None, poll_interval: float = 30.0):
+        self.key = key
+        self.client = client
+        self.poll_interval = poll_interval
+        self.value = 0
+        self._checked_at = float("-inf")
+        self._listeners: List[Callable[[int], None]] = []
+
+    def subscribe(self, callback: Callable[[int], None]):
+        """Call callback(new_generation) whenever the generation changes."""
+        self._listeners.append(callback)
+
+    def _advance(self, value: int):
+        if value == self.value:
+            return
+        logger.info(f"Index generation changed {self.value} -> {value}")
+        self.value = value
+        for callback in self._listeners:
+            callback(value)
+
+    async def refresh(self) -> int:
+        """Re-read the shared counter at most once per poll_interval."""
+        now = time.monotonic()
+        if self.client is None or now - self._checked_at < self.poll_interval:
+            return self.value
+        self._checked_at = now
+        try:
+            self._advance(int(await self.client.get(self.key) or 0))
+        except Exception as e:
+            logger.warning(f"Index generation refresh failed: {e}")
+        return self.value
+
+    async def bump(self) -> int:
+        """Start a new generation, shared with every replica when Redis is configured."""
+        if self.client is not None:
+            self._advance(int(await self.client.incr(self.key)))
+        else:
+            self._advance(self.value + 1)
+        return self.value
+
+
+class RedisTier:
+    """
+    Shared cache tier speaking the Redis protocol.
+    Entries are stamped with the index generation stored in Redis, so bumping
+    the counter invalidates every replica's shared entries at once.
+    """
+
+    def __init__(self, client, prefix: str, ttl: int, generation: IndexGeneration):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{hashlib.sha1(key.encode('utf-8')).hexdigest()}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return a cached value from the current generation or None."""
+        try:
+            raw, generation = await self.client.mget(self._key(key), self.generation.key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared cache get failed: {e}")
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        entry = json.loads(raw)
+        if entry.get("generation") != int(generation or 0):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["value"]
+
+    async def set(self, key: str, value: Any):
+        """Store a value stamped with the current generation."""
+        try:
+            generation = int(await self.client.get(self.generation.key) or 0)
+            entry = json.dumps({"generation": generation, "value": value})
+            await self.client.set(self._key(key), entry, ex=self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared cache set failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for /health."""
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+class ResponseCache:
+    """Two-tier /api/query response cache keyed on normalized query, index and namespace."""
+
+    def __init__(self, max_size: int, ttl: float, generation: IndexGeneration,
+                 redis_client=None, redis_prefix: str = "govterms:response", redis_ttl: int = 86400):
+        self.local = TTLCache(max_size, ttl)
+        self.generation = generation
+        self.shared: Optional[RedisTier] = None
+        if redis_client is not None:
+            self.shared = RedisTier(redis_client, redis_prefix, redis_ttl, generation)
+        generation.subscribe(lambda _: self.local.clear())
+
+    @staticmethod
+    def make_key(normalized_query: str, index_name: str, namespace: str, variant: str = "") -> str:
+        """Cache key for a normalized query against an index namespace."""
+        return f"{index_name}|{namespace}|{variant}|{normalized_query}"
+
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Look up a response; returns (payload, tier) where tier is l1, l2 or miss."""
+        value = self.local.get(key)
+        if value is not None:
+            return value, "l1"
+        if self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+                return value, "l2"
+        return None, "miss"
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a response in both tiers."""
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for /health."""
+        stats: Dict[str, Any] = {"l1": self.local.stats()}
+        if self.shared is not None:
+            stats["l2"] = self.shared.stats()
+        return stats
+
+
+HIT_FIELDS = ("score", "text", "entity", "body_type", "portfolio", "url")
+# Only set on some hits (rrf_score on fused hybrid hits); stored as None when absent
+OPTIONAL_HIT_FIELDS = ("rrf_score",)
+
+
+class RetrievalCache:
+    """
+    Memoized search_database results keyed by (namespace, normalized query, top_k).
+    Hits are stored as compact tuples stamped with the index generation, and
+    entries from an older generation are dropped on read.
+    """
+
+    def __init__(self, max_size: int, ttl: float, generation: IndexGeneration):
+        self.local = TTLCache(max_size, ttl)
+        self.generation = generation
+        self.stale = 0
+        generation.subscribe(lambda _: self.local.clear())
+
+    def get(self, namespace: str, normalized_query: str, top_k: int) -> Optional[List[Dict[str, Any]]]:
+        """Return cached hits for the current generation or None."""
+        entry = self.local.get((namespace, normalized_query, top_k))
+        if entry is None:
+            return None
+        generation, rows = entry
+        if generation != self.generation.value:
+            self.stale += 1
+            return None
+        fields = HIT_FIELDS + OPTIONAL_HIT_FIELDS
+        return [{field: value for field, value in zip(fields, row) if value is not None} for row in rows]
+
+    def set(self, namespace: str, normalized_query: str, top_k: int, hits: List[Dict[str, Any]]):
+        """Store hits under the current generation."""
+        rows = tuple(
+            tuple(hit.get(field, "") for field in HIT_FIELDS) + tuple(hit.get(field) for field in OPTIONAL_HIT_FIELDS)
+            for hit in hits
+        )
+        self.local.set((namespace, normalized_query, top_k), (self.generation.value, rows))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for /health."""
+        return {**self.local.stats(), "stale": self.stale}
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one in-flight task.
+    The task is shared by every waiter rather than owned by the first caller,
+    so a leader whose client disconnects doesn't cancel the work for the
+    rest, and an exception is raised in every waiter.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.errors = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return (result, shared); shared is True when another caller's call was reused."""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.followers += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        # shield: a cancelled waiter stops waiting without cancelling the shared task
+        return await asyncio.shield(task), shared
+
+    def _finished(self, key: str, task: "asyncio.Task[Any]"):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so it isn't reported as unhandled when every waiter has gone
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters for /health and /metrics."""
+        calls = self.leaders + self.followers
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "errors": self.errors,
+            "coalesced_ratio": round(self.followers / calls, 4) if calls else 0.0,
+        }
@@ -0,0 +1,144 @@
+"""
+Gov Terms AI - In-process glossary index
+Exact-match term/acronym lookup over data/combined_glossary.json.
+"""
+
+import json
+import logging
+import re
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+NON_CORPORATE_ENTITY = "Non-corporate Commonwealth entity"
+EXACT_MATCH_SCORE = 1.0
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_term(text: str) -> str:
+    """Normalize a term or query for exact-match lookup."""
+    return _WHITESPACE.sub(" ", text).strip().rstrip("?").strip().casefold()
+
+
+def is_acronym(term: str) -> bool:
+    """Classify a glossary term as an ACRONYM (short, no spaces, all caps)."""
+    compact = term.replace(".", "").replace("&", "")
+    return bool(compact) and " " not in compact and len(compact) <= 12 and compact.isupper()
+
+
+def glossary_row_to_hit(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a glossary record like a search_database hit."""
+    term = rec.get("Term", "")
+    definition = rec.get("Definition", "")
+    return {
+        "score": EXACT_MATCH_SCORE,
+        "text": f"{term}: {definition}",
+        "entity": rec.get("Entity", ""),
+        "body_type": rec.get("BodyType", ""),
+        "portfolio": rec.get("Portfolio", ""),
+        "url": rec.get("Url", ""),
+    }
+
+
+def _break_tie_by_entity_type(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Prefer the Non-corporate Commonwealth entity when every candidate has a BodyType."""
+    if len(candidates) < 2 or not all(c["body_type"] for c in candidates):
+        return candidates
+    preferred = [c for c in candidates if c["body_type"] == NON_CORPORATE_ENTITY]
+    return preferred or candidates
+
+
+def select_candidate(term: str, candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Apply the definition selection rules from the Gemini prompt.
+    Returns None when the tie cannot be resolved deterministically.
+    """
+    tied = candidates
+    if is_acronym(term):
+        # Prioritise generality: shortest definition text
+        shortest = min(len(c["text"]) for c in tied)
+        tied = [c for c in tied if len(c["text"]) == shortest]
+    # Break ties with score
+    best = max(c["score"] for c in tied)
+    tied = [c for c in tied if c["score"] == best]
+    tied = _break_tie_by_entity_type(tied)
+    # Distinct rows with identical text and entity are the same answer
+    if len({(c["text"], c["entity"]) for c in tied}) == 1:
+        return tied[0]
+    return None
+
+
+def load_glossary(path: str, required: bool = False) -> List[Dict[str, Any]]:
+    """
+    Load glossary rows from a combined glossary JSON file, or [] if unavailable.
+    With required, a missing, unreadable or empty glossary raises RuntimeError instead.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+    except FileNotFoundError:
+        if required:
+            raise RuntimeError(f"Glossary not found at {path}")
+        logger.warning(f"Glossary not found at {path}; in-process glossary lookups disabled")
+        return []
+    except json.JSONDecodeError as e:
+        if required:
+            raise RuntimeError(f"Glossary JSON decode error in {path}: {e}")
+        logger.error(f"Glossary JSON decode error: {e}; in-process glossary lookups disabled")
+        return []
+    if required and not records:
+        raise RuntimeError(f"Glossary at {path} has no rows")
+    logger.info(f"Loaded {len(records)} glossary rows from {path}")
+    return records
+
+
+class GlossaryIndex:
+    """Map normalized Term to its candidate glossary rows."""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.terms: Dict[str, str] = {}
+        self.candidates: Dict[str, List[Dict[str, Any]]] = {}
+        for rec in records:
+            term = (rec.get("Term") or "").strip()
+            if not term:
+                continue
+            key = normalize_term(term)
+            self.terms.setdefault(key, term)
+            self.candidates.setdefault(key, []).append(glossary_row_to_hit(rec))
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "GlossaryIndex":
+        """Serve lookups straight from a memory-mapped GlossarySnapshot."""
+        index = cls([])
+        index.terms, index.candidates = snapshot.exact_match_views()
+        return index
+
+    @classmethod
+    def from_json(cls, path: str) -> "GlossaryIndex":
+        """Load the index from a combined glossary JSON file."""
+        return cls(load_glossary(path))
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a query that exactly matches a glossary term.
+        Returns None for misses and for ambiguous hits.
+        """
+        key = normalize_term(query)
+        candidates = self.candidates.get(key)
+        if not candidates:
+            return None
+        term = self.terms[key]
+        selected = select_candidate(term, candidates)
+        if selected is None:
+            return None
+        others = [c for c in candidates if c is not selected]
+        return {
+            "term": term,
+            "definition": selected["text"],
+            "selected_source": selected,
+            "sources": [selected] + others[:2],
+        }
@@ -0,0 +1,308 @@
+"""
+Gov Terms AI - Columnar glossary snapshot
+A single memory-mapped file holding the glossary columns, the exact-match key
+index and the lexical postings, so workers start without parsing JSON or
+rebuilding dicts and share the file's pages through the OS page cache.
+
+Layout: 8-byte magic, little-endian u64 header length, JSON header, then
+8-byte aligned sections. Every section is a flat array ('B' bytes, 'I' uint32,
+'d' float64) described in the header by its offset from the end of the
+header, its byte length and its typecode. A string table is an offsets array
+plus a UTF-8 blob. The header also records the SHA-256 of the source JSON,
+so a snapshot is never served for a glossary that has since been edited.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from glossary_index import glossary_row_to_hit, normalize_term
+from lexical_index import LexicalIndex
+from retrievers import glossary_record_fields
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GTSNAP\x00\x01"
+FORMAT_VERSION = 2
+COLUMNS = ("Term", "Definition", "Entity", "BodyType", "Portfolio", "Url")
+
+_HEADER_LEN = struct.Struct("<Q")
+
+# (path, size, mtime_ns) -> SHA-256, so the snapshot and answer store checks hash the glossary once
+_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def source_digest(path: str) -> Optional[str]:
+    """SHA-256 hex digest of a file's contents, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+
+# ============================================================================
+# Writer
+# ============================================================================
+
+def _string_table(name: str, values: List[str]) -> Dict[str, array]:
+    offsets = array("I", [0])
+    blob = bytearray()
+    for value in values:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    return {f"{name}.offsets": offsets, f"{name}.data": array("B", bytes(blob))}
+
+
+def _postings(name: str, postings: Dict[str, List[Any]], weighted: bool) -> Dict[str, array]:
+    keys = sorted(postings)
+    offsets, docs, weights = array("I", [0]), array("I"), array("d")
+    for key in keys:
+        for entry in postings[key]:
+            if weighted:
+                docs.append(entry[0])
+                weights.append(entry[1])
+            else:
+                docs.append(entry)
+        offsets.append(len(docs))
+    sections = {**_string_table(f"{name}.keys", keys), f"{name}.offsets": offsets, f"{name}.docs": docs}
+    if weighted:
+        sections[f"{name}.weights"] = weights
+    return sections
+
+
+def write_snapshot(path: str, records: Iterable[Dict[str, Any]], source_sha256: Optional[str] = None) -> int:
+    """
+    Write a snapshot of the glossary rows that have a Term and return their count.
+    source_sha256 is the source_digest() of the JSON file the rows came from;
+    the backend ignores the snapshot once that file's contents change.
+    """
+    rows = [rec for rec in records if (rec.get("Term") or "").strip()]
+    sections: Dict[str, array] = {}
+    for column in COLUMNS:
+        sections.update(_string_table(f"col.{column}", [str(rec.get(column) or "") for rec in rows]))
+
+    # Exact-match index: sorted normalized terms -> row ids in glossary order
+    by_key: Dict[str, List[int]] = {}
+    display: Dict[str, str] = {}
+    for row_id, rec in enumerate(rows):
+        term = rec["Term"].strip()
+        key = normalize_term(term)
+        display.setdefault(key, term)
+        by_key.setdefault(key, []).append(row_id)
+    sections.update(_postings("exact", by_key, weighted=False))
+    sections.update(_string_table("exact.terms", [display[key] for key in sorted(by_key)]))
+
+    lexical = LexicalIndex([glossary_record_fields(rec) for rec in rows])
+    sections.update(_postings("bm25", lexical.postings, weighted=True))
+    sections.update(_postings("ngram", lexical.ngram_postings, weighted=False))
+    sections["ngram.counts"] = array("I", lexical.ngram_counts)
+
+    layout, offset = {}, 0
+    for name, values in sections.items():
+        nbytes = len(values) * values.itemsize
+        layout[name] = [offset, nbytes, values.typecode]
+        offset = _align(offset + nbytes)
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "rows": len(rows),
+        "source_sha256": source_sha256,
+        "ngram": lexical.ngram,
+        "sections": layout,
+    }).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        data_start = f.tell()
+        for name, values in sections.items():
+            f.write(b"\0" * (data_start + layout[name][0] - f.tell()))
+            values.tofile(f)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote glossary snapshot with {len(rows)} rows to {path}")
+    return len(rows)
+
+
+# ============================================================================
+# Reader
+# ============================================================================
+
+class StringTable:
+    """Strings decoded on access from an offsets array and a UTF-8 blob."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def find(self, value: str) -> int:
+        """Index of value in a sorted table, or -1."""
+        i = bisect_left(self, value)
+        return i if i < len(self) and self[i] == value else -1
+
+
+class Postings:
+    """Read-only mapping of sorted keys to doc ids (or (doc id, weight) pairs) without building a dict."""
+
+    def __init__(self, keys: StringTable, offsets: memoryview, docs: memoryview, weights: memoryview = None):
+        self.keys = keys
+        self.offsets = offsets
+        self.docs = docs
+        self.weights = weights
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, key: str, default=None):
+        i = self.keys.find(key)
+        if i < 0:
+            return default
+        start, end = self.offsets[i], self.offsets[i + 1]
+        if self.weights is None:
+            return self.docs[start:end]
+        return zip(self.docs[start:end], self.weights[start:end])
+
+
+class GlossarySnapshot:
+    """Memory-mapped glossary snapshot."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a glossary snapshot")
+        (header_len,) = _HEADER_LEN.unpack_from(buffer, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LEN.size
+        self.header = json.loads(bytes(buffer[header_start:header_start + header_len]))
+        if self.header.get("version") != FORMAT_VERSION or self.header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path}: unsupported snapshot version or byte order")
+        data_start = _align(header_start + header_len)
+        self._sections = {
+            name: buffer[data_start + offset:data_start + offset + nbytes].cast(typecode)
+            for name, (offset, nbytes, typecode) in self.header["sections"].items()
+        }
+        self.columns = {column: self._strings(f"col.{column}") for column in COLUMNS}
+        self.exact = Postings(self._strings("exact.keys"), self._sections["exact.offsets"],
+                              self._sections["exact.docs"])
+        self.exact_terms = self._strings("exact.terms")
+
+    def _strings(self, name: str) -> StringTable:
+        return StringTable(self._sections[f"{name}.offsets"], self._sections[f"{name}.data"])
+
+    def _postings(self, name: str) -> Postings:
+        return Postings(self._strings(f"{name}.keys"), self._sections[f"{name}.offsets"],
+                        self._sections[f"{name}.docs"], self._sections.get(f"{name}.weights"))
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    def row(self, i: int) -> Dict[str, str]:
+        """Glossary row i as a record dict."""
+        return {column: values[i] for column, values in self.columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return (self.row(i) for i in range(len(self)))
+
+    def is_current(self, source_path: str) -> bool:
+        """False when the JSON the snapshot was exported from has changed since."""
+        expected = self.header.get("source_sha256")
+        actual = source_digest(source_path)
+        if expected is None or actual is None:
+            return True
+        return actual == expected
+
+    def exact_match_views(self) -> Tuple["_ExactTerms", "_ExactCandidates"]:
+        """(terms, candidates) mappings keyed by normalized term, for GlossaryIndex."""
+        return _ExactTerms(self), _ExactCandidates(self)
+
+    def lexical_views(self) -> Dict[str, Any]:
+        """Attributes that back a LexicalIndex without rebuilding it."""
+        return {
+            "records": _LexicalRecords(self),
+            "ngram": self.header["ngram"],
+            "postings": self._postings("bm25"),
+            "ngram_postings": self._postings("ngram"),
+            "ngram_counts": self._sections["ngram.counts"],
+        }
+
+
+class _ExactTerms:
+    def __init__(self, snapshot: GlossarySnapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, key: str) -> str:
+        i = self.snapshot.exact.keys.find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self.snapshot.exact_terms[i]
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        keys, terms = self.snapshot.exact.keys, self.snapshot.exact_terms
+        return ((keys[i], terms[i]) for i in range(len(keys)))
+
+
+class _ExactCandidates:
+    def __init__(self, snapshot: GlossarySnapshot):
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self.snapshot.exact)
+
+    def get(self, key: str, default=None) -> Optional[List[Dict[str, Any]]]:
+        rows = self.snapshot.exact.get(key)
+        if rows is None:
+            return default
+        return [glossary_row_to_hit(self.snapshot.row(i)) for i in rows]
+
+
+class _LexicalRecords:
+    def __init__(self, snapshot: GlossarySnapshot):
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return len(self.snapshot)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return glossary_record_fields(self.snapshot.row(i))
+
+
+def load_snapshot(path: str, source_path: str) -> Optional[GlossarySnapshot]:
+    """Open the snapshot at path, or None if it is missing, unreadable or stale."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = GlossarySnapshot(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Glossary snapshot {path} unusable: {e}; loading JSON instead")
+        return None
+    if not snapshot.is_current(source_path):
+        logger.warning(f"Glossary snapshot {path} was exported from a different {source_path}; loading JSON instead")
+        return None
+    logger.info(f"Memory-mapped glossary snapshot with {len(snapshot)} rows from {path}")
+    return snapshot
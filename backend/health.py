@@ -0,0 +1,133 @@
+"""
+Gov Terms AI - Liveness and readiness
+Dependency checks run in the background on a fixed interval and probes read
+the cached result, so health probes never call Pinecone themselves. A
+dependency only counts as down after several consecutive failed checks,
+so one upstream blip doesn't take every replica out of rotation at once.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyCheck:
+    """One dependency probe and its rolling state."""
+
+    def __init__(self, name: str, check: Callable[[], Any], required: bool = True):
+        self.name = name
+        self.check = check
+        self.required = required
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.latency_ms: Optional[float] = None
+
+    def status(self, failure_threshold: int) -> Dict[str, Any]:
+        if self.consecutive_failures == 0 and self.latency_ms is None:
+            state = "pending"
+        elif self.consecutive_failures == 0:
+            state = "ok"
+        elif self.consecutive_failures < failure_threshold:
+            state = "degraded"
+        else:
+            state = "down"
+        status = {"status": state, "required": self.required, "latency_ms": self.latency_ms}
+        if self.error:
+            status["error"] = self.error
+            status["consecutive_failures"] = self.consecutive_failures
+        return status
+
+
+class DependencyMonitor:
+    """Refresh dependency checks every interval seconds and serve the cached status."""
+
+    def __init__(self, executor: Executor, interval: float = 30.0, timeout: float = 5.0,
+                 failure_threshold: int = 3):
+        self.executor = executor
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.checks: Dict[str, DependencyCheck] = {}
+        self.started_at = time.monotonic()
+        self.checked_at: Optional[float] = None
+        self.checked_at_wall: Optional[str] = None
+
+    def add(self, name: str, check: Callable[[], Any], required: bool = True):
+        """Register a blocking function or coroutine function; its return value is kept as the dependency's details."""
+        self.checks[name] = DependencyCheck(name, check, required)
+
+    async def _run_check(self, dependency: DependencyCheck):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(dependency.check):
+                pending = dependency.check()
+            else:
+                pending = loop.run_in_executor(self.executor, dependency.check)
+            dependency.result = await asyncio.wait_for(pending, self.timeout)
+            dependency.consecutive_failures = 0
+            dependency.error = None
+        except Exception as e:
+            dependency.consecutive_failures += 1
+            dependency.error = str(e) or type(e).__name__
+            if dependency.consecutive_failures == self.failure_threshold:
+                logger.error(f"Dependency {dependency.name} is down: {dependency.error}")
+            else:
+                logger.warning(f"Dependency check {dependency.name} failed: {dependency.error}")
+        dependency.latency_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    async def refresh(self):
+        """Run every check concurrently once."""
+        await asyncio.gather(*(self._run_check(dependency) for dependency in self.checks.values()))
+        self.checked_at = time.monotonic()
+        self.checked_at_wall = datetime.now(timezone.utc).isoformat()
+
+    async def run(self):
+        """Refresh forever; started as a background task by the app lifespan."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Dependency refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed refresh, or None before the first."""
+        if self.checked_at is None:
+            return None
+        return round(time.monotonic() - self.checked_at, 1)
+
+    def result(self, name: str) -> Any:
+        """Return value of the last successful run of a check."""
+        return self.checks[name].result
+
+    def readiness(self) -> Dict[str, Any]:
+        """Cached readiness: every required dependency up and the last refresh recent."""
+        age = self.age()
+        stale = age is None or age > 3 * self.interval + self.timeout
+        dependencies = {name: dep.status(self.failure_threshold) for name, dep in self.checks.items()}
+        ready = not stale and all(
+            status["status"] in ("ok", "degraded")
+            for status in dependencies.values() if status["required"]
+        )
+        return {
+            "ready": ready,
+            "checked_at": self.checked_at_wall,
+            "check_age_s": age,
+            "check_interval_s": self.interval,
+            "dependencies": dependencies,
+        }
+
+    def liveness(self) -> Dict[str, Any]:
+        """Constant-time liveness: the event loop is serving requests."""
+        return {
+            "status": "alive",
+            "uptime_s": round(time.monotonic() - self.started_at, 1),
+            "check_age_s": self.age(),
+        }
@@ -0,0 +1,190 @@
+"""
+Gov Terms AI - Lexical retrieval
+In-process BM25 and character n-gram indexes over the glossary text, fused
+with vector hits by reciprocal rank fusion.
+"""
+
+import logging
+import math
+import re
+from collections import defaultdict
+from typing import List, Dict, Any, Tuple
+
+from retrievers import shape_hit
+
+logger = logging.getLogger(__name__)
+
+RRF_K = 60
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+def char_ngrams(text: str, n: int = 3) -> set:
+    """Padded character n-grams of a term with punctuation and spaces removed."""
+    compact = f"#{_NON_ALNUM.sub('', text.lower())}#"
+    if len(compact) <= n:
+        return {compact}
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+def hit_key(hit: Dict[str, Any]) -> Tuple[str, str]:
+    """Identity of a hit across retrievers."""
+    return hit["text"], hit["entity"]
+
+
+class LexicalIndex:
+    """
+    BM25 over the full `text` field plus character trigrams over the term.
+    BM25 weights are precomputed per posting, so a query costs one dict
+    accumulation per query token.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], k1: float = 1.2, b: float = 0.75, ngram: int = 3):
+        self.records = records
+        self.ngram = ngram
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.ngram_postings: Dict[str, List[int]] = defaultdict(list)
+        self.ngram_counts: List[int] = []
+
+        term_freqs = []
+        doc_freq: Dict[str, int] = defaultdict(int)
+        for doc_id, rec in enumerate(records):
+            counts: Dict[str, int] = defaultdict(int)
+            for token in tokenize(rec.get("text", "")):
+                counts[token] += 1
+            term_freqs.append(counts)
+            for token in counts:
+                doc_freq[token] += 1
+
+            term = rec.get("text", "").split(":", 1)[0]
+            grams = char_ngrams(term, ngram)
+            self.ngram_counts.append(len(grams))
+            for gram in grams:
+                self.ngram_postings[gram].append(doc_id)
+
+        n_docs = len(records)
+        doc_lens = [sum(counts.values()) for counts in term_freqs]
+        avg_len = (sum(doc_lens) / n_docs) if n_docs else 0.0
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc_id, counts in enumerate(term_freqs):
+            norm = k1 * (1 - b + b * doc_lens[doc_id] / avg_len) if avg_len else k1
+            for token, tf in counts.items():
+                idf = _bm25_idf(n_docs, doc_freq[token])
+                postings[token].append((doc_id, idf * tf * (k1 + 1) / (tf + norm)))
+        self.postings = dict(postings)
+        self.ngram_postings = dict(self.ngram_postings)
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "LexicalIndex":
+        """Use the precomputed postings of a memory-mapped GlossarySnapshot."""
+        index = cls([])
+        for name, value in snapshot.lexical_views().items():
+            setattr(index, name, value)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def bm25(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """(doc id, BM25 score) pairs, best first."""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            for doc_id, weight in self.postings.get(token, ()):
+                scores[doc_id] += weight
+        return _top(scores, limit)
+
+    def ngram_match(self, query: str, limit: int, min_similarity: float = 0.5) -> List[Tuple[int, float]]:
+        """(doc id, similarity) pairs for the terms most similar to the query by trigram Dice coefficient."""
+        grams = char_ngrams(query, self.ngram)
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for doc_id in self.ngram_postings.get(gram, ()):
+                overlap[doc_id] += 1
+        scores = {
+            doc_id: 2 * shared / (len(grams) + self.ngram_counts[doc_id])
+            for doc_id, shared in overlap.items()
+        }
+        return _top({d: s for d, s in scores.items() if s >= min_similarity}, limit)
+
+    def hit(self, doc_id: int, score: float) -> Dict[str, Any]:
+        """Shape a glossary row like a search_database hit."""
+        return shape_hit(score, self.records[doc_id])
+
+
+def _bm25_idf(n_docs: int, df: int) -> float:
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def _top(scores: Dict[int, float], limit: int) -> List[Tuple[int, float]]:
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class HybridRetriever:
+    """
+    Fuse a vector retriever with the lexical index by reciprocal rank fusion.
+    The vector side is asked for `candidates` hits and the fused list is cut
+    back to top_k. Hits keep their retriever's `score` and carry the fused
+    score, scaled to 0-1, as `rrf_score`.
+    """
+
+    def __init__(self, vector, lexical: LexicalIndex, candidates: int = 10, short_query_chars: int = 32):
+        self.vector = vector
+        self.lexical = lexical
+        self.candidates = candidates
+        self.short_query_chars = short_query_chars
+        self.name = vector.name
+        self.namespace = f"{vector.namespace}+lexical"
+
+    def lexical_rankings(self, query: str) -> List[List[Dict[str, Any]]]:
+        """
+        BM25 and (for short, acronym-like queries) trigram rankings as hit lists.
+        BM25 hits are scored relative to the best BM25 match and trigram hits by
+        their similarity, so a lexical-only hit still has a 0-1 score.
+        """
+        ranked = self.lexical.bm25(query, self.candidates)
+        best = ranked[0][1] if ranked else 0.0
+        rankings = [[self.lexical.hit(d, score / best) for d, score in ranked]]
+        if len(query) <= self.short_query_chars:
+            similar = self.lexical.ngram_match(query, self.candidates)
+            rankings.append([self.lexical.hit(d, similarity) for d, similarity in similar])
+        return rankings
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Return the top_k fused hits for query, best first."""
+        rankings = [self.vector.search(query, max(top_k, self.candidates))]
+        rankings.extend(self.lexical_rankings(query))
+        return fuse(rankings, top_k)
+
+    def describe(self) -> Dict[str, Any]:
+        """Dependency status for /health."""
+        return {**self.vector.describe(), "lexical_documents": len(self.lexical)}
+
+
+def fuse(rankings: List[List[Dict[str, Any]]], top_k: int, k: int = RRF_K) -> List[Dict[str, Any]]:
+    """
+    Reciprocal rank fusion of several ranked hit lists.
+    Each hit keeps the fields and `score` of the first ranking that has it;
+    `rrf_score` is its fused score divided by the best possible, so it is at most 1.
+    """
+    scores: Dict[Tuple[str, str], float] = defaultdict(float)
+    hits: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for ranking in rankings:
+        seen = set()
+        for rank, hit in enumerate(ranking, start=1):
+            key = hit_key(hit)
+            # A row listed twice in one ranking (e.g. duplicate vectors) only counts at its best rank
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] += 1.0 / (k + rank)
+            # Prefer the vector hit's fields (first ranking) when both have the row
+            hits.setdefault(key, hit)
+    best = 1.0 / (k + 1) * len(rankings)
+    ranked = sorted(scores, key=scores.__getitem__, reverse=True)[:top_k]
+    return [{**hits[key], "rrf_score": round(scores[key] / best, 3)} for key in ranked]
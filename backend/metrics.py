@@ -0,0 +1,266 @@
+"""
+Gov Terms AI - Request metrics
+Per-stage latency of the query pipeline, exported in the Prometheus text
+format on /metrics and as a Server-Timing header on each response.
+
+Stages append (name, nanoseconds) to the current request's RequestTimings,
+held in a context variable so executor threads started through run_stage see
+it too. Histograms are updated once per request, on the event loop, after the
+endpoint has labelled the request with how it was served, into series bound
+once per label set. The hot path is two perf_counter_ns() calls and a list
+append per stage, and the Server-Timing header is one % format per request.
+"""
+
+import math
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+NS_PER_SECOND = 1_000_000_000
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+class Histogram:
+    """
+    Prometheus-style histogram of durations with one series per label tuple,
+    observed in integer nanoseconds and exported in seconds. Not thread-safe;
+    observe from the event loop.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Bucket upper bounds in nanoseconds
+        self.bounds = tuple(round(bound * NS_PER_SECOND) for bound in self.buckets)
+        # labels -> per-bucket counts (last one is +Inf) followed by the sum in nanoseconds
+        self._series: Dict[Tuple[str, ...], List[int]] = {}
+
+    def series(self, labels: Tuple[str, ...]) -> List[int]:
+        """The series of one label tuple, for callers that bind it once and observe into it repeatedly."""
+        try:
+            return self._series[labels]
+        except KeyError:
+            return self._series.setdefault(labels, [0] * (len(self.buckets) + 2))
+
+    def observe(self, nanoseconds: int, labels: Tuple[str, ...]):
+        series = self.series(labels)
+        series[bisect_left(self.bounds, nanoseconds)] += 1
+        series[-1] += nanoseconds
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, series in sorted(self._series.items()):
+            label_text = _labels(self.labelnames, labels)
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-1] / NS_PER_SECOND}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+
+class RequestTimings:
+    """Stage durations of one request and the labels it is reported under."""
+
+    __slots__ = ("started", "stages", "served_by", "cache", "_columns", "_columns_len")
+
+    def __init__(self):
+        self.started = perf_counter_ns()
+        self.stages: List[Tuple[str, int]] = []
+        self.served_by = "none"
+        self.cache = "none"
+        self._columns: Tuple[Tuple[str, ...], Tuple[int, ...]] = ((), ())
+        self._columns_len = 0
+
+    def columns(self) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+        """(stage names, nanoseconds) in first-run order, summed when a stage ran more than once (e.g. per batch item)."""
+        # Computed for the header and again at the end only if a streamed body added stages
+        if self._columns_len != len(self.stages):
+            names, durations = zip(*self.stages)
+            if names not in _distinct_sequences:
+                if len(set(names)) == len(names):
+                    _distinct_sequences.add(names)
+                else:
+                    totals: Dict[str, int] = {}
+                    for name, nanoseconds in self.stages:
+                        totals[name] = totals.get(name, 0) + nanoseconds
+                    names, durations = tuple(totals), tuple(totals.values())
+            self._columns, self._columns_len = (names, durations), len(self.stages)
+        return self._columns
+
+    def totals(self) -> Dict[str, int]:
+        """Nanoseconds per stage, summed when a stage ran more than once."""
+        return dict(zip(*self.columns()))
+
+    def elapsed(self) -> int:
+        """Nanoseconds since the request started."""
+        return perf_counter_ns() - self.started
+
+    def server_timing(self, total: int) -> str:
+        """Server-Timing header value for a request that took `total` nanoseconds, durations in milliseconds."""
+        names, durations = self.columns()
+        return _server_timing_format(names) % tuple([nanoseconds / 1e6 for nanoseconds in (*durations, total)])
+
+
+# Stage name sequences seen without repeats, so columns() checks each one once
+_distinct_sequences: Set[Tuple[str, ...]] = set()
+
+# Stage name sequence -> Server-Timing format string. An endpoint runs the same
+# few sequences, so the header is built with one % operation per request.
+_server_timing_formats: Dict[Tuple[str, ...], str] = {}
+
+
+def _server_timing_format(names: Tuple[str, ...]) -> str:
+    try:
+        return _server_timing_formats[names]
+    except KeyError:
+        template = ", ".join(f"{name};dur=%.2f" for name in (*names, "total"))
+        return _server_timing_formats.setdefault(names, template)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class timed_stage:
+    """Context manager timing one pipeline stage of the current request; a no-op outside a request."""
+
+    # A class rather than a function returning one saves a call per stage
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timings = _current_timings.get()
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+
+    def __exit__(self, exc_type, exc, tb):
+        timings = self.timings
+        if timings is not None:
+            timings.stages.append((self.name, perf_counter_ns() - self.start))
+
+
+def stage_timings() -> Dict[str, float]:
+    """Milliseconds per stage of the current request so far, plus its running total; {} outside a request."""
+    timings = _current_timings.get()
+    if timings is None:
+        return {}
+    stages = {name: round(nanoseconds / 1e6, 2) for name, nanoseconds in timings.totals().items()}
+    stages["total"] = round(timings.elapsed() / 1e6, 2)
+    return stages
+
+
+def label_request(served_by: str, cache: str):
+    """Record how the current request was answered (exact_match, rag, ... / l1, l2, miss, bypass)."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.served_by = served_by
+        timings.cache = cache
+
+
+class Metrics:
+    """Latency histograms plus counters read from the app's own stats when /metrics is scraped."""
+
+    def __init__(self, prefix: str = "gov_terms"):
+        self.stage_seconds = Histogram(
+            f"{prefix}_stage_seconds", "Time spent in each query pipeline stage.",
+            ("stage", "served_by", "cache"),
+        )
+        self.request_seconds = Histogram(
+            f"{prefix}_request_seconds", "Query request latency, including streamed bodies.",
+            ("path", "status", "served_by", "cache"),
+        )
+        self._collectors: List[Tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+        # (path, status, served_by, cache, stage names) -> the request_seconds series followed by the
+        # stage_seconds series in stage order, so record() does one lookup and builds no label tuples
+        self._bound: Dict[Tuple[Any, ...], List[List[int]]] = {}
+
+    def add_collector(self, name: str, documentation: str, kind: str, collect: Callable[[], Iterable[Sample]]):
+        """Export (labels, value) samples from collect() as a counter or gauge on every scrape."""
+        self._collectors.append((name, documentation, kind, collect))
+
+    def record(self, path: str, status: str, timings: RequestTimings, total: int):
+        """Add a finished request that took `total` nanoseconds to the histograms."""
+        names, durations = timings.columns()
+        key = (path, status, timings.served_by, timings.cache, names)
+        try:
+            bound = self._bound[key]
+        except KeyError:
+            bound = self._bind(key)
+        # Both histograms use STAGE_BUCKETS
+        bounds = self.stage_seconds.bounds
+        for series, nanoseconds in zip(bound, (total, *durations)):
+            series[bisect_left(bounds, nanoseconds)] += 1
+            series[-1] += nanoseconds
+
+    def _bind(self, key: Tuple[Any, ...]) -> List[List[int]]:
+        path, status, served_by, cache, names = key
+        bound = [self.request_seconds.series((path, status, served_by, cache))]
+        bound += [self.stage_seconds.series((name, served_by, cache)) for name in names]
+        self._bound[key] = bound
+        return bound
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        lines = self.stage_seconds.render() + self.request_seconds.render()
+        for name, documentation, kind, collect in self._collectors:
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            for labels, value in collect():
+                value = float(value)
+                label_text = f"{{{_labels(labels, labels.values())}}}" if labels else ""
+                text = int(value) if value.is_integer() else ("NaN" if math.isnan(value) else value)
+                lines.append(f"{name}{label_text} {text}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times requests to the given paths, adds a
+    Server-Timing header and records the request into Metrics when the body
+    is done. A plain ASGI callable rather than BaseHTTPMiddleware, which would
+    add a task and a copy of the body per request.
+    """
+
+    def __init__(self, app: Any, metrics: Metrics, paths: Iterable[str]):
+        self.app = app
+        self.metrics = metrics
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        status = "500"
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                # Built when the headers go out; streamed responses only report the stages finished by then
+                header = timings.server_timing(timings.elapsed())
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
+            self.metrics.record(scope["path"], status, timings, timings.elapsed())
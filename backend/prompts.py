@@ -0,0 +1,228 @@
+"""
+Gov Terms AI - Gemini prompt templates
+The static instruction block is compiled once into a system instruction;
+each request only sends the query and a compact form of the search hits.
+"""
+
+import json
+from typing import List, Dict, Any, Optional, Union
+
+SYSTEM_INSTRUCTION = """You define Australian government terminology for the public, using only the Reference Context supplied with each query.
+
+Rules:
+- Select the definition from the Reference Context. If the term is not defined there, set "definition" to exactly: "I apologise, but the term you're asking about is not defined in the knowledge I currently have."
+- "elaboration" may use general knowledge: 1-2 helpful sentences on what the term is or does.
+- Tone: helpful, professional, plain English.
+
+Selection: first classify the query as ACRONYM (short abbreviation, usually all caps, e.g. IGA, PBS, ATO) or GENERAL TERM (word or phrase, e.g. tax, grant). Apply the steps in order, moving on only while candidates are still tied:
+ACRONYM: 1. shortest definition text ("chars"); 2. highest "score"; 3. if every tied candidate has a "body_type", prefer "Non-corporate Commonwealth entity"; 4. prefer the more central government body (e.g. Department of the Prime Minister and Cabinet).
+GENERAL TERM: 1. highest "score"; 2. the same body_type rule; 3. the same central-body rule.
+
+Reference Context lists one candidate per line as JSON with "index", "score", "entity", "body_type", "chars" (full text length) and "text".
+
+Output a single JSON object and nothing else:
+{"definition": "<term expansion or short definition, e.g. NDIS: National Disability Insurance Scheme>", "elaboration": "<1-2 sentences>", "source_entity": "<entity of the chosen candidate>", "source_index": <index of the chosen candidate, 0 if none>}"""
+
+BATCH_INSTRUCTION = """Batch mode: each numbered item below has its own User Query and Reference Context. Apply the rules to every item independently and, instead of a single object, output a JSON array with one answer object per item, in order, each with an extra "id" key holding the item number."""
+
+# Gemini structured output schemas for compact mode
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "definition": {"type": "string"},
+        "elaboration": {"type": "string"},
+        "source_entity": {"type": "string"},
+        "source_index": {"type": "integer"},
+    },
+    "required": ["definition", "elaboration", "source_entity", "source_index"],
+}
+
+BATCH_RESPONSE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "integer"}, **RESPONSE_SCHEMA["properties"]},
+        "required": ["id", *RESPONSE_SCHEMA["required"]],
+    },
+}
+
+# Original inline prompt, kept for PROMPT_MODE=legacy comparisons
+LEGACY_INSTRUCTIONS = """
+            You are an expert AI assistant for defining Australian government terminology. Your mission is to provide a clear and concise definition for a given term, acting as a trusted resource for the public.
+
+                Primary Goal:
+                Your task is to define the term provided in the "User Query" using only the information available 
+                in the "Reference Context".
+
+                Critical Rules:
+
+                Strict Sourcing: Use the "Reference Context" to identify and select the correct term definition. If the 
+                term is not defined there, you must respond with the exact phrase: "I apologise, but the term 
+                you're asking about is not defined in the knowledge I currently have."
+
+                Elaboration Guidelines: For the elaboration field, you may use your general knowledge to provide 
+                a helpful 1-2 sentence explanation of what the term is or what it does. The elaboration should be 
+                informative and help the public understand the concept, even if the Reference Context doesn't 
+                contain detailed explanatory information.
+
+                Tone: Your tone must be helpful, professional, and easy for a member of the public to understand.
+
+                Definition Selection Logic:
+                Your first and most important step is to classify the User Query and then follow the appropriate
+                  set of rules below.
+
+                Step 1: Classify the User Query
+
+                First, determine if the query is an 'ACRONYM' or a 'GENERAL TERM'.
+
+                An 'ACRONYM' is a short-form abbreviation, usually in all-caps (e.g., 'IGA', 'PBS', 'ATO').
+
+                A 'GENERAL TERM' is a standard word or phrase (e.g., 'tax', 'grant', 'commonwealth entity').
+
+                Step 2: Apply Logic Based on Classification
+
+                IF the query is an 'ACRONYM':
+                Follow these rules in precise sequential order:
+
+                Prioritise Generality: First, identify the definition with the shortest definition text.
+                A shorter, more concise definition is considered more foundational.
+
+                Break Ties with Score: If multiple definitions share the same shortest length, select 
+                the one with the highest 'score' from that group.
+
+                Conditionally Break Ties with Entity Type: If a tie still persists, check if all tied candidates
+                  have a populated 'BodyType' field. If they do, choose the 'Non-corporate Commonwealth entity'.
+                    Otherwise, skip this rule.
+
+                Final Tie-Breaker: If the tie still cannot be resolved, select the definition from the more
+                  central government body (e.g., 'Department of the Prime Minister and Cabinet').
+
+                IF the query is a 'GENERAL TERM':
+                Follow these rules in precise sequential order:
+
+                Prioritise Highest Score: First, identify the definition with the highest 'score'.
+
+                Break Ties with Entity Type: If multiple definitions share the exact same highest score, check 
+                if all tied candidates have a populated 'BodyType' field. If they do, choose the 'Non-corporate
+                  Commonwealth entity'. Otherwise, skip this rule.
+
+                Final Tie-Breaker: If the tie still cannot be resolved, select the definition from the more
+                  central government body (e.g., 'Department of the Prime Minister and Cabinet').
+
+                **Response Format:**
+                After choosing the correct source document using the logic above, you **must** structure your final output as a single JSON object. Do not include any text or formatting outside of this JSON object. The JSON must have the following structure:
+
+                * A top-level key `"definition"` containing ONLY the term expansion or short definition (e.g., "NDIS: National Disability Insurance Scheme" or "Tax: A compulsory financial charge").
+                * A top-level key `"elaboration"` containing 1-2 sentences that provide a general explanation of what the term is or what it does. Use your knowledge to make this explanation helpful and informative for the public, even if the Reference Context lacks detailed explanatory information.
+                * A top-level key `"source_entity"` containing only the **string value** of the `entity` field from the source document you chose.
+
+                **Example JSON Output Structure:**
+                ```json
+                {
+                "definition": "NDIS: National Disability Insurance Scheme",
+                "elaboration": "This is a scheme that provides services and support for people with permanent and significant disability, their families and carers. It aims to help people with disability achieve their goals and participate more fully in the community.",
+                "source_entity": "Department of Social Services"
+                }
+
+"""
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Cap a reference text at max_chars, marking the cut."""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + "…"
+
+
+class PromptTemplate:
+    """Builds Gemini request contents for single and batched queries."""
+
+    def __init__(self, mode: str = "compact", max_text_chars: int = 500):
+        if mode not in ("compact", "legacy"):
+            raise ValueError(f"Unknown prompt mode: {mode}")
+        self.mode = mode
+        self.max_text_chars = max_text_chars
+
+    @property
+    def system_instruction(self) -> Optional[str]:
+        """Instruction block for GenerativeModel(system_instruction=...), None in legacy mode."""
+        return SYSTEM_INSTRUCTION if self.mode == "compact" else None
+
+    def build_context(self, search_results: List[Dict[str, Any]]) -> str:
+        """Format search results as the prompt's reference context."""
+        if self.mode == "legacy":
+            return "\n".join([
+                f"{term['text']} Score: {term['score']} Entity: {term['entity']} BodyType:{term['body_type']} "
+                for term in search_results
+            ])
+        return "\n".join(
+            json.dumps({
+                "index": index,
+                "score": term["score"],
+                "entity": term["entity"],
+                "body_type": term["body_type"],
+                "chars": len(term["text"]),
+                "text": truncate_text(term["text"], self.max_text_chars),
+            }, ensure_ascii=False, separators=(",", ":"))
+            for index, term in enumerate(search_results, start=1)
+        )
+
+    def generation_config(self, batch: bool = False) -> Optional[Dict[str, Any]]:
+        """JSON response mode with a schema, so answers never arrive wrapped in fences."""
+        if self.mode == "legacy":
+            return None
+        return {
+            "response_mime_type": "application/json",
+            "response_schema": BATCH_RESPONSE_SCHEMA if batch else RESPONSE_SCHEMA,
+        }
+
+    def build(self, user_query: str, search_results: List[Dict[str, Any]]) -> str:
+        """Request contents for one query."""
+        context = self.build_context(search_results)
+        if self.mode == "legacy":
+            return LEGACY_INSTRUCTIONS + f"""
+                User Query: "{user_query}"
+
+                Reference Context:
+                {context}
+                        """
+        return f"User Query: {json.dumps(user_query, ensure_ascii=False)}\nReference Context:\n{context}"
+
+    def build_batch(self, items: List[Dict[str, Any]]) -> str:
+        """Request contents defining several independent queries at once."""
+        blocks = "\n\n".join(
+            f"Item {item['id']}:\n{self.build(item['query'], item['search_results'])}"
+            if self.mode == "compact" else
+            f"Item {item['id']}:\nUser Query: \"{item['query']}\"\nReference Context:\n"
+            f"{self.build_context(item['search_results'])}"
+            for item in items
+        )
+        prefix = LEGACY_INSTRUCTIONS if self.mode == "legacy" else ""
+        return f"{prefix}{BATCH_INSTRUCTION}\n\n{blocks}"
+
+
+def extract_json(response_text: str) -> Optional[Union[Dict[str, Any], List[Any]]]:
+    """
+    Parse a JSON answer, tolerating legacy output wrapped in ```json fences
+    or surrounded by stray text. Returns None when nothing parses.
+    """
+    text = response_text.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    # Fall back to the outermost object or array, whichever opens first (absent ones sort last)
+    brackets = sorted((("{", "}"), ("[", "]")), key=lambda pair: (text.find(pair[0]) % (len(text) + 1)))
+    for opener, closer in brackets:
+        start, end = text.find(opener), text.rfind(closer)
+        if 0 <= start < end:
+            try:
+                return json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token) for offline comparisons."""
+    return (len(text) + 3) // 4
@@ -0,0 +1,123 @@
+"""
+Gov Terms AI - Service providers
+Lazily created upstream clients (Pinecone, Gemini, the vector retriever).
+Factories run on first use or when warmed in the background at startup, and
+a missing key or SDK makes only the dependent endpoints unavailable instead
+of failing the import. Tests and load tests override providers with local fakes.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(RuntimeError):
+    """A service could not be created (missing key, SDK, store or network)."""
+
+
+class Provider:
+    """A service created once by its factory, on first use or in warm()."""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.error: Optional[str] = None
+        self.init_seconds: Optional[float] = None
+        self._instance: Any = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """Return the service, creating it first if needed; raises ProviderUnavailable."""
+        if self._instance is not None:
+            return self._instance
+        with self._lock:
+            if self._instance is None:
+                start = time.perf_counter()
+                try:
+                    instance = self.factory()
+                except Exception as e:
+                    # Not cached: the next call retries, e.g. after a network blip
+                    self.error = str(e)
+                    raise ProviderUnavailable(f"{self.name} unavailable: {e}") from e
+                self.init_seconds = time.perf_counter() - start
+                self.error = None
+                self._instance = instance
+                logger.info(f"Initialized {self.name} in {self.init_seconds * 1000:.0f} ms")
+        return self._instance
+
+    def override(self, instance: Any):
+        """Use instance instead of calling the factory."""
+        with self._lock:
+            self._instance = instance
+            self.error = None
+
+    @property
+    def ready(self) -> bool:
+        return self._instance is not None
+
+    def status(self) -> str:
+        if self._instance is not None:
+            return "ready"
+        return f"error: {self.error}" if self.error else "not_initialized"
+
+
+class Providers:
+    """Registry of named providers."""
+
+    def __init__(self):
+        self._providers: Dict[str, Provider] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> Provider:
+        provider = Provider(name, factory)
+        self._providers[name] = provider
+        return provider
+
+    def __getitem__(self, name: str) -> Provider:
+        return self._providers[name]
+
+    def get(self, name: str) -> Any:
+        return self._providers[name].get()
+
+    def override(self, name: str, instance: Any):
+        self._providers[name].override(instance)
+
+    async def warm(self, executor: Executor, names: Optional[List[str]] = None):
+        """Create providers concurrently on executor threads; failures are logged, not raised."""
+        loop = asyncio.get_running_loop()
+        selected = [self._providers[name] for name in (names or list(self._providers))]
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(executor, provider.get) for provider in selected),
+            return_exceptions=True,
+        )
+        for provider, outcome in zip(selected, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Warm-up of {provider.name} failed: {outcome}")
+
+    def status(self) -> Dict[str, str]:
+        """Per-provider status for /health."""
+        return {name: provider.status() for name, provider in self._providers.items()}
+
+
+class LazyRetriever:
+    """
+    Retriever whose backend comes from a provider. name and namespace are
+    known up front, so cache keys and HybridRetriever don't force creation.
+    """
+
+    def __init__(self, name: str, namespace: str, provider: Provider):
+        self.name = name
+        self.namespace = namespace
+        self.provider = provider
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Return the top_k hits for query, best first."""
+        return self.provider.get().search(query, top_k)
+
+    def describe(self) -> Dict[str, Any]:
+        """Dependency status for /health."""
+        return self.provider.get().describe()
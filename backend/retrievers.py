@@ -0,0 +1,210 @@
+"""
+Gov Terms AI - Retrieval backends
+Pluggable retrievers behind search_database: the hosted Pinecone index, or a
+local in-memory vector store with precomputed embeddings.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+E5_MODEL_NAME = "intfloat/multilingual-e5-large"
+PINECONE_EMBED_MODEL = "multilingual-e5-large"
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.jsonl"
+HNSW_FILE = "hnsw.bin"
+
+
+def shape_hit(score: float, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape index fields into the hit dict returned by search_database."""
+    return {
+        "score": round(float(score), 3),
+        "text": fields.get("text", ""),
+        "entity": fields.get("Entity", ""),
+        "body_type": fields.get("BodyType", ""),
+        "portfolio": fields.get("Portfolio", ""),
+        "url": fields.get("Url", "")
+    }
+
+
+class PineconeRetriever:
+    """Search the hosted Pinecone index with integrated embedding."""
+
+    def __init__(self, index, index_name: str, namespace: str):
+        self.index = index
+        self.name = index_name
+        self.namespace = namespace
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Return the top_k hits for query, best first."""
+        records = self.index.search_records(
+            namespace=self.namespace,
+            query={
+                "inputs": {"text": query},
+                "top_k": top_k
+            } # type: ignore
+        )
+        hits = records.get('result', {}).get('hits', [])
+        results = [shape_hit(hit.get('_score'), hit.get('fields', {})) for hit in hits]
+        results.sort(key=lambda x: x["score"], reverse=True)
+        return results
+
+    def describe(self) -> Dict[str, Any]:
+        """Dependency status for /health."""
+        index_stats = self.index.describe_index_stats()
+        return {
+            "retriever": "pinecone",
+            "vector_count": index_stats.total_vector_count if hasattr(index_stats, 'total_vector_count') else "unknown"
+        }
+
+
+# ============================================================================
+# Embedders
+# ============================================================================
+
+def sentence_transformer_embedder(model_name: str = E5_MODEL_NAME) -> Callable[[List[str], str], Any]:
+    """Local E5 embedder; input_type is 'query' or 'passage'."""
+    from sentence_transformers import SentenceTransformer  # Optional dependency
+
+    model = SentenceTransformer(model_name)
+
+    def embed(texts: List[str], input_type: str):
+        return model.encode([f"{input_type}: {text}" for text in texts], normalize_embeddings=True)
+
+    return embed
+
+
+def pinecone_inference_embedder(pc, model_name: str = PINECONE_EMBED_MODEL) -> Callable[[List[str], str], Any]:
+    """Embed with Pinecone's hosted inference API, matching the index's embedding model."""
+    import numpy as np
+
+    def embed(texts: List[str], input_type: str):
+        embeddings = pc.inference.embed(
+            model=model_name, inputs=texts, parameters={"input_type": input_type, "truncate": "END"}
+        )
+        return np.asarray([item["values"] for item in embeddings], dtype=np.float32)
+
+    return embed
+
+
+# ============================================================================
+# Local vector store
+# ============================================================================
+
+def write_vector_store(store_dir: str, records: List[Dict[str, Any]], embeddings, hnsw: bool = False):
+    """
+    Write a local vector store: L2-normalized float32 embeddings, one JSON
+    line of hit fields per row, and optionally an HNSW graph.
+    """
+    import numpy as np
+
+    path = Path(store_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.maximum(norms, 1e-12)
+    np.save(path / EMBEDDINGS_FILE, matrix)
+    with open(path / RECORDS_FILE, "w", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    if hnsw:
+        import hnswlib  # Optional dependency for large corpora
+
+        graph = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        graph.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+        graph.add_items(matrix)
+        graph.save_index(str(path / HNSW_FILE))
+    logger.info(f"Wrote {len(records)} vectors of dimension {matrix.shape[1]} to {store_dir}")
+
+
+class LocalVectorRetriever:
+    """
+    Cosine top-k over a memory-mapped embedding matrix.
+    Uses an HNSW graph instead of the exact scan when one was built with the store.
+    """
+
+    def __init__(self, store_dir: str, embed: Callable[[List[str], str], Any], hnsw_ef: int = 64):
+        import numpy as np
+
+        path = Path(store_dir)
+        self.name = "local"
+        self.namespace = os.path.basename(os.path.normpath(store_dir))
+        self.embed = embed
+        self.matrix = np.load(path / EMBEDDINGS_FILE, mmap_mode="r")
+        with open(path / RECORDS_FILE, encoding="utf-8") as f:
+            self.records = [json.loads(line) for line in f]
+        if len(self.records) != len(self.matrix):
+            raise ValueError(f"{store_dir}: {len(self.records)} records but {len(self.matrix)} embeddings")
+        self.graph = None
+        if (path / HNSW_FILE).exists():
+            try:
+                import hnswlib
+
+                self.graph = hnswlib.Index(space="ip", dim=self.matrix.shape[1])
+                self.graph.load_index(str(path / HNSW_FILE), max_elements=len(self.matrix))
+                self.graph.set_ef(hnsw_ef)
+            except ImportError:
+                logger.warning("HNSW index present but hnswlib is not installed; using exact search")
+        logger.info(f"Loaded local vector store with {len(self.records)} vectors from {store_dir}")
+
+    def search_vector(self, vector, top_k: int) -> List[Dict[str, Any]]:
+        """Return the top_k hits for an L2-normalized query vector, best first."""
+        import numpy as np
+
+        top_k = min(top_k, len(self.records))
+        if top_k <= 0:
+            return []
+        if self.graph is not None:
+            labels, distances = self.graph.knn_query(vector, k=top_k)
+            # hnswlib's inner-product distance is 1 - dot
+            pairs = zip(labels[0], 1.0 - distances[0])
+        else:
+            scores = self.matrix @ vector
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            pairs = zip(top, scores[top])
+        return [shape_hit(score, self.records[int(row)]) for row, score in pairs]
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Return the top_k hits for query, best first."""
+        import numpy as np
+
+        vector = np.asarray(self.embed([query], "query"), dtype=np.float32)[0]
+        vector /= max(float(np.linalg.norm(vector)), 1e-12)
+        return self.search_vector(vector, top_k)
+
+    def describe(self) -> Dict[str, Any]:
+        """Dependency status for /health."""
+        return {
+            "retriever": "local",
+            "vector_count": len(self.records),
+            "ann": "hnsw" if self.graph is not None else "exact"
+        }
+
+
+def glossary_record_fields(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """Hit fields stored for a glossary row, matching the Pinecone record layout."""
+    return {
+        "text": f"{rec.get('Term', '')}: {rec.get('Definition', '')}",
+        "Entity": rec.get("Entity", ""),
+        "BodyType": rec.get("BodyType", ""),
+        "Portfolio": rec.get("Portfolio", ""),
+        "Url": rec.get("Url", "")
+    }
+
+
+def load_local_retriever(store_dir: str, embedder: str, pc=None) -> LocalVectorRetriever:
+    """Build a LocalVectorRetriever with the configured query embedder."""
+    if embedder == "pinecone":
+        embed = pinecone_inference_embedder(pc)
+    elif embedder == "sentence-transformers":
+        embed = sentence_transformer_embedder(os.getenv("LOCAL_EMBEDDING_MODEL", E5_MODEL_NAME))
+    else:
+        raise ValueError(f"Unknown LOCAL_EMBEDDER: {embedder}")
+    return LocalVectorRetriever(store_dir, embed)
+
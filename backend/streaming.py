@@ -0,0 +1,70 @@
+"""
+Gov Terms AI - Streaming helpers
+Server-Sent Events framing and incremental extraction of answer fields
+from a partially generated Gemini JSON response.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+STREAMED_FIELDS = ("definition", "elaboration")
+
+_INCOMPLETE_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _decode_partial_string(raw: str) -> str:
+    """Decode the body of a JSON string that may be cut off mid-escape."""
+    raw = _INCOMPLETE_ESCAPE.sub("", raw)
+    # An odd run of trailing backslashes means the last escape is incomplete
+    if (len(raw) - len(raw.rstrip("\\"))) % 2:
+        raw = raw[:-1]
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return ""
+
+
+class PartialAnswerParser:
+    """
+    Track the definition and elaboration values of a JSON answer as it streams.
+    feed() returns the newly completed text for each field since the last call.
+    """
+
+    def __init__(self, fields: Tuple[str, ...] = STREAMED_FIELDS):
+        self.buffer = ""
+        self.emitted = {field: "" for field in fields}
+        self.patterns = {
+            field: re.compile(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)' % field, re.DOTALL)
+            for field in fields
+        }
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Add a chunk of model output and return (field, delta) pairs."""
+        self.buffer += chunk
+        deltas = []
+        for field, pattern in self.patterns.items():
+            match = pattern.search(self.buffer)
+            if not match:
+                continue
+            value = _decode_partial_string(match.group(1))
+            emitted = self.emitted[field]
+            if len(value) > len(emitted) and value.startswith(emitted):
+                deltas.append((field, value[len(emitted):]))
+                self.emitted[field] = value
+        return deltas
+
+
+def answer_deltas(ai_response: str) -> List[Tuple[str, str]]:
+    """Split a complete answer into (field, text) deltas for replay over SSE."""
+    parser = PartialAnswerParser()
+    deltas = parser.feed(ai_response)
+    if not deltas:
+        # Not the expected JSON shape: stream it as the definition
+        return [("definition", ai_response)]
+    return deltas
@@ -0,0 +1,183 @@
+"""
+Gov Terms AI - Structured logging
+One JSON object per log line, written by a background thread: request
+handlers only put the record on a queue, and formatting, truncation and
+stdout I/O happen on the listener. Per-request payloads (hits, prompts,
+Gemini answers) go through log_payload, which logs only a sampled fraction
+of requests and skips all work for the rest. The sampling decision is made
+once per request by PayloadSamplingMiddleware, so a sampled request logs
+all of its payloads and an unsampled one none.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, TextIO
+
+# Fraction of requests whose payload dumps are logged, set by configure_logging
+_payload_sample_rate = 0.0
+_listener: Optional[logging.handlers.QueueListener] = None
+# Whether the current request's payloads are logged; None outside a request
+_payload_sampled: ContextVar[Optional[bool]] = ContextVar("payload_sampled", default=None)
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def truncate(value: Any, max_chars: int, max_items: int) -> Any:
+    """Shorten long strings and collections so a single field can't flood the log."""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+    if isinstance(value, dict):
+        return {key: truncate(item, max_chars, max_items) for key, item in list(value.items())[:max_items]}
+    if isinstance(value, (list, tuple)):
+        items = [truncate(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"...(+{len(value) - max_items} items)")
+        return items
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return truncate(str(value), max_chars, max_items)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as JSON objects with the extra= fields inlined and truncated."""
+
+    def __init__(self, max_field_chars: int = 500, max_field_items: int = 10):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+        self.max_field_items = max_field_items
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": truncate(record.getMessage(), self.max_field_chars, self.max_field_items),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = truncate(value, self.max_field_chars, self.max_field_items)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain `level:logger:message key=value ...` lines for local development."""
+
+    def __init__(self, max_field_chars: int = 500, max_field_items: int = 10):
+        super().__init__("%(levelname)s:%(name)s:%(message)s")
+        self.max_field_chars = max_field_chars
+        self.max_field_items = max_field_items
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = [
+            f"{key}={truncate(value, self.max_field_chars, self.max_field_items)}"
+            for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES
+        ]
+        return " ".join([line, *extra]) if extra else line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats the message on the calling thread; only
+        # resolve the exception text here, while the traceback is still alive
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json", payload_sample_rate: float = 0.0,
+                      max_field_chars: int = 500, stream: Optional[TextIO] = None):
+    """
+    Route the root logger (and uvicorn's loggers) through a queue to a
+    background thread writing to stream (stdout by default). The listener is
+    flushed and stopped by stop_logging, which also runs at interpreter exit.
+    """
+    global _payload_sample_rate, _listener
+    stop_logging()
+    _payload_sample_rate = max(0.0, min(payload_sample_rate, 1.0))
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    formatter_class = JsonFormatter if fmt == "json" else TextFormatter
+    output.setFormatter(formatter_class(max_field_chars=max_field_chars))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, output)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    listener.start()
+    _listener = listener
+
+
+@atexit.register
+def stop_logging():
+    """Write out queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _sample() -> bool:
+    return _payload_sample_rate >= 1.0 or random.random() < _payload_sample_rate
+
+
+@contextmanager
+def payload_sampling():
+    """Decide once whether log_payload logs the payloads of the request handled inside this block."""
+    token = _payload_sampled.set(_sample())
+    try:
+        yield
+    finally:
+        _payload_sampled.reset(token)
+
+
+class PayloadSamplingMiddleware:
+    """ASGI middleware deciding once per HTTP request whether log_payload logs that request's payloads."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _payload_sample_rate <= 0.0:
+            await self.app(scope, receive, send)
+            return
+        with payload_sampling():
+            await self.app(scope, receive, send)
+
+
+def log_payload(logger: logging.Logger, message: str, **fields: Any):
+    """
+    Log a full payload dump if the current request was sampled
+    (LOG_PAYLOAD_SAMPLE_RATE); outside a request each call is sampled on its
+    own. Fields are truncated by the formatter on the listener thread, not here.
+    """
+    if _payload_sample_rate <= 0.0 or not logger.isEnabledFor(logging.INFO):
+        return
+    sampled = _payload_sampled.get()
+    if sampled is None:
+        sampled = _sample()
+    if sampled:
+        logger.info(message, extra=fields)
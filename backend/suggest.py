@@ -0,0 +1,199 @@
+"""
+Gov Terms AI - Typo-tolerant term suggestions
+A radix trie over the normalized glossary terms, searched with a bounded
+edit distance so `/api/suggest` can offer the right spelling of a term while
+the user is still typing, before a malformed query costs a RAG round-trip.
+
+The search walks the trie carrying one row of the edit-distance table
+(optimal string alignment: insertions, deletions, substitutions and adjacent
+transpositions) per trie character, which is the Levenshtein automaton run
+over the trie. A prefix that some term starts with is answered by a plain
+descent; otherwise the trie is walked once with the full edit budget, which
+drops to the best distance found so far, and only the closest terms are
+kept. A branch is pruned as soon as every entry in its row exceeds the
+budget, and only the subtree under the prefix's first character is searched. Every node keeps its best completions precomputed, so a short
+prefix doesn't enumerate thousands of terms.
+"""
+
+import heapq
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 20
+
+
+def max_edits(prefix: str) -> int:
+    """
+    Edit budget for a normalized prefix: none for 1-2 characters (everything
+    is one edit away), 1 from 3 so a mistyped acronym like "AYP" still finds
+    "ATP", and 2 from 8. Typos are only looked for when nothing completes the
+    prefix, so a correctly typed acronym never gets its neighbours.
+    """
+    if len(prefix) <= 2:
+        return 0
+    if len(prefix) <= 7:
+        return 1
+    return 2
+
+
+class _Node:
+    __slots__ = ("label", "children", "top")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.children: List["_Node"] = []
+        # Ranks of the best completions in this subtree, best first
+        self.top: Tuple[int, ...] = ()
+
+
+class TermTrie:
+    """Radix trie of normalized terms, ranked by edit distance, then length, then alphabetically."""
+
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        # Rank is the position in (length, key) order, so comparing ranks compares completions
+        pairs = sorted(dict(terms).items(), key=lambda item: (len(item[0]), item[0]))
+        self.keys = [key for key, _ in pairs]
+        self.display = [term for _, term in pairs]
+        ranks = {key: rank for rank, key in enumerate(self.keys)}
+        self.root = self._build(sorted(self.keys), 0, "", ranks) if self.keys else _Node("")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _build(self, keys: List[str], depth: int, label: str, ranks: Dict[str, int]) -> _Node:
+        """Node for sorted keys sharing their first `depth` characters."""
+        node = _Node(label)
+        ranked: List[int] = []
+        start = 0
+        if len(keys[0]) == depth:
+            ranked.append(ranks[keys[0]])
+            start = 1
+        while start < len(keys):
+            end = start
+            while end < len(keys) and keys[end][depth] == keys[start][depth]:
+                end += 1
+            # The common prefix of a sorted group is that of its first and last keys
+            shared = os.path.commonprefix([keys[start], keys[end - 1]])
+            child = self._build(keys[start:end], len(shared), shared[depth:], ranks)
+            node.children.append(child)
+            ranked.extend(child.top)
+            start = end
+        node.top = tuple(heapq.nsmallest(MAX_SUGGESTIONS, ranked))
+        return node
+
+    def search(self, prefix: str, limit: int = 8, edits: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Terms that start with `prefix`, or failing that the terms within the
+        fewest typos of it (up to `edits`, default max_edits(prefix)), as
+        {"term", "distance"} dicts, best first.
+        prefix must already be normalized (see glossary_index.normalize_term).
+        """
+        if not prefix or not self.keys:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        edits = max_edits(prefix) if edits is None else edits
+        # Correct typing stays on the cheap exact path; typos are only looked for when nothing completes the prefix
+        node = self._complete(prefix)
+        if node is not None:
+            ranked = [(0, rank) for rank in node.top[:limit]]
+        elif edits:
+            ranked = self._search(prefix, limit, edits)
+        else:
+            ranked = []
+        return [{"term": self.display[rank], "distance": distance} for distance, rank in ranked]
+
+    def _complete(self, prefix: str) -> Optional[_Node]:
+        """The node under which every key starts with prefix, or None."""
+        node, i = self.root, 0
+        while i < len(prefix):
+            for child in node.children:
+                if child.label[0] == prefix[i]:
+                    break
+            else:
+                return None
+            n = min(len(child.label), len(prefix) - i)
+            if child.label[:n] != prefix[i:i + n]:
+                return None
+            node, i = child, i + n
+        return node
+
+    def _search(self, prefix: str, limit: int, edits: int) -> List[Tuple[int, int]]:
+        """Best (distance, rank) pairs at the smallest distance within `edits` of prefix, in one walk."""
+        cap = edits + 1
+        width = len(prefix) + 1
+        # Depth first, following the prefix before its neighbours so a close match is found early; the
+        # budget then drops to the best distance found so far, pruning everything that can't match as closely
+        budget = edits
+        matches: List[Tuple[int, _Node]] = []
+        first_row = [min(j, cap) for j in range(width)]
+        # Like most spellers, trust the first character: typos there are rare and it prunes all but one subtree
+        stack = [(0, child, first_row, None, "", 0) for child in self.root.children if child.label[0] == prefix[0]]
+        while stack:
+            bound, node, row, previous_row, previous_char, depth = stack.pop()
+            if bound > budget:
+                continue
+            best = cap
+            for char in node.label:
+                # Next row of the edit-distance table, computed only on the diagonal band
+                # within the budget; everything else is capped at edits + 1
+                depth += 1
+                new_row = [cap] * width
+                new_row[0] = depth if depth < cap else cap
+                for j in range(max(1, depth - budget), min(width, depth + budget + 1)):
+                    value = row[j - 1] if prefix[j - 1] == char else row[j - 1] + 1
+                    if row[j] + 1 < value:
+                        value = row[j] + 1
+                    if new_row[j - 1] + 1 < value:
+                        value = new_row[j - 1] + 1
+                    if (j > 1 and prefix[j - 1] == previous_char and prefix[j - 2] == char
+                            and char != previous_char and previous_row[j - 2] + 1 < value):
+                        value = previous_row[j - 2] + 1
+                    new_row[j] = value
+                row, previous_row, previous_char = new_row, row, char
+                if row[-1] < best:
+                    best = row[-1]
+                if min(row) > budget:
+                    break
+            else:
+                # Later rows never drop below this row's minimum
+                floor = min(row)
+                if best > floor:
+                    following = prefix[depth] if depth < len(prefix) else ""
+                    continuing = None
+                    allowed = None
+                    if floor == budget and depth >= budget:
+                        # With the budget used up, a child survives its first character only by matching
+                        # the prefix where the row is still within budget, or by completing a transposition
+                        allowed = {prefix[j - 1] for j in range(1, width) if row[j - 1] <= budget}
+                        allowed.update(prefix[j - 2] for j in range(2, width)
+                                       if prefix[j - 1] == previous_char and previous_row[j - 2] < budget)
+                    for child in node.children:
+                        if allowed is not None and child.label[0] not in allowed:
+                            continue
+                        if child.label[0] == following:
+                            continuing = child
+                        else:
+                            stack.append((floor, child, row, previous_row, previous_char, depth))
+                    # The child that continues the prefix is popped first
+                    if continuing is not None:
+                        stack.append((floor, continuing, row, previous_row, previous_char, depth))
+            if best <= budget:
+                matches.append((best, node))
+                budget = best
+
+        distances: Dict[int, int] = {}
+        for distance, node in matches:
+            if distance == budget:
+                for rank in node.top[:limit]:
+                    distances[rank] = distance
+        return heapq.nsmallest(limit, ((distance, rank) for rank, distance in distances.items()))
+
+
+def build_term_trie(terms: Iterable[Tuple[str, str]]) -> TermTrie:
+    """Build the suggestion trie from (normalized key, display term) pairs."""
+    trie = TermTrie(terms)
+    logger.info(f"Built suggestion trie over {len(trie)} terms")
+    return trie
@@ -0,0 +1,138 @@
+"""
+Shared fixtures for the backend tests.
+The backend modules are imported flat, as uvicorn runs them from backend/;
+app.py is imported once per session against a small glossary, with the
+Pinecone and Gemini providers overridden by in-process fakes.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+GLOSSARY = [
+    {"Term": "ATO", "Definition": "Australian Taxation Office", "Entity": "Australian Taxation Office",
+     "BodyType": "Non-corporate Commonwealth entity", "Portfolio": "Treasury", "Url": "https://www.ato.gov.au"},
+    {"Term": "ATP", "Definition": "Approved Transport Provider", "Entity": "Department of Infrastructure",
+     "BodyType": "Non-corporate Commonwealth entity", "Portfolio": "Infrastructure", "Url": ""},
+    {"Term": "NDIS", "Definition": "National Disability Insurance Scheme",
+     "Entity": "National Disability Insurance Agency", "BodyType": "Corporate Commonwealth entity",
+     "Portfolio": "Social Services", "Url": "https://www.ndis.gov.au"},
+    {"Term": "Grant", "Definition": "Financial assistance provided by government", "Entity": "Department of Finance",
+     "BodyType": "Non-corporate Commonwealth entity", "Portfolio": "Finance", "Url": ""},
+    {"Term": "Grant", "Definition": "A sum of money given for a purpose", "Entity": "Department of Health",
+     "BodyType": "Non-corporate Commonwealth entity", "Portfolio": "Health", "Url": ""},
+    {"Term": "Goods and Services Tax", "Definition": "A broad-based tax of 10% on most goods and services",
+     "Entity": "Australian Taxation Office", "BodyType": "Non-corporate Commonwealth entity",
+     "Portfolio": "Treasury", "Url": "https://www.ato.gov.au"},
+]
+
+FAKE_HITS = [
+    {"_score": 0.912, "fields": {"text": "NDIS: National Disability Insurance Scheme",
+                                 "Entity": "National Disability Insurance Agency",
+                                 "BodyType": "Corporate Commonwealth entity", "Portfolio": "Social Services",
+                                 "Url": "https://www.ndis.gov.au"}},
+    {"_score": 0.874, "fields": {"text": "NDIS: National Disability Insurance Scheme, funding disability supports",
+                                 "Entity": "Department of Social Services",
+                                 "BodyType": "Non-corporate Commonwealth entity", "Portfolio": "Social Services",
+                                 "Url": "https://www.dss.gov.au"}},
+]
+
+FAKE_ANSWER = {
+    "definition": "NDIS: National Disability Insurance Scheme",
+    "elaboration": "A scheme that funds supports for people with disability.",
+    "source_entity": "National Disability Insurance Agency",
+    "source_index": 1,
+}
+
+
+def write_glossary(path: Path, records=GLOSSARY) -> Path:
+    path.write_text(json.dumps(records), encoding="utf-8")
+    return path
+
+
+class FakeIndex:
+    """Pinecone index stand-in: fixed hits after `latency` seconds (a number, or a callable per call)."""
+
+    def __init__(self, hits=FAKE_HITS, latency: float = 0.0):
+        self.hits = hits
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def search_records(self, namespace, query):
+        with self._lock:
+            self.calls.append({"namespace": namespace, "query": query})
+        time.sleep(self.latency() if callable(self.latency) else self.latency)
+        return {"result": {"hits": self.hits}}
+
+    def describe_index_stats(self):
+        return types.SimpleNamespace(total_vector_count=len(self.hits))
+
+
+class FakeModel:
+    """Gemini model stand-in returning a fixed JSON answer, streamed in small chunks on request."""
+
+    def __init__(self, text: str = json.dumps(FAKE_ANSWER), latency: float = 0.0):
+        self.text = text
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        if stream:
+            return [types.SimpleNamespace(text=self.text[i:i + 8]) for i in range(0, len(self.text), 8)]
+        item_ids = re.findall(r"^\s*Item (\d+):$", prompt, re.MULTILINE)
+        if item_ids:
+            # Batch prompt: one answer object per numbered item
+            answers = [{"id": int(i), **json.loads(self.text)} for i in item_ids]
+            return types.SimpleNamespace(text=json.dumps(answers), usage_metadata=None)
+        return types.SimpleNamespace(text=self.text, usage_metadata=None)
+
+
+@pytest.fixture(scope="session")
+def backend_app(tmp_path_factory):
+    """app.py imported against the test glossary, with caches off and no provider warm-up."""
+    glossary = write_glossary(tmp_path_factory.mktemp("data") / "combined_glossary.json")
+    with pytest.MonkeyPatch.context() as env:
+        env.setenv("GLOSSARY_PATH", str(glossary))
+        env.setenv("GLOSSARY_SNAPSHOT_PATH", "")
+        env.setenv("ANSWER_STORE_PATH", "")
+        env.setenv("WARM_PROVIDERS", "false")
+        env.setenv("RETRIEVAL_MODE", "vector")
+        env.setenv("RESPONSE_CACHE_SIZE", "0")
+        env.setenv("RETRIEVAL_CACHE_SIZE", "0")
+        env.setenv("LOG_FORMAT", "text")
+        env.setenv("LOG_LEVEL", "WARNING")
+        import app
+    return app
+
+
+@pytest.fixture
+def fakes(backend_app, monkeypatch):
+    """Fresh fake upstreams for one test."""
+    from retrievers import PineconeRetriever
+
+    index, model = FakeIndex(), FakeModel()
+    backend_app.providers.override(
+        "retriever", PineconeRetriever(index, backend_app.PINECONE_INDEX_NAME, backend_app.PINECONE_NAMESPACE)
+    )
+    backend_app.providers.override("gemini_model", model)
+    return types.SimpleNamespace(index=index, model=model)
+
+
+@pytest.fixture
+def client(backend_app, fakes):
+    from fastapi.testclient import TestClient
+
+    with TestClient(backend_app.app) as test_client:
+        yield test_client
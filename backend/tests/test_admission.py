@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+
+def test_admits_up_to_the_limit_then_queues_in_order():
+    controller = AdmissionController(initial_limit=2, min_limit=1, max_queue=4, queue_timeout=1.0)
+    order = []
+
+    async def request(name):
+        started = await controller.acquire()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        controller.release(started, ok=True)
+
+    async def scenario():
+        await asyncio.gather(*(request(i) for i in range(5)))
+
+    asyncio.run(scenario())
+    assert order == [0, 1, 2, 3, 4]
+    assert controller.stats()["in_flight"] == 0
+    assert controller.stats()["admitted"] == 5
+
+
+def test_sheds_when_the_queue_is_full():
+    controller = AdmissionController(initial_limit=2, min_limit=1, max_queue=1, queue_timeout=1.0)
+
+    async def scenario():
+        await controller.acquire()
+        await controller.acquire()
+        queued = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as shed:
+            await controller.acquire()
+        queued.cancel()
+        return shed.value
+
+    shed = asyncio.run(scenario())
+    assert shed.reason == "queue_full"
+    assert shed.retry_after >= 1
+    assert controller.stats()["shed"] == {"queue_full": 1, "queue_timeout": 0}
+
+
+def test_sheds_a_request_that_waits_too_long():
+    controller = AdmissionController(initial_limit=2, min_limit=1, queue_timeout=0.05)
+
+    async def scenario():
+        await controller.acquire()
+        await controller.acquire()
+        with pytest.raises(Overloaded) as shed:
+            await controller.acquire()
+        return shed.value
+
+    assert asyncio.run(scenario()).reason == "queue_timeout"
+    assert controller.stats()["queued"] == 0
+
+
+def test_limit_grows_on_fast_successes_and_shrinks_once_per_episode():
+    controller = AdmissionController(initial_limit=4, min_limit=2, latency_target=1.0, backoff=0.5)
+
+    async def scenario():
+        for _ in range(8):
+            controller.release(await controller.acquire(), ok=True)
+        grown = controller.limit
+        first, second = await controller.acquire(), await controller.acquire()
+        controller.release(first, ok=False)
+        controller.release(second, ok=False)
+        return grown
+
+    grown = asyncio.run(scenario())
+    assert grown > 5.5
+    # Both failures were admitted before the decrease, so the limit is halved only once
+    assert controller.limit == pytest.approx(grown * 0.5)
+
+
+def test_slow_pipelines_count_as_overload():
+    controller = AdmissionController(initial_limit=4, min_limit=2, latency_target=0.01, backoff=0.5)
+
+    async def scenario():
+        started = await controller.acquire()
+        await asyncio.sleep(0.02)
+        controller.release(started, ok=True)
+
+    asyncio.run(scenario())
+    assert controller.limit == 2
+
+
+def test_release_hands_the_slot_to_the_next_waiter():
+    controller = AdmissionController(initial_limit=2, min_limit=2, queue_timeout=1.0)
+
+    async def scenario():
+        first = await controller.acquire()
+        await controller.acquire()
+        waiting = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 1
+        controller.release(first, ok=True)
+        await waiting
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["in_flight"], stats["queued"]) == (2, 0)
+
+
+@pytest.fixture
+def saturated(backend_app, monkeypatch):
+    """An admission controller with its only slot taken and no queue."""
+    controller = AdmissionController(initial_limit=1, min_limit=1, max_queue=0)
+    monkeypatch.setattr(backend_app, "admission", controller)
+    started = time.monotonic()
+    controller.in_flight = 1
+    yield controller
+    controller.release(started, ok=True)
+
+
+def test_query_is_shed_with_retry_after(client, saturated):
+    response = client.post("/api/query", json={"query": "What is the NDIS?"})
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_stream_is_shed_before_it_starts(client, saturated):
+    response = client.post("/api/query/stream", json={"query": "What is the NDIS?"})
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json()["detail"] == "Server busy, please retry shortly"
+
+
+def test_stream_releases_its_slot(backend_app, client, monkeypatch):
+    controller = AdmissionController(initial_limit=1, min_limit=1)
+    monkeypatch.setattr(backend_app, "admission", controller)
+    response = client.post("/api/query/stream", json={"query": "What is the NDIS?"})
+    assert response.status_code == 200
+    assert controller.stats()["admitted"] == 1
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_batch_is_admitted_only_for_upstream_work(client, saturated, fakes):
+    # Exact matches need no slot
+    response = client.post("/api/query/batch", json={"queries": ["ATO", "NDIS"]})
+    assert response.status_code == 200
+    response = client.post("/api/query/batch", json={"queries": ["ATO", "What is the NDIS?"]})
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+    assert fakes.index.calls == []
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import logging
+import os
+
+import pytest
+
+from answer_store import AnswerStore, load_answer_store, store_metadata, write_answer_store
+from conftest import FAKE_ANSWER, GLOSSARY, write_glossary
+
+NDIS_PAYLOAD = {
+    "ai_response": json.dumps(FAKE_ANSWER),
+    "sources": [],
+    "selected_source": {"entity": "National Disability Insurance Agency"},
+    "served_by": "rag",
+}
+
+
+def build(tmp_path, generation=0):
+    source = write_glossary(tmp_path / "combined_glossary.json")
+    metadata = store_metadata(str(source), "gov-terms", "default", "json")
+    path = tmp_path / "answer_store.bin"
+    write_answer_store(str(path), [(["plain:disability scheme", "elaborate:disability scheme"], NDIS_PAYLOAD)],
+                       {**metadata, "index_generation": generation})
+    return source, path, metadata
+
+
+def test_store_round_trips_answers(tmp_path):
+    _, path, _ = build(tmp_path, generation=3)
+    store = AnswerStore(str(path))
+    assert len(store) == 1
+    assert store.get("disability scheme", elaborate=False) == NDIS_PAYLOAD
+    assert store.get("disability scheme", elaborate=True) == NDIS_PAYLOAD
+    assert store.get("ato", elaborate=False) is None
+    assert store.index_generation == 3
+    assert (store.hits, store.misses) == (2, 1)
+
+
+def test_load_rejects_a_same_size_glossary_edit(tmp_path, caplog):
+    source, path, _ = build(tmp_path)
+    assert load_answer_store(str(path), str(source), "gov-terms", "default", "json") is not None
+    edited = json.dumps(GLOSSARY).replace("Approved Transport Provider", "Approved Transport Providor")
+    assert len(edited) == os.path.getsize(source)
+    source.write_text(edited, encoding="utf-8")
+    with caplog.at_level(logging.WARNING):
+        assert load_answer_store(str(path), str(source), "gov-terms", "default", "json") is None
+    assert "glossary_sha256" in caplog.text
+
+
+def test_load_rejects_another_index(tmp_path):
+    source, path, _ = build(tmp_path)
+    assert load_answer_store(str(path), str(source), "other-index", "default", "json") is None
+
+
+def test_load_rejects_a_file_that_is_not_a_store(tmp_path):
+    source = write_glossary(tmp_path / "combined_glossary.json")
+    assert load_answer_store(str(source), str(source), "gov-terms", "default", "json") is None
+
+
+@pytest.fixture
+def stored_app(backend_app, tmp_path, monkeypatch):
+    _, path, _ = build(tmp_path, generation=backend_app.index_generation.value)
+    monkeypatch.setattr(backend_app, "answer_store", AnswerStore(str(path)))
+    # Later tests expect the generation the session started with
+    monkeypatch.setattr(backend_app.index_generation, "value", backend_app.index_generation.value)
+    return backend_app
+
+
+def test_store_answers_before_retrieval(stored_app, client, fakes):
+    response = client.post("/api/query", json={"query": "Disability scheme"})
+    assert response.status_code == 200
+    assert response.json()["cache"] == "precomputed"
+    assert fakes.model.calls == 0
+
+
+def test_store_is_skipped_after_a_generation_bump(stored_app, client, fakes):
+    asyncio.run(stored_app.index_generation.bump())
+    response = client.post("/api/query", json={"query": "Disability scheme"})
+    assert response.status_code == 200
+    assert response.json()["cache"] != "precomputed"
+    assert fakes.model.calls == 1
+
+
+def test_the_glossary_is_not_hashed_without_a_store(tmp_path, monkeypatch):
+    import answer_store
+
+    def fail(path):
+        raise AssertionError("hashed the glossary")
+
+    monkeypatch.setattr(answer_store, "source_digest", fail)
+    source = write_glossary(tmp_path / "combined_glossary.json")
+    assert load_answer_store(str(tmp_path / "missing.bin"), str(source), "gov-terms", "default", "json") is None
+    assert load_answer_store("", str(source), "gov-terms", "default", "json") is None
@@ -0,0 +1,21 @@
+def test_batch_dedupes_and_packs_queries(client, fakes):
+    queries = ["NDIS meaning", "ndis  MEANING", "ATO", "What is a grant", "", 42]
+    response = client.post("/api/query/batch", json={"queries": queries})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["query"] for item in body["results"]] == queries
+    first, duplicate, exact, grant, empty, number = body["results"]
+    assert first["served_by"] == "rag" and duplicate["ai_response"] == first["ai_response"]
+    assert exact["served_by"] == "exact_match"
+    assert grant["served_by"] == "rag"
+    assert empty["error"] == number["error"] == "Invalid query"
+    # Two unique RAG queries: two searches and one packed Gemini call
+    assert body["stats"] == {"queries": 6, "unique": 3, "generated": 2, "gemini_calls": 1, "errors": 2}
+    assert len(fakes.index.calls) == 2
+    assert fakes.model.calls == 1
+
+
+def test_batch_rejects_bad_requests(client, backend_app):
+    assert client.post("/api/query/batch", json={"queries": []}).status_code == 400
+    too_many = ["term"] * (backend_app.MAX_BATCH_QUERIES + 1)
+    assert client.post("/api/query/batch", json={"queries": too_many}).status_code == 413
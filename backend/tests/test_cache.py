@@ -0,0 +1,219 @@
+import asyncio
+import time
+
+import pytest
+
+from cache import IndexGeneration, ResponseCache, RetrievalCache, SingleFlight, TTLCache
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the shared cache tier and generation counter."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_size=4, ttl=10)
+    cache.set("a", 1)
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_of_size_zero_stores_nothing():
+    cache = TTLCache(max_size=0, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_make_key_separates_index_namespace_and_variant():
+    keys = {
+        ResponseCache.make_key("ndis", "index", "ns"),
+        ResponseCache.make_key("ndis", "index", "other"),
+        ResponseCache.make_key("ndis", "other", "ns"),
+        ResponseCache.make_key("ndis", "index", "ns", variant="elaborate"),
+    }
+    assert len(keys) == 4
+
+
+def test_response_cache_clears_local_tier_on_generation_bump():
+    async def scenario():
+        generation = IndexGeneration("generation")
+        cache = ResponseCache(8, 60, generation)
+        await cache.set("k", {"ai_response": "old"})
+        assert await cache.get("k") == ({"ai_response": "old"}, "l1")
+        await generation.bump()
+        assert await cache.get("k") == (None, "miss")
+
+    asyncio.run(scenario())
+
+
+def test_shared_tier_entries_from_an_older_generation_are_misses():
+    async def scenario():
+        redis = FakeRedis()
+        writer = ResponseCache(8, 60, IndexGeneration("generation", client=redis), redis_client=redis)
+        reader_generation = IndexGeneration("generation", client=redis, poll_interval=0)
+        reader = ResponseCache(8, 60, reader_generation, redis_client=redis)
+
+        await writer.set("k", {"ai_response": "old"})
+        assert await reader.get("k") == ({"ai_response": "old"}, "l2")
+        # Served from the reader's own L1 from now on
+        assert (await reader.get("k"))[1] == "l1"
+
+        # Another replica re-indexes: the shared entry is stale and the reader drops its L1 on refresh
+        await writer.generation.bump()
+        await reader_generation.refresh()
+        assert await reader.get("k") == (None, "miss")
+        assert reader.shared.stats()["misses"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_index_generation_notifies_subscribers_only_on_change():
+    async def scenario():
+        redis = FakeRedis()
+        generation = IndexGeneration("generation", client=redis, poll_interval=0)
+        seen = []
+        generation.subscribe(seen.append)
+        await generation.refresh()
+        await redis.incr("generation")
+        await generation.refresh()
+        await generation.refresh()
+        return seen
+
+    assert asyncio.run(scenario()) == [1]
+
+
+HITS = [
+    {"score": 0.9, "text": "NDIS: National Disability Insurance Scheme", "entity": "NDIA",
+     "body_type": "Corporate Commonwealth entity", "portfolio": "Social Services", "url": "https://www.ndis.gov.au"},
+]
+
+
+def test_retrieval_cache_round_trips_hits():
+    cache = RetrievalCache(8, 60, IndexGeneration("generation"))
+    cache.set("ns", "ndis", 3, HITS)
+    assert cache.get("ns", "ndis", 3) == HITS
+    assert cache.get("ns", "ndis", 5) is None
+    assert cache.get("other", "ndis", 3) is None
+
+
+def test_retrieval_cache_drops_hits_from_an_older_generation():
+    generation = IndexGeneration("generation")
+    cache = RetrievalCache(8, 60, generation)
+    cache.set("ns", "ndis", 3, HITS)
+    # A generation change seen without the clear callback, e.g. a stamp read mid-fetch
+    generation.value += 1
+    assert cache.get("ns", "ndis", 3) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_retrieval_cache_clears_on_generation_bump():
+    generation = IndexGeneration("generation")
+    cache = RetrievalCache(8, 60, generation)
+    cache.set("ns", "ndis", 3, HITS)
+    asyncio.run(generation.bump())
+    assert len(cache.local) == 0
+
+
+def test_retrieval_cache_keeps_fused_scores():
+    cache = RetrievalCache(8, 60, IndexGeneration("generation"))
+    fused = [{**HITS[0], "rrf_score": 0.5}]
+    cache.set("ns+lexical", "ndis", 3, fused)
+    assert cache.get("ns+lexical", "ndis", 3) == fused
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight("answer")
+    calls = 0
+
+    async def answer():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "NDIS"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("ndis", answer) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == [("NDIS", False)] + [("NDIS", True)] * 4
+    stats = flight.stats()
+    assert (stats["leaders"], stats["followers"], stats["in_flight"]) == (1, 4, 0)
+    assert stats["coalesced_ratio"] == 0.8
+
+
+def test_single_flight_runs_again_once_the_call_finished():
+    flight = SingleFlight("answer")
+
+    async def scenario():
+        first = await flight.do("ndis", lambda: asyncio.sleep(0, "a"))
+        second = await flight.do("ndis", lambda: asyncio.sleep(0, "b"))
+        return first, second
+
+    assert asyncio.run(scenario()) == (("a", False), ("b", False))
+
+
+def test_single_flight_raises_the_error_in_every_waiter():
+    flight = SingleFlight("answer")
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("Gemini unavailable")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("ndis", failing) for _ in range(3)), return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert flight.stats()["errors"] == 1
+
+
+def test_single_flight_leader_cancellation_does_not_cancel_the_shared_call():
+    flight = SingleFlight("answer")
+
+    async def answer():
+        await asyncio.sleep(0.05)
+        return "NDIS"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("ndis", answer))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("ndis", answer))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == ("NDIS", True)
@@ -0,0 +1,55 @@
+import pytest
+
+from conftest import GLOSSARY, write_glossary
+from glossary_index import GlossaryIndex, is_acronym, load_glossary, normalize_term
+
+
+def test_normalize_term_ignores_case_whitespace_and_question_mark():
+    assert normalize_term("  Goods   and Services TAX? ") == "goods and services tax"
+
+
+def test_is_acronym():
+    assert is_acronym("NDIS")
+    assert is_acronym("R&D")
+    assert not is_acronym("Grant")
+    assert not is_acronym("GST Act")
+
+
+def test_lookup_resolves_an_unambiguous_term():
+    match = GlossaryIndex(GLOSSARY).lookup("ndis?")
+    assert match["term"] == "NDIS"
+    assert match["definition"] == "NDIS: National Disability Insurance Scheme"
+    assert match["selected_source"]["entity"] == "National Disability Insurance Agency"
+    assert match["sources"][0] is match["selected_source"]
+
+
+def test_lookup_leaves_ambiguous_terms_to_the_rag_pipeline():
+    index = GlossaryIndex(GLOSSARY)
+    assert index.lookup("grant") is None
+    assert index.lookup("not a term") is None
+
+
+def test_acronym_ties_prefer_the_shortest_definition():
+    records = [
+        {"Term": "PBS", "Definition": "Pharmaceutical Benefits Scheme, subsidising medicines", "Entity": "Health"},
+        {"Term": "PBS", "Definition": "Pharmaceutical Benefits Scheme", "Entity": "Services Australia"},
+    ]
+    assert GlossaryIndex(records).lookup("PBS")["selected_source"]["entity"] == "Services Australia"
+
+
+def test_load_glossary_missing_file_disables_lookups(tmp_path):
+    assert load_glossary(str(tmp_path / "missing.json")) == []
+
+
+@pytest.mark.parametrize("content", [None, "{not json", "[]"])
+def test_load_glossary_required_raises(tmp_path, content):
+    path = tmp_path / "combined_glossary.json"
+    if content is not None:
+        path.write_text(content, encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        load_glossary(str(path), required=True)
+
+
+def test_load_glossary_required_returns_rows(tmp_path):
+    path = write_glossary(tmp_path / "combined_glossary.json")
+    assert len(load_glossary(str(path), required=True)) == len(GLOSSARY)
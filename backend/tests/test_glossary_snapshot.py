@@ -0,0 +1,73 @@
+import hashlib
+import json
+import logging
+import os
+
+from conftest import GLOSSARY, write_glossary
+from glossary_index import GlossaryIndex
+from glossary_snapshot import GlossarySnapshot, load_snapshot, source_digest, write_snapshot
+from lexical_index import LexicalIndex
+from retrievers import glossary_record_fields
+
+
+def export(tmp_path, records=GLOSSARY):
+    source = write_glossary(tmp_path / "combined_glossary.json", records)
+    snapshot = tmp_path / "combined_glossary.snap"
+    write_snapshot(str(snapshot), records, source_digest(str(source)))
+    return source, snapshot
+
+
+def test_snapshot_round_trips_the_rows(tmp_path):
+    _, path = export(tmp_path)
+    snapshot = GlossarySnapshot(str(path))
+    assert len(snapshot) == len(GLOSSARY)
+    assert list(snapshot) == [{column: row[column] for column in snapshot.columns} for row in GLOSSARY]
+
+
+def test_snapshot_views_match_the_json_indexes(tmp_path):
+    source, path = export(tmp_path)
+    snapshot = GlossarySnapshot(str(path))
+    from_json = GlossaryIndex.from_json(str(source))
+    from_snapshot = GlossaryIndex.from_snapshot(snapshot)
+    for query in ("NDIS", "ato", "Goods and Services Tax", "Grant", "unknown"):
+        assert from_snapshot.lookup(query) == from_json.lookup(query)
+    terms, _ = snapshot.exact_match_views()
+    assert dict(terms.items())["ndis"] == "NDIS"
+
+    lexical = LexicalIndex.from_snapshot(snapshot)
+    expected = LexicalIndex([glossary_record_fields(rec) for rec in GLOSSARY])
+    assert lexical.bm25("disability insurance", 3) == expected.bm25("disability insurance", 3)
+    assert lexical.ngram_match("ATP", 3) == expected.ngram_match("ATP", 3)
+
+
+def test_load_snapshot_accepts_the_unchanged_source(tmp_path):
+    source, path = export(tmp_path)
+    assert load_snapshot(str(path), str(source)) is not None
+
+
+def test_load_snapshot_rejects_a_same_size_edit(tmp_path, caplog):
+    source, path = export(tmp_path)
+    edited = json.dumps(GLOSSARY).replace("Approved Transport Provider", "Approved Transport Providor")
+    assert len(edited) == os.path.getsize(source)
+    source.write_text(edited, encoding="utf-8")
+    with caplog.at_level(logging.WARNING):
+        assert load_snapshot(str(path), str(source)) is None
+    assert "different" in caplog.text
+
+
+def test_load_snapshot_rejects_a_file_that_is_not_a_snapshot(tmp_path, caplog):
+    source = write_glossary(tmp_path / "combined_glossary.json")
+    with caplog.at_level(logging.WARNING):
+        assert load_snapshot(str(source), str(source)) is None
+    assert "not a glossary snapshot" in caplog.text
+
+
+def test_load_snapshot_without_a_path_is_none(tmp_path):
+    assert load_snapshot("", str(tmp_path / "combined_glossary.json")) is None
+    assert load_snapshot(str(tmp_path / "missing.snap"), str(tmp_path / "combined_glossary.json")) is None
+
+
+def test_source_digest_hashes_the_whole_file(tmp_path):
+    source = write_glossary(tmp_path / "combined_glossary.json")
+    assert source_digest(str(source)) == hashlib.sha256(source.read_bytes()).hexdigest()
+    assert source_digest(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from health import DependencyMonitor
+from providers import ProviderUnavailable
+
+
+@pytest.fixture
+def monitor():
+    with ThreadPoolExecutor(2) as executor:
+        yield DependencyMonitor(executor, interval=30.0, timeout=0.2, failure_threshold=3)
+
+
+def failing():
+    raise ConnectionError("upstream unreachable")
+
+
+def refresh(monitor, times=1):
+    async def scenario():
+        for _ in range(times):
+            await monitor.refresh()
+
+    asyncio.run(scenario())
+
+
+def test_not_ready_before_the_first_check(monitor):
+    monitor.add("retriever", lambda: {"total_vectors": 1})
+    readiness = monitor.readiness()
+    assert not readiness["ready"]
+    assert readiness["dependencies"]["retriever"]["status"] == "pending"
+
+
+def test_required_dependency_degrades_then_goes_down(monitor):
+    monitor.add("retriever", failing)
+    refresh(monitor)
+    readiness = monitor.readiness()
+    assert readiness["ready"]
+    assert readiness["dependencies"]["retriever"]["status"] == "degraded"
+    assert readiness["dependencies"]["retriever"]["error"] == "upstream unreachable"
+    refresh(monitor, 2)
+    readiness = monitor.readiness()
+    assert not readiness["ready"]
+    assert readiness["dependencies"]["retriever"]["status"] == "down"
+    assert readiness["dependencies"]["retriever"]["consecutive_failures"] == 3
+
+
+def test_successful_check_resets_the_failures(monitor):
+    outcomes = [failing, failing, lambda: {"total_vectors": 1}]
+    monitor.add("retriever", lambda: outcomes.pop(0)())
+    refresh(monitor, 3)
+    assert monitor.readiness()["dependencies"]["retriever"]["status"] == "ok"
+    assert monitor.result("retriever") == {"total_vectors": 1}
+
+
+def test_optional_dependency_does_not_block_readiness(monitor):
+    monitor.add("retriever", lambda: {"total_vectors": 1})
+    monitor.add("redis", failing, required=False)
+    refresh(monitor, 3)
+    readiness = monitor.readiness()
+    assert readiness["ready"]
+    assert readiness["dependencies"]["redis"]["status"] == "down"
+
+
+def test_slow_check_times_out(monitor):
+    monitor.add("retriever", lambda: time.sleep(0.5))
+    refresh(monitor)
+    assert monitor.readiness()["dependencies"]["retriever"]["error"] == "TimeoutError"
+
+
+def test_stale_checks_are_not_ready(monitor):
+    monitor.add("retriever", lambda: {"total_vectors": 1})
+    refresh(monitor)
+    monitor.checked_at -= 3 * monitor.interval + monitor.timeout + 1
+    assert not monitor.readiness()["ready"]
+
+
+def test_health_stays_up_without_gemini(client, backend_app, monkeypatch):
+    def no_key():
+        raise ProviderUnavailable("gemini_model unavailable: GOOGLE_API_KEY not set")
+
+    monkeypatch.setattr(backend_app.dependency_monitor.checks["gemini"], "check", no_key)
+    refresh(backend_app.dependency_monitor, backend_app.dependency_monitor.failure_threshold)
+    readiness = client.get("/readyz")
+    assert readiness.status_code == 200
+    assert readiness.json()["dependencies"]["gemini"]["status"] == "down"
+    assert client.get("/health").status_code == 200
+    # Exact matches don't need Gemini
+    assert client.post("/api/query", json={"query": "NDIS"}).json()["served_by"] == "exact_match"
@@ -0,0 +1,68 @@
+from conftest import GLOSSARY
+from lexical_index import HybridRetriever, LexicalIndex, char_ngrams, fuse
+from retrievers import glossary_record_fields
+
+
+def hit(text, score, entity="E"):
+    return {"score": score, "text": text, "entity": entity, "body_type": "", "portfolio": "", "url": ""}
+
+
+def test_fuse_keeps_the_retriever_score():
+    fused = fuse([[hit("a", 0.9)]], 3)
+    assert fused[0]["score"] == 0.9
+    assert fused[0]["rrf_score"] == 1.0
+
+
+def test_fuse_counts_a_row_once_per_ranking():
+    duplicated = [hit("a", 0.9), hit("a", 0.9), hit("b", 0.8)]
+    fused = fuse([duplicated], 3)
+    assert [h["text"] for h in fused] == ["a", "b"]
+    assert all(h["rrf_score"] <= 1.0 for h in fused)
+    assert fused[0]["rrf_score"] == 1.0
+
+
+def test_fuse_prefers_rows_found_by_several_rankings():
+    vector = [hit("a", 0.9), hit("b", 0.85)]
+    lexical = [hit("b", 1.0), hit("c", 0.7)]
+    fused = fuse([vector, lexical], 3)
+    assert [h["text"] for h in fused] == ["b", "a", "c"]
+    # The vector ranking's fields and score win for a row both have
+    assert fused[0]["score"] == 0.85
+    assert fused[2]["score"] == 0.7
+    assert fused[0]["rrf_score"] > fused[1]["rrf_score"] > fused[2]["rrf_score"]
+
+
+def test_bm25_ranks_matching_documents():
+    index = LexicalIndex([glossary_record_fields(rec) for rec in GLOSSARY])
+    ranked = index.bm25("disability insurance", 5)
+    assert ranked[0][0] == 2
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+
+
+def test_ngram_match_ignores_punctuation():
+    index = LexicalIndex([glossary_record_fields(rec) for rec in GLOSSARY])
+    doc_id, similarity = index.ngram_match("N.D.I.S.", 3)[0]
+    assert doc_id == 2 and similarity == 1.0
+    assert char_ngrams("N.D.I.S.") == {"#nd", "ndi", "dis", "is#"}
+
+
+class FakeVector:
+    name = "index"
+    namespace = "ns"
+
+    def __init__(self, hits):
+        self.hits = hits
+
+    def search(self, query, top_k):
+        return self.hits[:top_k]
+
+
+def test_hybrid_scores_lexical_only_hits_between_0_and_1():
+    lexical = LexicalIndex([glossary_record_fields(rec) for rec in GLOSSARY])
+    retriever = HybridRetriever(FakeVector([hit("Unrelated: row", 0.42)]), lexical)
+    hits = retriever.search("NDIS", 3)
+    assert hits[0]["text"] == "NDIS: National Disability Insurance Scheme"
+    assert hits[0]["score"] == 1.0
+    assert all(0.0 <= h["score"] <= 1.0 and 0.0 < h["rrf_score"] <= 1.0 for h in hits)
+    assert {"text": "Unrelated: row", "score": 0.42} in [{"text": h["text"], "score": h["score"]} for h in hits]
+    assert retriever.namespace == "ns+lexical"
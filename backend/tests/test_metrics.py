@@ -0,0 +1,55 @@
+import json
+
+from metrics import Histogram, Metrics, RequestTimings, stage_timings, timed_stage
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("stage_seconds", "Stage time.", ("stage",), buckets=(0.1, 1.0))
+    for nanoseconds in (50_000_000, 500_000_000, 5_000_000_000):
+        histogram.observe(nanoseconds, ("parse",))
+    lines = histogram.render()
+    assert 'stage_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="parse",le="1.0"} 2' in lines
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'stage_seconds_count{stage="parse"} 3' in lines
+    assert 'stage_seconds_sum{stage="parse"} 5.55' in lines
+
+
+def test_collectors_escape_labels_and_print_integers_plainly():
+    metrics = Metrics()
+    metrics.add_collector("gov_terms_things", "Things.", "gauge", lambda: [({"name": 'say "hi"'}, 2.0)])
+    assert 'gov_terms_things{name="say \\"hi\\""} 2' in metrics.render().splitlines()
+
+
+def test_repeated_stages_are_summed():
+    timings = RequestTimings()
+    timings.stages += [("search_database", 2_000_000), ("parse", 500_000), ("search_database", 3_000_000)]
+    assert timings.totals() == {"search_database": 5_000_000, "parse": 500_000}
+    assert timings.server_timing(10_000_000) == "search_database;dur=5.00, parse;dur=0.50, total;dur=10.00"
+
+
+def test_stages_are_noops_outside_a_request():
+    with timed_stage("parse"):
+        pass
+    assert stage_timings() == {}
+
+
+def test_query_reports_stages_in_server_timing_and_metrics(client):
+    response = client.post("/api/query", json={"query": "What is the NDIS?"})
+    assert response.status_code == 200
+    header = response.headers["server-timing"]
+    assert "search_database;dur=" in header
+    assert "send_gemini_prompt;dur=" in header
+    assert "total;dur=" in header
+
+    body = client.get("/metrics").text
+    assert 'gov_terms_stage_seconds_count{stage="search_database",served_by="rag",cache="miss"}' in body
+    assert 'gov_terms_request_seconds_count{path="/api/query",status="200",served_by="rag",cache="miss"}' in body
+
+
+def test_stream_done_event_carries_the_stage_timings(client):
+    with client.stream("POST", "/api/query/stream", json={"query": "What is the NDIS?"}) as response:
+        lines = [line for line in response.iter_lines() if line.startswith("data:")]
+    done = json.loads(lines[-1][len("data:"):])
+    assert done["timing"]["send_gemini_prompt"] >= 0
+    assert done["timing"]["total"] >= done["timing"]["send_gemini_prompt"]
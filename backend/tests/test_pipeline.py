@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from upstream import DeadlineExceeded
+
+
+def test_run_stage_keeps_the_event_loop_responsive(backend_app):
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.ensure_future(ticker())
+        result = await backend_app.run_stage(asyncio.Semaphore(1), lambda: time.sleep(0.2) or "done")
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+    assert result == "done"
+    assert ticks >= 5
+
+
+def test_run_stage_limiter_bounds_concurrent_calls(backend_app):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    async def scenario():
+        limiter = asyncio.Semaphore(2)
+        await asyncio.gather(*(backend_app.run_stage(limiter, work) for _ in range(6)))
+
+    asyncio.run(scenario())
+    assert peak == 2
+
+
+def test_run_stage_timeout_raises_deadline_exceeded(backend_app):
+    def slow():
+        time.sleep(0.3)
+
+    async def scenario():
+        limiter = asyncio.Semaphore(1)
+        with pytest.raises(DeadlineExceeded):
+            await backend_app.run_stage(limiter, slow, timeout=0.05)
+        # The abandoned worker keeps its slot until it returns, then gives it back
+        assert limiter.locked()
+        await asyncio.sleep(0.4)
+        assert not limiter.locked()
+
+    asyncio.run(scenario())
+
+
+def test_query_runs_retrieval_and_generation(client, fakes):
+    response = client.post("/api/query", json={"query": "What does NDIS stand for?"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["served_by"] == "rag"
+    assert json.loads(body["ai_response"])["definition"] == "NDIS: National Disability Insurance Scheme"
+    assert [source["entity"] for source in body["sources"]] == [
+        "National Disability Insurance Agency", "Department of Social Services"
+    ]
+    assert body["selected_source"]["entity"] == "National Disability Insurance Agency"
+    assert len(fakes.index.calls) == 1
+    assert fakes.model.calls == 1
+
+
+def test_query_rejects_an_empty_query(client):
+    response = client.post("/api/query", json={"query": "   "})
+    assert response.status_code == 400
+
+
+def test_concurrent_identical_queries_share_one_generation(backend_app, fakes):
+    import httpx
+
+    fakes.model.latency = 0.1
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=backend_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            queries = ("NDIS meaning", "ndis meaning ", "NDIS MEANING")
+            return await asyncio.gather(*(client.post("/api/query", json={"query": query}) for query in queries))
+
+    responses = asyncio.run(scenario())
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert sorted(response.json()["cache"] for response in responses) == ["coalesced", "coalesced", "miss"]
+    assert fakes.model.calls == 1
+
+
+def test_slow_search_attempt_is_retried_and_frees_its_slot(backend_app, client, fakes, monkeypatch):
+    monkeypatch.setattr(backend_app, "RETRIEVAL_ATTEMPT_TIMEOUT", 0.1)
+    latencies = iter([1.0, 0.0])
+    fakes.index.latency = lambda: next(latencies)
+    start = time.perf_counter()
+    response = client.post("/api/query", json={"query": "What is the NDIS?"})
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 0.8
+    assert len(fakes.index.calls) == 2
+    # The worker returned after the retry, not after the abandoned 1 s search
+    assert backend_app.retrieval_limiter._value == backend_app.RETRIEVAL_CONCURRENCY
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from prompts import LEGACY_INSTRUCTIONS, SYSTEM_INSTRUCTION, PromptTemplate, extract_json, truncate_text
+
+HITS = [
+    {"score": 0.9, "text": "NDIS: National Disability Insurance Scheme", "entity": "NDIA",
+     "body_type": "Corporate Commonwealth entity"},
+    {"score": 0.8, "text": "NDIS: " + "x" * 100, "entity": "DSS", "body_type": ""},
+]
+
+
+def test_truncate_text_marks_the_cut():
+    assert truncate_text("short", 10) == "short"
+    assert truncate_text("abcdef  ghij", 8) == "abcdef…"
+    assert truncate_text("abcdef", 0) == "abcdef"
+
+
+def test_compact_context_is_one_json_line_per_hit():
+    template = PromptTemplate(max_text_chars=20)
+    lines = template.build_context(HITS).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row["index"] for row in rows] == [1, 2]
+    # chars is the full length even when the text is truncated
+    assert rows[1]["chars"] == len(HITS[1]["text"])
+    assert rows[1]["text"].endswith("…") and len(rows[1]["text"]) <= 21
+
+
+def test_compact_prompt_sends_only_the_query_and_context():
+    template = PromptTemplate()
+    prompt = template.build('what is "NDIS"', HITS)
+    assert prompt.startswith('User Query: "what is \\"NDIS\\""\nReference Context:\n')
+    assert SYSTEM_INSTRUCTION not in prompt
+    assert template.system_instruction == SYSTEM_INSTRUCTION
+    assert template.generation_config()["response_mime_type"] == "application/json"
+
+
+def test_legacy_prompt_inlines_the_instructions():
+    template = PromptTemplate(mode="legacy")
+    assert template.system_instruction is None
+    assert template.generation_config() is None
+    assert template.build("NDIS", HITS).startswith(LEGACY_INSTRUCTIONS)
+
+
+def test_batch_prompt_numbers_items():
+    prompt = PromptTemplate().build_batch([
+        {"id": 1, "query": "NDIS", "search_results": HITS},
+        {"id": 2, "query": "ATO", "search_results": HITS[:1]},
+    ])
+    assert "Item 1:\nUser Query: \"NDIS\"" in prompt
+    assert "Item 2:\nUser Query: \"ATO\"" in prompt
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        PromptTemplate(mode="verbose")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"definition": "x"}', {"definition": "x"}),
+    ('```json\n{"definition": "x"}\n```', {"definition": "x"}),
+    ('Here you go: {"definition": "x"} hope that helps', {"definition": "x"}),
+    ('```json\n[{"id": 1}, {"id": 2}]\n```', [{"id": 1}, {"id": 2}]),
+    ('[{"id": 1, "definition": "{braces}"}]', [{"id": 1, "definition": "{braces}"}]),
+    ("no json here", None),
+    ('{"definition": ', None),
+])
+def test_extract_json(text, expected):
+    assert extract_json(text) == expected
+
+
+def test_parse_gemini_response_selects_the_source_by_index(backend_app):
+    answer = json.dumps({"definition": "d", "elaboration": "", "source_entity": "NDIA", "source_index": 2})
+    result = backend_app.parse_gemini_response(answer, HITS)
+    assert result["selected_source"] is HITS[1]
+    assert json.loads(result["ai_response"])["definition"] == "d"
+
+
+def test_parse_gemini_response_falls_back_to_the_entity(backend_app):
+    answer = json.dumps({"definition": "d", "source_entity": "DSS"})
+    assert backend_app.parse_gemini_response(answer, HITS)["selected_source"] is HITS[1]
+    out_of_range = json.dumps({"definition": "d", "source_index": 7})
+    assert backend_app.parse_gemini_response(out_of_range, HITS)["selected_source"] is None
+
+
+def test_parse_gemini_response_passes_unparsed_text_through(backend_app):
+    assert backend_app.parse_gemini_response("Sorry, I can't.", HITS) == {
+        "ai_response": "Sorry, I can't.", "selected_source": None
+    }
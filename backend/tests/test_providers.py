@@ -0,0 +1,73 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from providers import LazyRetriever, ProviderUnavailable, Providers
+
+
+def test_provider_is_created_once_on_first_use():
+    created = []
+    providers = Providers()
+    providers.register("client", lambda: created.append(1) or object())
+    assert providers.status() == {"client": "not_initialized"}
+    first = providers.get("client")
+    assert providers.get("client") is first
+    assert created == [1]
+    assert providers.status() == {"client": "ready"}
+    assert providers["client"].init_seconds is not None
+
+
+def test_failed_factory_is_retried_on_the_next_call():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("PINECONE_API_KEY not set")
+        return "client"
+
+    providers = Providers()
+    providers.register("pinecone", factory)
+    with pytest.raises(ProviderUnavailable, match="pinecone unavailable"):
+        providers.get("pinecone")
+    assert providers.status() == {"pinecone": "error: PINECONE_API_KEY not set"}
+    assert providers.get("pinecone") == "client"
+    assert providers.status() == {"pinecone": "ready"}
+
+
+def test_override_replaces_the_factory():
+    providers = Providers()
+    providers.register("gemini", lambda: pytest.fail("factory must not run"))
+    providers.override("gemini", "fake")
+    assert providers.get("gemini") == "fake"
+
+
+def test_warm_logs_failures_instead_of_raising(caplog):
+    providers = Providers()
+    providers.register("ok", lambda: "ready")
+    providers.register("broken", lambda: 1 / 0)
+
+    async def scenario():
+        with ThreadPoolExecutor(2) as executor:
+            await providers.warm(executor)
+
+    asyncio.run(scenario())
+    assert providers["ok"].ready
+    assert not providers["broken"].ready
+    assert "Warm-up of broken failed" in caplog.text
+
+
+def test_lazy_retriever_defers_creation_until_search():
+    class Backend:
+        def search(self, query, top_k):
+            return [{"text": query, "score": 1.0}][:top_k]
+
+    created = []
+    providers = Providers()
+    provider = providers.register("retriever", lambda: created.append(1) or Backend())
+    retriever = LazyRetriever("pinecone:index", "ns", provider)
+    assert (retriever.name, retriever.namespace) == ("pinecone:index", "ns")
+    assert created == []
+    assert retriever.search("ATO", 1) == [{"text": "ATO", "score": 1.0}]
+    assert created == [1]
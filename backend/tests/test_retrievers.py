@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from conftest import FAKE_HITS, FakeIndex
+from retrievers import LocalVectorRetriever, PineconeRetriever, glossary_record_fields, write_vector_store
+
+RECORDS = [glossary_record_fields({"Term": term, "Definition": term.lower(), "Entity": f"Entity {i}"})
+           for i, term in enumerate(["ATO", "NDIS", "GST"])]
+VECTORS = {"ATO": [1.0, 0.0, 0.0], "NDIS": [0.0, 2.0, 0.0], "GST": [0.6, 0.0, 0.8]}
+
+
+def embed(texts, input_type):
+    return np.asarray([VECTORS[text] for text in texts])
+
+
+@pytest.fixture
+def store(tmp_path):
+    write_vector_store(str(tmp_path / "store"), RECORDS, [VECTORS["ATO"], VECTORS["NDIS"], VECTORS["GST"]])
+    return LocalVectorRetriever(str(tmp_path / "store"), embed)
+
+
+def test_local_retriever_ranks_by_cosine_similarity(store):
+    hits = store.search("ATO", 3)
+    assert [hit["text"] for hit in hits] == ["ATO: ato", "GST: gst", "NDIS: ndis"]
+    assert [hit["score"] for hit in hits] == [1.0, 0.6, 0.0]
+    assert hits[0]["entity"] == "Entity 0"
+
+
+def test_local_retriever_normalizes_stored_and_query_vectors(store):
+    # NDIS was stored with norm 2; its self-similarity is still 1
+    assert store.search("NDIS", 1)[0]["score"] == 1.0
+
+
+def test_local_retriever_caps_top_k(store):
+    assert len(store.search("GST", 10)) == 3
+    assert store.describe() == {"retriever": "local", "vector_count": 3, "ann": "exact"}
+
+
+def test_local_retriever_rejects_mismatched_store(tmp_path):
+    write_vector_store(str(tmp_path / "store"), RECORDS[:2], [VECTORS["ATO"], VECTORS["NDIS"], VECTORS["GST"]])
+    with pytest.raises(ValueError):
+        LocalVectorRetriever(str(tmp_path / "store"), embed)
+
+
+def test_pinecone_retriever_shapes_and_sorts_hits():
+    hits = PineconeRetriever(FakeIndex(hits=FAKE_HITS[::-1]), "index", "ns").search("NDIS", 3)
+    assert [hit["score"] for hit in hits] == [0.912, 0.874]
+    assert hits[0]["body_type"] == "Corporate Commonwealth entity"
@@ -0,0 +1,81 @@
+import json
+
+from streaming import PartialAnswerParser, answer_deltas, sse_event
+
+ANSWER = json.dumps({
+    "definition": 'ATO: "Australian" Taxation Office — tax\\admin',
+    "elaboration": "Collects revenue.\nAdministers super.",
+    "source_index": 1,
+}, ensure_ascii=True)
+
+
+def stream(parser, text, size):
+    deltas = {"definition": "", "elaboration": ""}
+    for i in range(0, len(text), size):
+        for field, delta in parser.feed(text[i:i + size]):
+            deltas[field] += delta
+    return deltas
+
+
+def test_parser_reassembles_fields_from_any_chunking():
+    expected = json.loads(ANSWER)
+    for size in (1, 2, 3, 5, 7, len(ANSWER)):
+        deltas = stream(PartialAnswerParser(), ANSWER, size)
+        assert deltas["definition"] == expected["definition"], size
+        assert deltas["elaboration"] == expected["elaboration"], size
+
+
+def test_parser_never_emits_half_an_escape():
+    parser = PartialAnswerParser()
+    assert parser.feed('{"definition": "a\\') == [("definition", "a")]
+    assert parser.feed("u00") == []
+    assert parser.feed('e9b"') == [("definition", "éb")]
+
+
+def test_parser_ignores_other_fields():
+    parser = PartialAnswerParser()
+    assert parser.feed('{"source_entity": "ATO", "definition": "x"}') == [("definition", "x")]
+
+
+def test_answer_deltas_falls_back_to_the_raw_text():
+    assert answer_deltas("not json") == [("definition", "not json")]
+
+
+def test_sse_event_framing():
+    assert sse_event("delta", {"field": "definition"}) == 'event: delta\ndata: {"field": "definition"}\n\n'
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint_sends_sources_deltas_and_done(client):
+    response = client.post("/api/query/stream", json={"query": "What does NDIS stand for?"})
+    assert response.status_code == 200
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "sources" and names[-1] == "done"
+    assert set(names[1:-1]) == {"delta"}
+    definition = "".join(data["text"] for name, data in events if name == "delta" and data["field"] == "definition")
+    assert definition == "NDIS: National Disability Insurance Scheme"
+    assert events[-1][1]["selected_source"]["entity"] == "National Disability Insurance Agency"
+
+
+def test_stream_endpoint_replays_exact_matches(client, fakes):
+    events = parse_events(client.post("/api/query/stream", json={"query": "ATO"}).text)
+    assert events[0][1]["served_by"] == "exact_match"
+    assert events[-1][0] == "done"
+    assert fakes.index.calls == [] and fakes.model.calls == 0
+
+
+def test_stream_done_event_carries_the_stage_timing(client):
+    response = client.post("/api/query/stream", json={"query": "What does NDIS stand for?"})
+    timing = parse_events(response.text)[-1][1]["timing"]
+    assert {"search_database", "send_gemini_prompt", "parse", "total"} <= set(timing)
+    assert timing["total"] >= timing["search_database"]
+    # The header was sent before retrieval ran
+    assert "search_database" not in response.headers["server-timing"]
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+import structured_logging
+from structured_logging import JsonFormatter, PayloadSamplingMiddleware, log_payload, payload_sampling, truncate
+
+logger = logging.getLogger("test_payloads")
+
+
+@pytest.fixture
+def half_sampled(monkeypatch, caplog):
+    """Sample rate 0.5 with random() alternating 0.9 (not sampled) and 0.1 (sampled)."""
+    draws = iter([0.9, 0.1] * 50)
+    monkeypatch.setattr(structured_logging, "_payload_sample_rate", 0.5)
+    monkeypatch.setattr(structured_logging.random, "random", lambda: next(draws))
+    caplog.set_level(logging.INFO, logger="test_payloads")
+    return caplog
+
+
+def log_request_payloads():
+    log_payload(logger, "Search results payload", hits=[1])
+    log_payload(logger, "Gemini prompt payload", context=[1])
+    log_payload(logger, "Query answer payload", ai_response="{}")
+
+
+def test_payload_sampling_is_decided_once_per_request(half_sampled):
+    with payload_sampling():
+        log_request_payloads()
+    assert half_sampled.records == []
+    with payload_sampling():
+        log_request_payloads()
+    assert [record.getMessage() for record in half_sampled.records] == [
+        "Search results payload", "Gemini prompt payload", "Query answer payload"
+    ]
+
+
+def test_payloads_outside_a_request_are_sampled_per_call(half_sampled):
+    log_request_payloads()
+    assert [record.getMessage() for record in half_sampled.records] == ["Gemini prompt payload"]
+
+
+def test_middleware_samples_each_http_request(half_sampled):
+    async def handler(scope, receive, send):
+        log_request_payloads()
+
+    middleware = PayloadSamplingMiddleware(handler)
+    for _ in range(2):
+        asyncio.run(middleware({"type": "http"}, None, None))
+    assert len(half_sampled.records) == 3
+
+
+def test_no_payloads_at_rate_zero(caplog):
+    caplog.set_level(logging.INFO, logger="test_payloads")
+    with payload_sampling():
+        log_request_payloads()
+    assert caplog.records == []
+
+
+def test_truncate_bounds_strings_and_collections():
+    assert truncate("x" * 12, 10, 3) == "xxxxxxxxxx...(+2 chars)"
+    assert truncate(list(range(5)), 10, 3) == [0, 1, 2, "...(+2 items)"]
+    assert truncate({"a": object()}, 5, 3)["a"].startswith("<obje")
+
+
+def test_json_formatter_inlines_extra_fields():
+    record = logging.makeLogRecord({"name": "app", "levelname": "INFO", "msg": "Query answered",
+                                    "served_by": "rag"})
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "Query answered"
+    assert entry["served_by"] == "rag"
@@ -0,0 +1,63 @@
+from suggest import TermTrie, max_edits
+
+TERMS = ["ATO", "ATP", "NDIS", "NDIA", "Grant", "Grants", "Goods and Services Tax", "Government"]
+
+
+def trie(terms=TERMS):
+    return TermTrie((term.lower(), term) for term in terms)
+
+
+def terms(results):
+    return [result["term"] for result in results]
+
+
+def test_edit_budget_grows_with_the_prefix():
+    assert [max_edits("a" * n) for n in (1, 2, 3, 7, 8, 12)] == [0, 0, 1, 1, 2, 2]
+
+
+def test_completions_rank_shortest_then_alphabetically():
+    results = trie().search("g")
+    assert terms(results) == ["Grant", "Grants", "Government", "Goods and Services Tax"]
+    assert {result["distance"] for result in results} == {0}
+
+
+def test_a_three_letter_typo_finds_the_acronym():
+    assert trie().search("ayp") == [{"term": "ATP", "distance": 1}]
+
+
+def test_a_correct_acronym_does_not_suggest_its_neighbours():
+    assert terms(trie().search("atp")) == ["ATP"]
+
+
+def test_adjacent_transposition_is_one_edit():
+    assert trie().search("gvoe") == [{"term": "Government", "distance": 1}]
+
+
+def test_two_letter_prefixes_only_complete():
+    assert trie().search("ax") == []
+
+
+def test_only_the_fewest_typos_are_returned():
+    assert trie().search("grnats", edits=2) == [{"term": "Grants", "distance": 1}]
+    assert trie().search("ndsi") == [{"term": "NDIA", "distance": 1}, {"term": "NDIS", "distance": 1}]
+
+
+def test_a_long_typo_keeps_only_the_closest_term():
+    results = trie(TERMS + ["Governor", "Governed"]).search("govermnent")
+    assert results == [{"term": "Government", "distance": 1}]
+
+
+def test_the_first_character_must_match():
+    assert trie().search("mdis") == []
+
+
+def test_empty_trie_and_prefix():
+    assert TermTrie([]).search("ato") == []
+    assert trie().search("") == []
+    assert trie().search("nd", limit=1) == [{"term": "NDIA", "distance": 0}]
+
+
+def test_suggest_endpoint_corrects_a_short_acronym(client):
+    response = client.get("/api/suggest", params={"prefix": "AYP"})
+    assert response.status_code == 200
+    assert response.json()["suggestions"] == [{"term": "ATP", "distance": 1}]
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from upstream import AttemptTimeout, Hedger, RetryBudget, RetryPolicy, is_retryable, stage_timeout, start_deadline
+
+
+class Unavailable(Exception):
+    status = 503
+
+
+def flaky(failures, exc=Unavailable):
+    """A call failing `failures` times before it returns "ok"."""
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise exc("upstream failed")
+        return "ok"
+
+    call.calls = calls
+    return call
+
+
+def test_is_retryable_matches_transient_failures():
+    assert is_retryable(Unavailable())
+    assert is_retryable(TimeoutError())
+    assert is_retryable(ConnectionResetError())
+    assert is_retryable(type("ServiceUnavailable", (Exception,), {})())
+    assert not is_retryable(ValueError("bad request"))
+
+
+def test_retry_policy_retries_transient_failures():
+    policy = RetryPolicy("retrieval", attempts=3, base_delay=0.001)
+    call = flaky(2)
+    assert policy.call(call) == "ok"
+    assert len(call.calls) == 3
+    assert policy.stats()["retries"] == 2
+
+
+def test_retry_policy_does_not_retry_other_errors():
+    policy = RetryPolicy("retrieval", attempts=3, base_delay=0.001)
+    call = flaky(1, ValueError)
+    with pytest.raises(ValueError):
+        policy.call(call)
+    assert len(call.calls) == 1
+
+
+def test_retry_policy_stops_when_the_budget_is_spent():
+    policy = RetryPolicy("retrieval", attempts=3, base_delay=0.001, budget=RetryBudget(ratio=0.0, min_tokens=1.0))
+    assert policy.call(flaky(1)) == "ok"
+    with pytest.raises(Unavailable):
+        policy.call(flaky(1))
+    assert policy.stats()["budget_exhausted"] == 1
+
+
+def test_retry_policy_gives_up_at_the_deadline():
+    policy = RetryPolicy("retrieval", attempts=3, base_delay=1.0, max_delay=1.0)
+    call = flaky(1)
+
+    def in_request():
+        start_deadline(0.0)
+        return policy.call(call)
+
+    with pytest.raises(Unavailable):
+        asyncio.run(asyncio.to_thread(in_request))
+    assert len(call.calls) == 1
+
+
+def test_stage_timeout_is_capped_by_the_deadline():
+    async def scenario():
+        assert stage_timeout(3.0) == 3.0
+        start_deadline(1.0)
+        return stage_timeout(3.0)
+
+    assert 0.9 < asyncio.run(scenario()) <= 1.0
+
+
+def test_attempt_timeout_raises_a_retryable_error_without_waiting():
+    attempts = AttemptTimeout("retrieval", lambda: 0.05, max_workers=2)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError) as raised:
+        attempts.call(time.sleep, 0.5)
+    assert time.perf_counter() - start < 0.3
+    assert is_retryable(raised.value)
+    assert attempts.stats() == {"attempt_timeouts": 1}
+
+
+def test_attempt_timeout_passes_results_and_errors_through():
+    attempts = AttemptTimeout("retrieval", lambda: 1.0, max_workers=1)
+    assert attempts.call(lambda a, b: a + b, 1, 2) == 3
+    with pytest.raises(TimeoutError, match="upstream failed"):
+        attempts.call(flaky(1, TimeoutError))
+    assert attempts.timeouts == 0
+
+
+def test_retries_recover_from_a_slow_attempt():
+    latencies = iter([0.5, 0.0])
+    policy = RetryPolicy("retrieval", attempts=3, base_delay=0.001)
+    attempts = AttemptTimeout("retrieval", lambda: 0.05, max_workers=2)
+    start = time.perf_counter()
+    assert policy.call(attempts.call, lambda: time.sleep(next(latencies)) or "ok") == "ok"
+    assert time.perf_counter() - start < 0.3
+
+
+def test_hedger_uses_the_faster_copy():
+    latencies = iter([0.5, 0.01])
+
+    async def search():
+        await asyncio.sleep(next(latencies))
+        return "hits"
+
+    hedger = Hedger(0.05)
+    assert asyncio.run(hedger.run(search)) == "hits"
+    assert hedger.stats()["hedged"] == 1 and hedger.stats()["hedge_wins"] == 1
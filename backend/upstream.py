@@ -0,0 +1,207 @@
+"""
+Gov Terms AI - Upstream call policy
+Deadlines, retries and hedging for the blocking Pinecone and Gemini calls.
+
+A request starts a Deadline from the overall budget; each stage gets the
+smaller of its own timeout and what is left of the budget. The deadline is
+held in a context variable, which run_stage copies into the executor
+thread, so retries there stop once the request has given up. Retries use
+capped exponential backoff with full jitter, and a RetryBudget keeps them
+to a fraction of calls, so an upstream outage doesn't turn into a retry storm.
+Calls whose SDK takes no timeout of their own are bounded per attempt by
+AttemptTimeout, so a slow attempt fails in time to be retried.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Status codes and exception names (Pinecone, google-api-core, urllib3, grpc)
+# worth another attempt; matched by name so no SDK has to be imported here
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+RETRYABLE_NAMES = ("Timeout", "Connection", "ServiceUnavailable", "DeadlineExceeded",
+                   "ResourceExhausted", "TooManyRequests", "InternalServerError", "ProtocolError")
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before an upstream call could finish."""
+
+
+class Deadline:
+    """Absolute monotonic deadline for one request."""
+
+    def __init__(self, budget: float):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def start_deadline(budget: float) -> Deadline:
+    """Start the current request's deadline; stages started after this share it."""
+    deadline = Deadline(budget)
+    _current_deadline.set(deadline)
+    return deadline
+
+
+def stage_timeout(cap: float) -> float:
+    """Timeout for a stage: its own cap, or less if the request budget is nearly spent."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return cap
+    return min(cap, deadline.remaining())
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient upstream failures: timeouts, dropped connections, 429 and 5xx."""
+    for attribute in ("status", "status_code", "code"):
+        status = getattr(exc, attribute, None)
+        if isinstance(status, int) and status in RETRYABLE_STATUS:
+            return True
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return any(name in type(exc).__name__ for name in RETRYABLE_NAMES)
+
+
+class RetryBudget:
+    """Token bucket allowing retries for at most `ratio` of calls, plus a small floor."""
+
+    def __init__(self, ratio: float = 0.1, min_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = min_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class RetryPolicy:
+    """Bounded retries with capped exponential backoff and full jitter, run on the calling thread."""
+
+    def __init__(self, name: str, attempts: int = 3, base_delay: float = 0.1, max_delay: float = 1.0,
+                 budget: Optional[RetryBudget] = None):
+        self.name = name
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.retries = 0
+        self.exhausted = 0
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Call func, retrying transient failures while attempts, the retry budget and the request deadline allow."""
+        self.budget.record_call()
+        for attempt in range(self.attempts):
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt == self.attempts - 1 or not is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                deadline = _current_deadline.get()
+                if deadline is not None and deadline.remaining() <= delay:
+                    raise
+                if not self.budget.try_spend():
+                    self.exhausted += 1
+                    raise
+                self.retries += 1
+                logger.warning(f"Retrying {self.name} after {type(e).__name__} (attempt {attempt + 2}/{self.attempts})")
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, int]:
+        return {"retries": self.retries, "budget_exhausted": self.exhausted}
+
+
+class AttemptTimeout:
+    """
+    Bound each attempt of a blocking call that accepts no timeout (Pinecone's
+    search_records): the call runs on a small dedicated pool, and the caller
+    gets a retryable TimeoutError once timeout() seconds pass instead of
+    waiting for it. The abandoned call finishes in the background; the pool's
+    size caps how many can pile up.
+    """
+
+    def __init__(self, name: str, timeout: Callable[[], float], max_workers: int):
+        self.name = name
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-attempt")
+        self.timeouts = 0
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        budget = self.timeout()
+        # Copy the context so the attempt sees the request's deadline and timings
+        future = self.executor.submit(contextvars.copy_context().run, func, *args)
+        try:
+            return future.result(timeout=budget)
+        except TimeoutError:
+            if future.done():
+                raise
+            self.timeouts += 1
+            raise TimeoutError(f"{self.name} attempt exceeded {budget:.2f}s")
+
+    def stats(self) -> Dict[str, int]:
+        return {"attempt_timeouts": self.timeouts}
+
+
+class Hedger:
+    """
+    Send a second copy of a slow call after `delay` seconds and use whichever
+    finishes first. Only worth it for idempotent reads such as retrieval; the
+    losing call is left to finish in the background.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def run(self, make_call: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        if self.delay <= 0:
+            return await make_call()
+        primary = asyncio.ensure_future(make_call())
+        pending = {primary}
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.delay)
+            if done:
+                return primary.result()
+            self.hedged += 1
+            hedge = asyncio.ensure_future(make_call())
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"delay_s": self.delay, "calls": self.calls, "hedged": self.hedged, "hedge_wins": self.hedge_wins}
@@ -1,7 +1,8 @@
 import React, { useEffect, useState, useRef, useCallback } from 'react';
 import ReactMarkdown from 'react-markdown';
-import { getBackendStatus, sendChatMessage } from './utils/api';
+import { getBackendStatus, streamChatMessage } from './utils/api';
 import useUserPreferences from './hooks/useUserPreferences';
+import useSuggestions from './hooks/useSuggestions';
 import './App.css';
 import {
   ChatHeader,
@@ -15,7 +16,8 @@ import {
   HelpPanel,
   ErrorMessage,
   WelcomeMessage,
-  UserPreferences
+  UserPreferences,
+  SuggestionList
 } from './components';
 
 
@@ -37,6 +39,11 @@ const App = () => {
   const [summary, setSummary] = useState('');
   const [isGeneratingSummary, setIsGeneratingSummary] = useState(false);
   const [settingsPanelOpen, setSettingsPanelOpen] = useState(false);
+  const [showSuggestions, setShowSuggestions] = useState(false);
+  const [activeSuggestion, setActiveSuggestion] = useState(-1);
+  
+  // Debounced autocomplete, so typos are corrected before they cost a full query
+  const { suggestions, clearSuggestions } = useSuggestions(userInput, showSuggestions && isConnected && !isLoading);
   
   // Refs
   const messagesEndRef = useRef(null);
@@ -108,6 +115,8 @@ const handleSendMessage = async (e) => {
 
   const messageText = userInput.trim();
   setUserInput('');
+  setShowSuggestions(false);
+  clearSuggestions();
 
   // Add user message
   const userMessage = { 
@@ -120,14 +129,40 @@ const handleSendMessage = async (e) => {
   setIsLoading(true);
   setError(null);
 
-  try {
-    // Convert chat history to backend format (content instead of text)
-    const backendChatHistory = chatHistory.map(msg => ({
-      role: msg.role,
-      content: msg.text
-    }));
+  // Streamed answer text, shown while Gemini is still generating
+  let definition = '';
+  let elaboration = '';
+  let streamStarted = false;
+  const updateLastMessage = (fields) => {
+    setChatHistory(prev => {
+      const next = [...prev];
+      next[next.length - 1] = { ...next[next.length - 1], ...fields };
+      return next;
+    });
+  };
 
-    const response = await sendChatMessage(messageText, backendChatHistory);
+  try {
+    const response = await streamChatMessage(messageText, {
+      onSources: (sources) => {
+        // Sources arrive as soon as retrieval finishes; show the answer bubble now
+        streamStarted = true;
+        setIsLoading(false);
+        setChatHistory(prev => [...prev, {
+          role: 'assistant',
+          text: '',
+          sources,
+          timestamp: new Date().toISOString()
+        }]);
+      },
+      onDelta: (field, text) => {
+        if (field === 'elaboration') {
+          elaboration += text;
+        } else {
+          definition += text;
+        }
+        updateLastMessage({ text: elaboration ? `${definition}\n\n${elaboration}` : definition });
+      },
+    });
     
     // Debug: Log the exact response received
     console.log('Raw backend response:', response);
@@ -190,10 +225,16 @@ const handleSendMessage = async (e) => {
       sources: response.sources || [], // All sources for debugging
       selectedSource: response.selectedSource, // The source Gemini actually used
       parsedResponse: parsedResponse, // Include parsed response for source matching
+      servedBy: response.servedBy,
+      timing: response.timing,
       timestamp: new Date().toISOString()
     };
 
-    setChatHistory(prev => [...prev, assistantMessage]);
+    if (streamStarted) {
+      updateLastMessage(assistantMessage);
+    } else {
+      setChatHistory(prev => [...prev, assistantMessage]);
+    }
 
   } catch (error) {
     console.error('Chat error:', error);
@@ -205,7 +246,12 @@ const handleSendMessage = async (e) => {
       timestamp: new Date().toISOString(),
       isError: true
     };
-    setChatHistory(prev => [...prev, errorMessage]);
+    if (streamStarted) {
+      // Replace the half-streamed answer rather than leaving it above the error
+      setChatHistory(prev => [...prev.slice(0, -1), errorMessage]);
+    } else {
+      setChatHistory(prev => [...prev, errorMessage]);
+    }
 
   } finally {
     setIsLoading(false);
@@ -251,7 +297,40 @@ This conversation focused on Australian government terminology and definitions.`
     }
   };
   
-  const handleKeyPress = (e) => {
+  const handleInputChange = (e) => {
+    setUserInput(e.target.value);
+    setShowSuggestions(true);
+    setActiveSuggestion(-1);
+  };
+  
+  const handleSelectSuggestion = (term) => {
+    setUserInput(term);
+    setShowSuggestions(false);
+    setActiveSuggestion(-1);
+    clearSuggestions();
+    inputRef.current?.focus();
+  };
+  
+  const handleKeyDown = (e) => {
+    if (suggestions.length > 0) {
+      if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+        e.preventDefault();
+        const step = e.key === 'ArrowDown' ? 1 : -1;
+        // Cycle through the list and back to the typed text (-1)
+        setActiveSuggestion(prev => ((prev + step + 2 + suggestions.length) % (suggestions.length + 1)) - 1);
+        return;
+      }
+      if (e.key === 'Escape') {
+        setShowSuggestions(false);
+        setActiveSuggestion(-1);
+        return;
+      }
+      if ((e.key === 'Enter' || e.key === 'Tab') && suggestions[activeSuggestion]) {
+        e.preventDefault();
+        handleSelectSuggestion(suggestions[activeSuggestion].term);
+        return;
+      }
+    }
     if (e.key === 'Enter' && !e.shiftKey) {
       e.preventDefault();
       handleSendMessage(e);
@@ -302,15 +381,24 @@ This conversation focused on Australian government terminology and definitions.`
             <div className="input-area">
               <form onSubmit={handleSendMessage} className="input-container">
                 <div className="input-wrapper">
+                  <SuggestionList
+                    suggestions={suggestions}
+                    activeIndex={activeSuggestion}
+                    onSelect={handleSelectSuggestion}
+                  />
                   <textarea
                     ref={inputRef}
                     className="chat-input"
                     value={userInput}
-                    onChange={(e) => setUserInput(e.target.value)}
-                    onKeyPress={handleKeyPress}
+                    onChange={handleInputChange}
+                    onKeyDown={handleKeyDown}
+                    onBlur={() => setShowSuggestions(false)}
                     placeholder="Type your message..."
                     disabled={isLoading || !isConnected}
                     rows="1"
+                    aria-autocomplete="list"
+                    aria-controls="suggestion-list"
+                    aria-activedescendant={activeSuggestion >= 0 ? `suggestion-${activeSuggestion}` : undefined}
                   />
                 </div>
                 <button 
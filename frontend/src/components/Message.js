@@ -1,6 +1,15 @@
 import React from 'react';
 import ReactMarkdown from 'react-markdown';
 
+// "search_database 182 ms · send_gemini_prompt 748 ms · total 931 ms", total last
+const formatTiming = (timing) => {
+  const stages = Object.entries(timing || {}).filter(([name]) => name !== 'total');
+  if (timing && timing.total !== undefined) {
+    stages.push(['total', timing.total]);
+  }
+  return stages.map(([name, ms]) => `${name} ${Math.round(ms)} ms`).join(' · ');
+};
+
 // Message component to handle the source format from backend
 const Message = ({ message }) => {
   const isUser = message.role === 'user';
@@ -42,6 +51,13 @@ const Message = ({ message }) => {
           </div>
         )}
 
+        {message.servedBy && !isUser && (
+          <div className="message-timing">
+            Served by {message.servedBy}
+            {message.timing && Object.keys(message.timing).length > 0 && ` · ${formatTiming(message.timing)}`}
+          </div>
+        )}
+
         {displaySource && !message.isError && !isUser && (
             <div className="message-sources">
               <div className="sources-title"><strong>Source:</strong></div>
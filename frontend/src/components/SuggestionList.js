@@ -0,0 +1,30 @@
+import React from 'react';
+
+// Autocomplete list shown above the chat input
+const SuggestionList = ({ suggestions, activeIndex, onSelect }) => {
+  if (suggestions.length === 0) return null;
+
+  return (
+    <ul className="suggestion-list" id="suggestion-list" role="listbox" aria-label="Suggested terms">
+      {suggestions.map((suggestion, index) => (
+        <li
+          key={suggestion.term}
+          id={`suggestion-${index}`}
+          role="option"
+          aria-selected={index === activeIndex}
+          className={`suggestion-item ${index === activeIndex ? 'active' : ''}`}
+          // mousedown fires before the input loses focus
+          onMouseDown={(e) => {
+            e.preventDefault();
+            onSelect(suggestion.term);
+          }}
+        >
+          <span className="suggestion-term">{suggestion.term}</span>
+          {suggestion.distance > 0 && <span className="suggestion-hint">did you mean?</span>}
+        </li>
+      ))}
+    </ul>
+  );
+};
+
+export default SuggestionList;
@@ -12,3 +12,4 @@ export { default as HelpPanel } from './HelpPanel';
 export { default as ErrorMessage } from './ErrorMessage';
 export { default as WelcomeMessage } from './WelcomeMessage';
 export { default as UserPreferences } from './UserPreferences';
+export { default as SuggestionList } from './SuggestionList';
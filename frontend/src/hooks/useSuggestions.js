@@ -0,0 +1,48 @@
+import { useState, useEffect } from 'react';
+import { getSuggestions } from '../utils/api';
+
+const DEBOUNCE_MS = 150;
+const MIN_LENGTH = 2;
+// Longer input is a question, not a term being typed
+const MAX_LENGTH = 60;
+
+const useSuggestions = (input, enabled = true) => {
+  const [suggestions, setSuggestions] = useState([]);
+
+  useEffect(() => {
+    const prefix = input.trim();
+    if (!enabled || prefix.length < MIN_LENGTH || prefix.length > MAX_LENGTH) {
+      setSuggestions([]);
+      return undefined;
+    }
+
+    // Only ask once typing pauses, and drop the answer if the input has changed since
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const results = await getSuggestions(prefix, { signal: controller.signal });
+        // Nothing to offer when the input already is the only match
+        const exact = results.length === 1 && results[0].term.toLowerCase() === prefix.toLowerCase();
+        setSuggestions(exact ? [] : results);
+      } catch (error) {
+        if (error.name !== 'AbortError') {
+          setSuggestions([]);
+        }
+      }
+    }, DEBOUNCE_MS);
+
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [input, enabled]);
+
+  const clearSuggestions = () => setSuggestions([]);
+
+  return {
+    suggestions,
+    clearSuggestions
+  };
+};
+
+export default useSuggestions;
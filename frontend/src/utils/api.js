@@ -1,5 +1,22 @@
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL
 
+/**
+ * Parse the backend's Server-Timing header into per-stage durations
+ * @param {string|null} header - e.g. "search_database;dur=182.40, total;dur=931.20"
+ * @returns {Object<string, number>} Milliseconds per stage
+ */
+export const parseServerTiming = (header) => {
+  const timing = {};
+  for (const entry of (header || '').split(',')) {
+    const [name, ...params] = entry.trim().split(';');
+    const duration = params.find((param) => param.trim().startsWith('dur='));
+    if (name && duration) {
+      timing[name] = parseFloat(duration.trim().slice(4));
+    }
+  }
+  return timing;
+};
+
 /**
  * Send chat message to the simplified backend
  * @param {string} message - User's message/query
@@ -46,6 +63,8 @@ export const sendChatMessage = async (message, chatHistory = []) => {
       selectedSource: data.selected_source, // The source Gemini actually used
       query: data.query,
       timestamp: data.timestamp,
+      servedBy: data.served_by,
+      timing: parseServerTiming(response.headers.get('Server-Timing')),
     };
   } catch (error) {
     console.error('API call failed:', error);
@@ -53,6 +72,116 @@ export const sendChatMessage = async (message, chatHistory = []) => {
   }
 };
 
+/**
+ * Parse a Server-Sent Events buffer into complete events
+ * @param {string} buffer - Text received so far
+ * @returns {{events: Array<{event: string, data: Object}>, rest: string}} Parsed events and unconsumed text
+ */
+const parseSseBuffer = (buffer) => {
+  const events = [];
+  const blocks = buffer.split('\n\n');
+  const rest = blocks.pop();
+  for (const block of blocks) {
+    let event = 'message';
+    const dataLines = [];
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) {
+        event = line.slice(6).trim();
+      } else if (line.startsWith('data:')) {
+        dataLines.push(line.slice(5).trim());
+      }
+    }
+    if (dataLines.length) {
+      events.push({ event, data: JSON.parse(dataLines.join('\n')) });
+    }
+  }
+  return { events, rest };
+};
+
+/**
+ * Stream a chat message from the backend via Server-Sent Events
+ * @param {string} message - User's message/query
+ * @param {Object} handlers - Callbacks for stream events
+ * @param {Function} handlers.onSources - Called with the processed sources as soon as retrieval finishes
+ * @param {Function} handlers.onDelta - Called with (field, text) as definition/elaboration text arrives
+ * @returns {Promise<Object>} Final response in the same shape as sendChatMessage
+ */
+export const streamChatMessage = async (message, { onSources, onDelta } = {}) => {
+  const response = await fetch(`${API_BASE_URL}/api/query/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify({ query: message }),
+  });
+
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+  }
+
+  // The header only times request parsing; the done event carries the full per-stage timing
+  const headerTiming = parseServerTiming(response.headers.get('Server-Timing'));
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let sources = [];
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const parsed = parseSseBuffer(buffer);
+    buffer = parsed.rest;
+
+    for (const { event, data } of parsed.events) {
+      if (event === 'sources') {
+        sources = data.sources.map((source) => ({
+          score: source.score,
+          text: source.text,
+          entity: source.entity,
+          portfolio: source.portfolio,
+          url: source.url,
+        }));
+        onSources?.(sources);
+      } else if (event === 'delta') {
+        onDelta?.(data.field, data.text);
+      } else if (event === 'done') {
+        return {
+          response: data.ai_response,
+          sources,
+          selectedSource: data.selected_source,
+          servedBy: data.served_by,
+          timing: data.timing || headerTiming,
+        };
+      } else if (event === 'error') {
+        throw new Error(data.detail || 'Failed to send message');
+      }
+    }
+  }
+
+  throw new Error('Stream ended before the response was complete');
+};
+
+/**
+ * Fetch glossary terms matching what the user has typed so far, allowing for typos
+ * @param {string} prefix - Current input text
+ * @param {Object} options
+ * @param {number} options.limit - Maximum suggestions to return
+ * @param {AbortSignal} options.signal - Aborts the request when the input changes again
+ * @returns {Promise<Array<{term: string, distance: number}>>} Suggestions, best first
+ */
+export const getSuggestions = async (prefix, { limit = 6, signal } = {}) => {
+  const params = new URLSearchParams({ prefix, limit: String(limit) });
+  const response = await fetch(`${API_BASE_URL}/api/suggest?${params}`, { signal });
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  const data = await response.json();
+  return data.suggestions;
+};
+
 /**
  * Check if backend is available
  * @returns {Promise<boolean>} True if backend is reachable
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Cleaning throughput benchmark for Gov Terms AI.
+Writes a synthetic glossary (one million rows by default) as JSONL, then runs
+the data_utils validate -> clean pipeline over it with 1, 2, 4 and one-per-core
+worker processes and reports records per second for each.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from data_utils import DataProcessor, clean_text  # noqa: E402
+
+SAMPLE_DEFINITION = (
+    "The  “{term}” programme — administered by the {agency} … funds\treasonable and necessary "
+    "supports for people with permanent and significant disability​. "
+)
+
+
+def legacy_clean_text(text):
+    """The pre-translate clean_text, kept for comparison."""
+    text = re.sub(r'\s+', ' ', text.strip())
+    text = ''.join(char for char in text if char.isprintable() or char.isspace())
+    for old, new in {'“': '"', '”': '"', '‘': "'", '’': "'", '–': '-', '—': '-', '…': '...'}.items():
+        text = text.replace(old, new)
+    return text
+
+
+def write_synthetic_glossary(path, rows):
+    """Write rows synthetic term records as JSONL."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(rows):
+            term = f"Term {i}"
+            f.write(json.dumps({
+                'term': f"  {term} ",
+                'definition': SAMPLE_DEFINITION.format(term=term, agency=f"Agency {i % 97}") * (1 + i % 3),
+                'source': f"Agency {i % 97}",
+                'category': f"Category {i % 13}",
+            }, ensure_ascii=False) + '\n')
+
+
+def time_per_call(func, text, repeat=20000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Benchmark data_utils cleaning throughput")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic glossary rows')
+    parser.add_argument('--workers', default=None,
+                        help='Comma-separated worker counts (default: 1,2,4 and one per core)')
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = [int(w) for w in args.workers.split(',')] if args.workers else sorted({1, 2, 4, cores})
+
+    sample = SAMPLE_DEFINITION.format(term="NDIS", agency="NDIA") * 2
+    print(f"clean_text: {time_per_call(clean_text, sample):.2f} us/call "
+          f"(legacy {time_per_call(legacy_clean_text, sample):.2f} us/call)")
+
+    processor = DataProcessor(data_dir=tempfile.gettempdir())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'glossary.jsonl')
+        write_synthetic_glossary(path, args.rows)
+        print(f"\n{args.rows} rows, {os.path.getsize(path) / 1e6:.0f} MB, {cores} cores")
+        print(f"{'workers':>7} {'seconds':>8} {'records/s':>10}")
+        for workers in worker_counts:
+            start = time.perf_counter()
+            count = sum(1 for _ in processor.iter_terms(path, workers=workers))
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>7} {elapsed:>8.2f} {count / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Logging overhead benchmark for the Gov Terms AI backend.
+Replays the log calls one RAG request makes, with realistically sized hits
+and Gemini answer, and reports the time spent on the request's own thread:
+- legacy: the old synchronous INFO f-string dumps of hits, context, answer and sources;
+- structured: backend/structured_logging.py at several payload sample rates.
+Output goes to /dev/null so terminal speed doesn't skew the numbers; the
+total column includes draining the queue on the listener thread.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from structured_logging import configure_logging, log_payload, payload_sampling, stop_logging  # noqa: E402
+
+logger = logging.getLogger("app")
+
+QUERY = "What does NDIS stand for?"
+HITS = [{
+    "score": 0.83 - i * 0.05,
+    "text": f"NDIS: National Disability Insurance Scheme, a scheme that funds supports for people with disability {i} " * 5,
+    "entity": "National Disability Insurance Agency",
+    "body_type": "Corporate Commonwealth entity",
+    "portfolio": "Social Services",
+    "url": "https://www.ndis.gov.au",
+} for i in range(3)]
+AI_RESPONSE = json.dumps({
+    "definition": "The National Disability Insurance Scheme funds reasonable and necessary supports. " * 3,
+    "elaboration": "",
+    "source_index": 1,
+})
+
+
+def legacy_request():
+    logger.info(f"Received query: {QUERY[:50]}...")
+    logger.info(f"✅ Found {len(HITS)} relevant terms")
+    logger.info(f"{HITS}")
+    logger.info("✅ Gemini response generated")
+    logger.info(f"The context was: {HITS}")
+    logger.info(f"Gemini Response is: {AI_RESPONSE}")
+    logger.info(f"Selected source: {HITS[0]}")
+    logger.info(f"The sources are {HITS} type of score is {HITS[0]['score'] if HITS else 'N/A'}")
+
+
+def structured_request():
+    # What PayloadSamplingMiddleware does around each request
+    with payload_sampling():
+        logger.debug("Received query", extra={"query": QUERY})
+        logger.debug("Search results", extra={"hits": len(HITS)})
+        log_payload(logger, "Search results payload", query=QUERY, hits=HITS)
+        log_payload(logger, "Gemini prompt payload", query=QUERY, context=HITS, response_text=AI_RESPONSE)
+        logger.info("Query answered", extra={
+            "query": QUERY, "served_by": "rag", "cache": "miss", "sources": len(HITS),
+            "top_score": HITS[0]["score"], "selected_entity": HITS[0]["entity"],
+        })
+        log_payload(logger, "Query answer payload", query=QUERY, ai_response=AI_RESPONSE,
+                    sources=HITS, selected_source=HITS[0])
+
+
+def measure(request, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        request()
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Compare legacy and structured logging cost per request")
+    parser.add_argument('--requests', type=int, default=20000, help='Simulated requests per mode')
+    parser.add_argument('--sample-rates', default='0,0.01,1', help='Comma-separated LOG_PAYLOAD_SAMPLE_RATE values')
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        print(f"{'mode':<24} {'caller us/req':>13} {'total us/req':>13}")
+        root = logging.getLogger()
+        root.handlers[:] = [logging.StreamHandler(devnull)]
+        root.setLevel(logging.INFO)
+        caller = measure(legacy_request, args.requests)
+        print(f"{'legacy':<24} {caller * 1e6:>13.1f} {caller * 1e6:>13.1f}")
+
+        for rate in (float(r) for r in args.sample_rates.split(",")):
+            configure_logging(payload_sample_rate=rate, stream=devnull)
+            start = time.perf_counter()
+            caller = measure(structured_request, args.requests)
+            stop_logging()
+            total = (time.perf_counter() - start) / args.requests
+            print(f"{f'structured, sample {rate:g}':<24} {caller * 1e6:>13.1f} {total * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Instrumentation overhead benchmark for the Gov Terms AI backend.
+Times the per-request work backend/metrics.py adds to /api/query: the
+context variable, one timed_stage per pipeline stage, labelling, the
+Server-Timing header and the histogram updates, without any real stage work.
+
+Exits non-zero when the fastest round costs more than --budget microseconds
+per request: 2 us per timed stage plus 6 us for the context, the header and
+the histograms, so 20 us for the seven stages of a RAG query, on the 1-vCPU
+build container. That replaces the original "a few microseconds": timing a
+stage in CPython costs a context-manager call, two clock reads and an append,
+about 1.3 us there, before any header or histogram work.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from metrics import Metrics, RequestTimings, _current_timings, label_request, timed_stage  # noqa: E402
+
+# Microseconds: per timed stage, and for the header and histograms of the whole request
+STAGE_BUDGET_US = 2.0
+REQUEST_BUDGET_US = 6.0
+
+STAGES = ("get_user_query", "exact_match", "response_cache", "search_database",
+          "prompt_build", "send_gemini_prompt", "parse")
+
+
+def instrumented_request(metrics):
+    """Everything MetricsMiddleware and the endpoint do for one request."""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    for name in STAGES:
+        with timed_stage(name):
+            pass
+    label_request("rag", "miss")
+    total = timings.elapsed()
+    timings.server_timing(total).encode("latin-1")
+    _current_timings.reset(token)
+    metrics.record("/api/query", "200", timings, total)
+
+
+def best_of(rounds: int, requests: int, func) -> float:
+    """Lowest mean seconds per call of func over `rounds` rounds, so a busy machine doesn't fail the budget."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            func()
+        best = min(best, (time.perf_counter() - start) / requests)
+    return best
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Measure per-request metrics overhead")
+    parser.add_argument('--requests', type=int, default=100000, help='Simulated requests per round')
+    parser.add_argument('--rounds', type=int, default=5, help='Rounds; the fastest one is reported')
+    parser.add_argument('--budget', type=float, default=STAGE_BUDGET_US * len(STAGES) + REQUEST_BUDGET_US,
+                        help='Fail above this many microseconds per request (default: %(default)s)')
+    args = parser.parse_args()
+
+    metrics = Metrics()
+    for _ in range(1000):
+        instrumented_request(metrics)
+    per_request = best_of(args.rounds, args.requests, lambda: instrumented_request(metrics))
+    print(f"{len(STAGES)} stages: {per_request * 1e6:.2f} µs per request (budget {args.budget:.1f} µs)")
+
+    # The parts of that done once per request, on a finished request
+    timings = RequestTimings()
+    timings.stages.extend((name, 1_000_000) for name in STAGES)
+    label_request("rag", "miss")
+    header = best_of(args.rounds, args.requests, lambda: timings.server_timing(10_000_000))
+    record = best_of(args.rounds, args.requests, lambda: metrics.record("/api/query", "200", timings, 10_000_000))
+    print(f"  Server-Timing header: {header * 1e6:.2f} µs, histograms: {record * 1e6:.2f} µs")
+
+    def outside_request():
+        with timed_stage("parse"):
+            pass
+
+    print(f"timed_stage outside a request: {best_of(args.rounds, args.requests, outside_request) * 1e6:.2f} µs")
+
+    if per_request * 1e6 > args.budget:
+        print("❌ Over the instrumentation budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
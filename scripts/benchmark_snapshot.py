@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Glossary cold-start benchmark for Gov Terms AI.
+Starts several worker processes at once, each building the backend's
+exact-match and lexical indexes from either combined_glossary.json or the
+memory-mapped snapshot (opened through load_snapshot, as app.py does), and
+reports startup time, the part of it spent hashing the JSON to check the
+snapshot is current, plus RSS and PSS
+(proportional set size, which splits shared pages between processes) per worker.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+WORKER = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import glossary_snapshot
+from glossary_index import GlossaryIndex, load_glossary
+from lexical_index import LexicalIndex
+from retrievers import glossary_record_fields
+source_digest = glossary_snapshot.source_digest
+digest_seconds = 0.0
+def timed_digest(path):
+    global digest_seconds
+    digest_start = time.perf_counter()
+    try:
+        return source_digest(path)
+    finally:
+        digest_seconds += time.perf_counter() - digest_start
+glossary_snapshot.source_digest = timed_digest
+imported = time.perf_counter()
+if sys.argv[2] == "snapshot":
+    snapshot = glossary_snapshot.load_snapshot(sys.argv[3], sys.argv[4])
+    if snapshot is None:
+        sys.exit("snapshot did not load")
+    glossary_index = GlossaryIndex.from_snapshot(snapshot)
+    lexical_index = LexicalIndex.from_snapshot(snapshot)
+else:
+    records = load_glossary(sys.argv[3])
+    glossary_index = GlossaryIndex(records)
+    lexical_index = LexicalIndex([glossary_record_fields(r) for r in records if r.get("Term")])
+ready = time.perf_counter()
+glossary_index.lookup(sys.argv[5])
+lexical_index.bm25(sys.argv[5], 10)
+first_query = time.perf_counter()
+memory = {}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        name, _, value = line.partition(":")
+        if name in ("Rss", "Pss"):
+            memory[name] = int(value.split()[0])
+print(json.dumps({"load_ms": (ready - imported) * 1000, "digest_ms": digest_seconds * 1000,
+                  "first_query_ms": (first_query - ready) * 1000,
+                  "rss_kb": memory.get("Rss"), "pss_kb": memory.get("Pss")}))
+sys.stdout.flush()
+sys.stdin.read()  # Stay alive until every worker has reported, so shared pages are counted as shared
+"""
+
+
+def synthetic_glossary(path, rows):
+    """Write a glossary of rows synthetic records shaped like combined_glossary.json."""
+    entities = ["Department of Social Services", "National Disability Insurance Agency", "Australian Taxation Office"]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{
+            "Term": f"TERM{i}" if i % 3 else f"Synthetic programme term {i}",
+            "Definition": f"Definition {i} of a government programme administered for eligible people " * (1 + i % 4),
+            "Entity": entities[i % 3],
+            "BodyType": "Non-corporate Commonwealth entity" if i % 2 else "Corporate Commonwealth entity",
+            "Portfolio": "Social Services",
+            "Url": f"https://example.gov.au/{i}",
+        } for i in range(rows)], f)
+
+
+def run_workers(mode, path, source, workers, query):
+    """Start workers concurrently and collect their reports."""
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WORKER, str(BACKEND_DIR), mode, path, source, query],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(workers)
+    ]
+    reports = [json.loads(proc.stdout.readline()) for proc in procs]
+    for proc in procs:
+        proc.communicate("")
+    return reports
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Compare JSON and snapshot glossary cold starts")
+    parser.add_argument('--input', '-i', help='Glossary JSON (default: data/combined_glossary.json or synthetic)')
+    parser.add_argument('--rows', type=int, default=8000, help='Synthetic glossary rows when there is no input')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent worker processes')
+    parser.add_argument('--query', default='NDIS', help='First query to time')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from glossary_snapshot import source_digest, write_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.input or str(DATA_DIR / "combined_glossary.json")
+        if not os.path.exists(source):
+            source = os.path.join(tmp, "glossary.json")
+            synthetic_glossary(source, args.rows)
+        snapshot = os.path.join(tmp, "glossary.snap")
+        with open(source, encoding="utf-8") as f:
+            write_snapshot(snapshot, json.load(f), source_digest(source))
+        print(f"{source}: {os.path.getsize(source) / 1e6:.1f} MB JSON, {os.path.getsize(snapshot) / 1e6:.1f} MB snapshot")
+
+        print(f"{'mode':<9} {'load ms':>8} {'digest ms':>9} {'1st query ms':>12} {'RSS MB':>7} {'PSS MB':>7}  (mean of {args.workers} workers)")
+        for mode, path in (("json", source), ("snapshot", snapshot)):
+            reports = run_workers(mode, path, source, args.workers, args.query)
+            mean = {key: sum(r[key] or 0 for r in reports) / len(reports) for key in reports[0]}
+            print(f"{mode:<9} {mean['load_ms']:>8.1f} {mean['digest_ms']:>9.1f} {mean['first_query_ms']:>12.2f} "
+                  f"{mean['rss_kb'] / 1024:>7.1f} {mean['pss_kb'] / 1024:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the Gov Terms AI backend.
+Reports, as medians over fresh interpreter processes:
+- how long `import app` takes;
+- the latency of the first and second /api/query with the retriever and
+  Gemini providers overridden by the load-test stubs;
+- how long the Pinecone and Gemini SDK imports take, when installed (this
+  cost is now paid lazily or in the background warm-up instead of at import).
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+WORKER = r"""
+import asyncio, json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+import load_test
+start = time.perf_counter()
+backend_app = load_test.load_backend()
+imported = time.perf_counter()
+load_test.install_stub_providers(backend_app, 0.0, 0.0)
+
+async def two_requests():
+    timings = []
+    for _ in range(2):
+        t = time.perf_counter()
+        await backend_app.query_endpoint({"query": load_test.LOAD_TEST_QUERY})
+        timings.append(time.perf_counter() - t)
+    return timings
+
+first, second = asyncio.run(two_requests())
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_request_ms": first * 1000,
+                  "second_request_ms": second * 1000}))
+"""
+
+SDK_IMPORT = r"""
+import importlib, json, sys, time
+start = time.perf_counter()
+try:
+    importlib.import_module(sys.argv[1])
+except ImportError:
+    print(json.dumps(None))
+else:
+    print(json.dumps((time.perf_counter() - start) * 1000))
+"""
+
+
+def run_json(code, *args):
+    output = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Measure backend import and first-request latency")
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per measurement')
+    args = parser.parse_args()
+
+    reports = [run_json(WORKER, str(SCRIPTS_DIR)) for _ in range(args.runs)]
+    print(f"{'measurement':<28} {'median ms':>10}  (over {args.runs} processes)")
+    for key in ("import_ms", "first_request_ms", "second_request_ms"):
+        print(f"{key:<28} {statistics.median(r[key] for r in reports):>10.1f}")
+
+    for module in ("pinecone", "google.generativeai"):
+        timings = [run_json(SDK_IMPORT, module) for _ in range(args.runs)]
+        if timings[0] is None:
+            print(f"{'import ' + module:<28} {'not installed':>10}")
+        else:
+            print(f"{'import ' + module:<28} {statistics.median(timings):>10.1f}  (deferred to first use/warm-up)")
+
+
+if __name__ == "__main__":
+    main()
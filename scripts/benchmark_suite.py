@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite for the Gov Terms AI backend, with no network access.
+
+  micro    Time the CPU-bound pipeline steps: search_database result shaping,
+           prompt building, Gemini response parsing and /api/suggest lookups
+           over a synthetic 20,000-term glossary.
+  load     Drive the backend in-process (or a running server with --url) with
+           open-loop Poisson arrivals against the stub Pinecone and Gemini
+           servers in scripts/stub_upstreams.py, and report throughput,
+           p50/p95/p99 latency and error rates per concurrency level.
+  all      Both of the above (the default).
+  compare  Diff two saved result files and exit non-zero on a regression.
+
+Results are written as JSON (default benchmark-results/<commit>.json) with the
+commit, machine, configuration and seeds, so runs can be compared across commits:
+
+  python scripts/benchmark_suite.py --output before.json
+  python scripts/benchmark_suite.py --output after.json
+  python scripts/benchmark_suite.py compare before.json after.json
+
+Open loop means requests are sent on a fixed random schedule whether or not
+earlier ones have finished, and latency is measured from each request's
+scheduled send time, so a slow server can't hide its queueing delay by
+slowing the load down. A concurrency level C is turned into an arrival rate
+of C divided by the unloaded latency measured first, i.e. the rate that would
+keep C requests in flight if latency didn't grow under load.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPTS_DIR.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import load_test  # noqa: E402
+import stub_upstreams  # noqa: E402
+
+RESULTS_SCHEMA = 1
+
+# Micro-benchmarks and load metrics where higher is worse
+LOWER_IS_BETTER = ("best_us", "p50_ms", "p95_ms", "p99_ms")
+
+
+# ============================================================================
+# Micro-benchmarks
+# ============================================================================
+
+class _CannedIndex:
+    """search_records returning a fixed response, so only the result shaping is timed."""
+
+    def __init__(self, hits: List[Dict[str, Any]]):
+        self._response = {"result": {"hits": hits}}
+
+    def search_records(self, namespace, query):
+        return self._response
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Microseconds per call: the median and best of `repeat` timing runs."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [seconds / number * 1e6 for seconds in timer.repeat(repeat, number)]
+    return {"us_per_op": round(statistics.median(runs), 3), "best_us": round(min(runs), 3), "calls_per_run": number}
+
+
+def synthetic_terms(count: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Reproducible (normalized key, display term) pairs shaped like glossary terms and acronyms."""
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(2000)]
+    terms = {}
+    while len(terms) < count:
+        if rng.random() < 0.3:
+            term = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 6)))
+        else:
+            term = " ".join(rng.choices(words, k=rng.randint(1, 4))).capitalize()
+        terms[term.casefold()] = term
+    return list(terms.items())
+
+
+def run_micro(backend_app, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Time search_database shaping, prompt building, response parsing and suggestions on canned data."""
+    from prompts import PromptTemplate
+    from retrievers import PineconeRetriever
+    from suggest import TermTrie
+
+    raw_hits = [{"_id": f"stub-{i}", "_score": 0.92 - 0.01 * i, "fields": stub_upstreams.STUB_RECORDS[i % 3]}
+                for i in range(10)]
+    retriever_3 = PineconeRetriever(_CannedIndex(raw_hits[:3]), "bench", "bench")
+    retriever_10 = PineconeRetriever(_CannedIndex(raw_hits), "bench", "bench")
+    search_results = retriever_3.search(load_test.LOAD_TEST_QUERY, 3)
+    compact = PromptTemplate("compact")
+    legacy = PromptTemplate("legacy")
+    batch_items = [{"id": i, "query": f"term {i}", "search_results": search_results} for i in range(1, 6)]
+    answer = json.dumps(stub_upstreams.STUB_ANSWER)
+    fenced = f"Here is the answer:\n```json\n{json.dumps(stub_upstreams.STUB_ANSWER, indent=2)}\n```"
+    batch_answer = stub_upstreams.stub_answer_text(compact.build_batch(batch_items))
+    terms = synthetic_terms(20000)
+    trie = TermTrie(terms)
+    long_term = next(key for key, _ in terms if len(key) > 16)
+    # One swapped pair in a short prefix, one substitution in a long one
+    typo_short = long_term[:1] + long_term[2] + long_term[1] + long_term[3:6]
+    typo_long = long_term[:8] + "#" + long_term[9:16]
+
+    cases = {
+        "shape_results.top3": lambda: retriever_3.search(load_test.LOAD_TEST_QUERY, 3),
+        "shape_results.top10": lambda: retriever_10.search(load_test.LOAD_TEST_QUERY, 10),
+        "prompt_build.compact": lambda: compact.build(load_test.LOAD_TEST_QUERY, search_results),
+        "prompt_build.legacy": lambda: legacy.build(load_test.LOAD_TEST_QUERY, search_results),
+        "prompt_build.batch5": lambda: compact.build_batch(batch_items),
+        "parse_response.json": lambda: backend_app.parse_gemini_response(answer, search_results),
+        "parse_response.fenced": lambda: backend_app.parse_gemini_response(fenced, search_results),
+        "parse_response.batch5": lambda: backend_app.parse_gemini_batch_response(batch_answer, batch_items),
+        "suggest.prefix": lambda: trie.search(long_term[:4]),
+        "suggest.typo_short": lambda: trie.search(typo_short),
+        "suggest.typo_long": lambda: trie.search(typo_long),
+    }
+    results = {}
+    for name, func in cases.items():
+        results[name] = time_call(func, repeat)
+        print(f"  {name:<24} {results[name]['us_per_op']:>9.2f} µs/op  (best {results[name]['best_us']:.2f})")
+    return results
+
+
+# ============================================================================
+# Open-loop load generator
+# ============================================================================
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def send_query(client, path: str, query: str) -> bool:
+    """One request; True on a 2xx answer without an SSE error event."""
+    response = await client.post(path, json={"query": query})
+    if response.status_code >= 300:
+        return False
+    return not (path.endswith("/stream") and "event: error" in response.text)
+
+
+async def run_open_loop(client, path: str, rate: float, duration: float, label: str, seed: int,
+                        timeout: float) -> Dict[str, Any]:
+    """Send Poisson arrivals at `rate` per second for `duration` seconds and summarize them."""
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    in_flight = 0
+    peak_in_flight = 0
+    last_done = 0.0
+
+    async def one(scheduled: float, query: str):
+        nonlocal in_flight, peak_in_flight, last_done
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        try:
+            ok = await asyncio.wait_for(send_query(client, path, query), timeout)
+            outcome = "ok" if ok else "error"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+        except Exception as e:
+            outcome = type(e).__name__
+        finally:
+            in_flight -= 1
+        done = loop.time()
+        last_done = max(last_done, done)
+        statuses[outcome] = statuses.get(outcome, 0) + 1
+        if outcome == "ok":
+            # From the scheduled send time, so time spent behind a backed-up client counts too
+            latencies.append(done - scheduled)
+
+    started = loop.time()
+    tasks = []
+    scheduled = started
+    i = 0
+    while True:
+        scheduled += rng.expovariate(rate)
+        if scheduled - started > duration:
+            break
+        await asyncio.sleep(max(scheduled - loop.time(), 0))
+        # Distinct queries, so requests aren't answered from the cache or coalesced
+        tasks.append(asyncio.ensure_future(one(scheduled, f"{load_test.LOAD_TEST_QUERY} {label}-{i}")))
+        i += 1
+    await asyncio.gather(*tasks)
+
+    total = len(tasks)
+    elapsed = max(last_done - started, duration)
+    ok = statuses.get("ok", 0)
+    to_ms = lambda value: round(value * 1000, 1) if value is not None else None  # noqa: E731
+    return {
+        "offered_rps": round(rate, 2),
+        "requests": total,
+        "throughput_rps": round(ok / elapsed, 2),
+        "error_rate": round((total - ok) / total, 4) if total else 0.0,
+        "outcomes": statuses,
+        "p50_ms": to_ms(percentile(latencies, 0.50)),
+        "p95_ms": to_ms(percentile(latencies, 0.95)),
+        "p99_ms": to_ms(percentile(latencies, 0.99)),
+        "max_ms": to_ms(max(latencies) if latencies else None),
+        "peak_in_flight": peak_in_flight,
+    }
+
+
+async def measure_baseline(client, path: str, samples: int, timeout: float) -> float:
+    """Median latency of sequential requests on an idle backend."""
+    latencies = []
+    for i in range(samples):
+        start = time.perf_counter()
+        await asyncio.wait_for(send_query(client, path, f"{load_test.LOAD_TEST_QUERY} baseline-{i}"), timeout)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+async def run_load(args, backend_app) -> Dict[str, Any]:
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout,
+                                   limits=httpx.Limits(max_connections=None, max_keepalive_connections=None))
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=backend_app.app), base_url="http://bench",
+                                   timeout=args.timeout)
+    async with client:
+        baseline = await measure_baseline(client, args.path, args.baseline_samples, args.timeout)
+        print(f"  unloaded latency {baseline * 1000:.1f} ms")
+        if args.rates:
+            levels = [(None, float(rate)) for rate in args.rates.split(",")]
+        else:
+            levels = [(int(c), int(c) / baseline) for c in args.concurrency.split(",")]
+        results = []
+        for index, (concurrency, rate) in enumerate(levels):
+            result = await run_open_loop(client, args.path, rate, args.duration, f"level{index}",
+                                         args.seed + index, args.timeout)
+            result = {"concurrency": concurrency, **result}
+            results.append(result)
+            print(f"  c={str(concurrency or '-'):>3} offered={result['offered_rps']:>7.1f}/s "
+                  f"throughput={result['throughput_rps']:>7.1f}/s p50={result['p50_ms']}ms "
+                  f"p95={result['p95_ms']}ms p99={result['p99_ms']}ms errors={result['error_rate']:.1%} "
+                  f"peak in flight={result['peak_in_flight']}")
+    return {"baseline_ms": round(baseline * 1000, 1), "levels": results}
+
+
+# ============================================================================
+# Results
+# ============================================================================
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "--short", "HEAD") or "unknown",
+                "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except OSError:
+        return {"commit": "unknown", "dirty": False}
+
+
+def machine() -> Dict[str, Any]:
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.machine(), "cpu_count": os.cpu_count()}
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> int:
+    """Print per-metric changes; return how many got worse by more than threshold percent."""
+    regressions = 0
+
+    def row(name: str, metric: str, old: Optional[float], value: Optional[float]):
+        nonlocal regressions
+        if old is None or value is None:
+            return
+        change = (value - old) / old * 100 if old else 0.0
+        worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+        if metric == "error_rate":
+            # Percentage points, since the base is often zero
+            change = (value - old) * 100
+            worse = change > threshold / 10
+        regressions += worse
+        print(f"  {name:<28} {metric:<15} {old:>10} -> {value:<10} {change:>+7.1f}{'pp' if metric == 'error_rate' else '%'}"
+              f"{'  REGRESSION' if worse else ''}")
+
+    print(f"{base['revision']['commit']} -> {new['revision']['commit']} (threshold {threshold:g}%)")
+    for name, old in base.get("micro", {}).items():
+        if name in new.get("micro", {}):
+            # The best run is far less sensitive to noisy neighbours than the median
+            row(name, "best_us", old["best_us"], new["micro"][name]["best_us"])
+    new_levels = {(level["concurrency"], level["offered_rps"] if level["concurrency"] is None else None): level
+                  for level in new.get("load", {}).get("levels", [])}
+    for old in base.get("load", {}).get("levels", []):
+        key = (old["concurrency"], old["offered_rps"] if old["concurrency"] is None else None)
+        if key not in new_levels:
+            continue
+        name = f"load c={old['concurrency']}" if old["concurrency"] else f"load {old['offered_rps']}/s"
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"):
+            row(name, metric, old[metric], new_levels[key][metric])
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Benchmark the backend against local stub upstreams")
+    parser.add_argument('command', nargs='?', default='all', choices=['all', 'micro', 'load', 'compare'])
+    parser.add_argument('files', nargs='*', help='compare: base and new result files')
+    parser.add_argument('--output', help='Result file (default: benchmark-results/<commit>.json)')
+    parser.add_argument('--repeat', type=int, default=5, help='micro: timing runs per case')
+    parser.add_argument('--concurrency', default='1,4,16', help='load: comma-separated concurrency levels')
+    parser.add_argument('--rates', help='load: comma-separated arrival rates (req/s) instead of --concurrency')
+    parser.add_argument('--duration', type=float, default=10.0, help='load: seconds of arrivals per level')
+    parser.add_argument('--path', default='/api/query', help='load: /api/query or /api/query/stream')
+    parser.add_argument('--url', help='load: a running backend (already pointed at the stubs) instead of in-process')
+    parser.add_argument('--pinecone-latency', default='lognormal:0.05,0.3', help='Stub Pinecone latency spec (s)')
+    parser.add_argument('--gemini-latency', default='lognormal:0.4,0.3', help='Stub Gemini latency spec (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of stub calls answered with a 503')
+    parser.add_argument('--baseline-samples', type=int, default=5, help='load: sequential requests to calibrate')
+    parser.add_argument('--timeout', type=float, default=60.0, help='load: client timeout per request (s)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for arrivals and stub latencies')
+    parser.add_argument('--threshold', type=float, default=10.0, help='compare: allowed change in percent')
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        if len(args.files) != 2:
+            parser.error("compare takes a base and a new result file")
+        base, new = (json.loads(Path(path).read_text()) for path in args.files)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+    revision = git_revision()
+    report: Dict[str, Any] = {
+        "schema": RESULTS_SCHEMA,
+        "revision": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("command", "files", "output")},
+    }
+    backend_app = load_test.load_backend()
+
+    if args.command in ("all", "micro"):
+        print("Micro-benchmarks")
+        report["micro"] = run_micro(backend_app, args.repeat)
+
+    if args.command in ("all", "load"):
+        servers = stub_upstreams.start_stub_servers(args.pinecone_latency, args.gemini_latency,
+                                                    args.error_rate, args.seed)
+        if args.url:
+            print("Start the backend against the stubs with: " +
+                  " ".join(f"{key}={value}" for key, value in stub_upstreams.sdk_environment(servers).items()))
+        stub_upstreams.install_http_stubs(backend_app, servers)
+        report["config"]["backend"] = {
+            "retrieval_concurrency": backend_app.RETRIEVAL_CONCURRENCY,
+            "generation_concurrency": backend_app.GENERATION_CONCURRENCY,
+            "request_budget": backend_app.REQUEST_BUDGET,
+            "admission": backend_app.admission.stats(),
+        }
+        print(f"Open-loop load on {args.path} (Pinecone {args.pinecone_latency}, Gemini {args.gemini_latency})")
+        try:
+            report["load"] = asyncio.run(run_load(args, backend_app))
+        finally:
+            report["stubs"] = {name: server.service.stats() for name, server in servers.items()}
+            for server in servers.values():
+                server.stop()
+
+    output = Path(args.output) if args.output else (
+        REPO_DIR / "benchmark-results" / f"{revision['commit']}{'-dirty' if revision['dirty'] else ''}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tail-latency benchmark for the Gov Terms AI upstream call policy.
+Runs /api/query against the load-test stubs with injected faults (a share of
+slow and failing Pinecone and Gemini calls) under three configurations, each
+in a fresh process because the policy is read from the environment at import:
+- no deadlines or retries (the previous behaviour);
+- per-stage deadlines within the request budget, plus retries with jitter;
+- the same with hedged retrieval.
+Reports p50/p95/p99/max latency and the error rate.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+WORKER = r"""
+import asyncio, json, sys, time
+sys.path.insert(0, sys.argv[1])
+import load_test
+from fastapi import HTTPException
+config = json.loads(sys.argv[2])
+backend_app = load_test.load_backend()
+load_test.install_stub_providers(
+    backend_app, config["retrieval_latency"], config["generation_latency"],
+    load_test.Faults(**config["retrieval_faults"], seed=1), load_test.Faults(**config["generation_faults"], seed=2),
+)
+
+async def run():
+    latencies, errors = [], 0
+
+    async def client(client_id):
+        nonlocal errors
+        for i in range(config["requests"]):
+            start = time.perf_counter()
+            try:
+                await backend_app.query_endpoint({"query": f"{load_test.LOAD_TEST_QUERY} {client_id}-{i}"})
+            except HTTPException:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client(c) for c in range(config["clients"])))
+    return latencies, errors
+
+latencies, errors = asyncio.run(run())
+print(json.dumps({"latencies": latencies, "errors": errors, "health": {
+    "retrieval_retries": backend_app.retrieval_retries.stats(),
+    "generation_retries": backend_app.generation_retries.stats(),
+    "hedging": backend_app.retrieval_hedger.stats(),
+}}))
+"""
+
+POLICIES = {
+    "no deadlines/retries": {
+        "UPSTREAM_ATTEMPTS": "1", "REQUEST_BUDGET": "600", "RETRIEVAL_TIMEOUT": "600", "GENERATION_TIMEOUT": "600",
+    },
+    "deadlines + retries": {
+        "UPSTREAM_ATTEMPTS": "3", "REQUEST_BUDGET": "3", "RETRIEVAL_TIMEOUT": "1", "GENERATION_TIMEOUT": "2",
+        "RETRIEVAL_ATTEMPT_TIMEOUT": "0.3", "GENERATION_ATTEMPT_TIMEOUT": "0.6", "RETRY_BUDGET_RATIO": "0.2",
+    },
+    "+ hedged retrieval": {
+        "UPSTREAM_ATTEMPTS": "3", "REQUEST_BUDGET": "3", "RETRIEVAL_TIMEOUT": "1", "GENERATION_TIMEOUT": "2",
+        "RETRIEVAL_ATTEMPT_TIMEOUT": "0.3", "GENERATION_ATTEMPT_TIMEOUT": "0.6", "RETRY_BUDGET_RATIO": "0.2", "HEDGE_RETRIEVAL_AFTER": "0.15",
+    },
+}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Compare tail latency with and without the upstream call policy")
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, default=25, help='Requests per client')
+    parser.add_argument('--retrieval-latency', type=float, default=0.05, help='Normal stub Pinecone latency (s)')
+    parser.add_argument('--generation-latency', type=float, default=0.2, help='Normal stub Gemini latency (s)')
+    parser.add_argument('--slow-rate', type=float, default=0.05, help='Share of calls that are slow')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='Share of calls that fail with a 503')
+    args = parser.parse_args()
+
+    config = {
+        "clients": args.clients,
+        "requests": args.requests,
+        "retrieval_latency": args.retrieval_latency,
+        "generation_latency": args.generation_latency,
+        "retrieval_faults": {"slow_rate": args.slow_rate, "slow_latency": 2.0, "error_rate": args.error_rate},
+        "generation_faults": {"slow_rate": args.slow_rate, "slow_latency": 3.0, "error_rate": args.error_rate},
+    }
+    print(f"{args.clients} clients x {args.requests} requests, {args.slow_rate:.0%} slow and "
+          f"{args.error_rate:.0%} failing calls per upstream")
+    print(f"{'policy':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}  retries/hedges")
+    for name, env in POLICIES.items():
+        output = subprocess.run(
+            [sys.executable, "-c", WORKER, str(SCRIPTS_DIR), json.dumps(config)],
+            env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        latencies = [latency * 1000 for latency in report["latencies"]]
+        health = report["health"]
+        print(f"{name:<22} {percentile(latencies, 0.5):>8.0f} {percentile(latencies, 0.95):>8.0f} "
+              f"{percentile(latencies, 0.99):>8.0f} {max(latencies):>8.0f} "
+              f"{report['errors'] / len(latencies):>7.1%}  "
+              f"{health['retrieval_retries']['retries']}+{health['generation_retries']['retries']}"
+              f"/{health['hedging']['hedged']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Build the local vector store used when the backend runs with RETRIEVER=local.
+Embeds every glossary row from combined_glossary.json as an E5 passage and
+writes the embedding matrix and hit fields under data/vector_store.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from retrievers import (  # noqa: E402
+    glossary_record_fields, pinecone_inference_embedder, sentence_transformer_embedder, write_vector_store
+)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("build_vector_store")
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Build the local vector store from the glossary")
+    parser.add_argument('--input', '-i', default=str(DATA_DIR / "combined_glossary.json"), help='Glossary JSON')
+    parser.add_argument('--output', '-o', default=str(DATA_DIR / "vector_store"), help='Store directory')
+    parser.add_argument('--embedder', choices=['sentence-transformers', 'pinecone'], default='sentence-transformers',
+                        help='Passage embedder (pinecone uses the hosted inference API and PINECONE_API_KEY)')
+    parser.add_argument('--batch-size', type=int, default=64, help='Texts per embedding call')
+    parser.add_argument('--hnsw', action='store_true', help='Also build an HNSW graph (requires hnswlib)')
+    args = parser.parse_args()
+
+    with open(args.input, encoding="utf-8") as f:
+        records = [glossary_record_fields(rec) for rec in json.load(f) if rec.get("Term")]
+    logger.info(f"Loaded {len(records)} records from {args.input}")
+
+    if args.embedder == 'pinecone':
+        from pinecone import Pinecone
+        embed = pinecone_inference_embedder(Pinecone(api_key=os.environ["PINECONE_API_KEY"]))
+    else:
+        embed = sentence_transformer_embedder(os.getenv("LOCAL_EMBEDDING_MODEL", "intfloat/multilingual-e5-large"))
+
+    import numpy as np
+
+    embeddings = []
+    for i in range(0, len(records), args.batch_size):
+        batch = [rec["text"] for rec in records[i:i + args.batch_size]]
+        embeddings.append(np.asarray(embed(batch, "passage"), dtype=np.float32))
+        logger.info(f"Embedded records {i + 1}-{i + len(batch)}")
+
+    write_vector_store(args.output, records, np.concatenate(embeddings), hnsw=args.hnsw)
+
+
+if __name__ == "__main__":
+    main()
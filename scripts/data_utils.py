@@ -6,11 +6,17 @@ This script provides utilities for data validation, cleaning, and processing.
 
 import json
 import csv
+import itertools
 import os
 import re
+import sys
+import tempfile
+from array import array
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,161 +31,181 @@ class DataProcessor:
     
     def validate_term_data(self, term_data: Dict[str, Any]) -> bool:
         """Validate that term data has required fields."""
-        required_fields = ['term', 'definition', 'source']
-        optional_fields = ['category', 'tags', 'url', 'last_updated']
-        
-        # Check required fields
-        for field in required_fields:
-            if field not in term_data or not term_data[field]:
-                logger.warning(f"Missing required field: {field}")
-                return False
-        
-        # Validate data types
-        if not isinstance(term_data['term'], str):
-            logger.warning("Term must be a string")
-            return False
-        
-        if not isinstance(term_data['definition'], str):
-            logger.warning("Definition must be a string")
-            return False
-        
-        if len(term_data['definition']) < 10:
-            logger.warning("Definition too short")
-            return False
-        
-        return True
+        return validate_term(term_data)
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text data."""
-        if not text:
-            return ""
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Remove non-printable characters
-        text = ''.join(char for char in text if char.isprintable() or char.isspace())
-        
-        # Fix common encoding issues
-        replacements = {
-            '"': '"',
-            '"': '"',
-            ''': "'",
-            ''': "'",
-            '–': '-',
-            '—': '-',
-            '…': '...'
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-        
-        return text
+        return clean_text(text)
     
-    def load_json_data(self, filepath: str) -> List[Dict[str, Any]]:
+    def iter_raw_records(self, filepath: str, input_format: str = None) -> Iterator[Dict[str, Any]]:
+        """Stream raw records from a JSON array, JSONL or CSV file."""
+        input_format = input_format or detect_format(filepath)
+        if input_format == 'csv':
+            return iter_csv_records(filepath)
+        if input_format == 'jsonl':
+            return iter_jsonl(filepath)
+        return iter_json_array(filepath)
+
+    def validate_records(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the records that pass validate_term_data."""
+        for i, item in enumerate(records):
+            if isinstance(item, dict) and self.validate_term_data(item):
+                yield item
+            else:
+                logger.warning(f"Invalid data at index {i}")
+
+    def clean_records(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield records with their text fields cleaned."""
+        for item in records:
+            yield clean_record(item)
+
+    def process_records_parallel(self, records: Iterable[Dict[str, Any]], workers: int,
+                                 chunk_size: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Validate and clean records on a process pool, in input order.
+        Records are sent to workers in chunks, and at most two chunks per worker
+        are in flight, so memory stays bounded on large inputs.
+        """
+        records = iter(records)
+        in_flight: deque = deque()
+        offset = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+            for chunk in itertools.chain(chunks, [None]):
+                if chunk is not None:
+                    in_flight.append((offset, executor.submit(_process_chunk, chunk)))
+                    offset += len(chunk)
+                while in_flight and (chunk is None or len(in_flight) >= workers * 2):
+                    start, future = in_flight.popleft()
+                    valid, invalid = future.result()
+                    for i in invalid:
+                        logger.warning(f"Invalid data at index {start + i}")
+                    yield from valid
+
+    def iter_terms(self, filepath: str, input_format: str = None, workers: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        Stream validated, cleaned terms from a file in constant memory.
+        A missing file or malformed input raises (FileNotFoundError, ValueError
+        or json.JSONDecodeError) part-way through, so a caller writing the
+        stream out never mistakes a truncated read for the whole file.
+        """
+        count = 0
+        records = self.iter_raw_records(filepath, input_format)
+        if workers > 1:
+            terms = self.process_records_parallel(records, workers)
+        else:
+            terms = self.clean_records(self.validate_records(records))
+        for item in terms:
+            count += 1
+            yield item
+        logger.info(f"Loaded {count} valid terms from {filepath}")
+
+    def load_json_data(self, filepath: str, workers: int = 1) -> List[Dict[str, Any]]:
         """Load and validate JSON data."""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list):
-                logger.error("JSON data must be a list of objects")
-                return []
-            
-            valid_data = []
-            for i, item in enumerate(data):
-                if self.validate_term_data(item):
-                    # Clean text fields
-                    item['term'] = self.clean_text(item['term'])
-                    item['definition'] = self.clean_text(item['definition'])
-                    valid_data.append(item)
-                else:
-                    logger.warning(f"Invalid data at index {i}")
-            
-            logger.info(f"Loaded {len(valid_data)} valid terms from {filepath}")
-            return valid_data
-        
-        except FileNotFoundError:
-            logger.error(f"File not found: {filepath}")
-            return []
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            return []
-    
-    def save_json_data(self, data: List[Dict[str, Any]], filepath: str):
-        """Save data to JSON file."""
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved {len(data)} terms to {filepath}")
-        except Exception as e:
-            logger.error(f"Error saving to {filepath}: {e}")
-    
+        return list(self.iter_terms(filepath, workers=workers))
+
+    def save_json_data(self, data: Iterable[Dict[str, Any]], filepath: str) -> int:
+        """
+        Save data to a JSON (or .jsonl) file, writing records as they arrive.
+        If reading the data fails part-way, filepath is left untouched and the error is raised.
+        """
+        count = write_records(data, filepath)
+        logger.info(f"Saved {count} terms to {filepath}")
+        return count
+
     def convert_csv_to_json(self, csv_filepath: str, json_filepath: str):
         """Convert CSV data to JSON format."""
-        try:
-            data = []
-            with open(csv_filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Map CSV columns to our schema
-                    term_data = {
-                        'term': row.get('term', ''),
-                        'definition': row.get('definition', ''),
-                        'source': row.get('source', 'Unknown'),
-                        'category': row.get('category', ''),
-                        'tags': row.get('tags', '').split(',') if row.get('tags') else [],
-                        'url': row.get('url', ''),
-                        'last_updated': row.get('last_updated', '')
-                    }
-                    
-                    if self.validate_term_data(term_data):
-                        # Clean text fields
-                        term_data['term'] = self.clean_text(term_data['term'])
-                        term_data['definition'] = self.clean_text(term_data['definition'])
-                        data.append(term_data)
-            
-            self.save_json_data(data, json_filepath)
-            logger.info(f"Converted {csv_filepath} to {json_filepath}")
-        
-        except FileNotFoundError:
-            logger.error(f"CSV file not found: {csv_filepath}")
-        except Exception as e:
-            logger.error(f"Error converting CSV to JSON: {e}")
-    
-    def merge_datasets(self, input_files: List[str], output_file: str):
-        """Merge multiple JSON datasets into one."""
-        all_data = []
+        self.save_json_data(self.iter_terms(csv_filepath, 'csv'), json_filepath)
+        logger.info(f"Converted {csv_filepath} to {json_filepath}")
+
+    def dedupe_terms(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the first record for each case-insensitive term."""
         seen_terms = set()
-        
-        for filepath in input_files:
-            data = self.load_json_data(filepath)
-            for item in data:
-                term_lower = item['term'].lower()
-                if term_lower not in seen_terms:
-                    all_data.append(item)
-                    seen_terms.add(term_lower)
-                else:
-                    logger.warning(f"Duplicate term found: {item['term']}")
-        
-        self.save_json_data(all_data, output_file)
-        logger.info(f"Merged {len(input_files)} files into {output_file} with {len(all_data)} unique terms")
-    
+        for item in records:
+            term_lower = item['term'].lower()
+            if term_lower not in seen_terms:
+                seen_terms.add(term_lower)
+                yield item
+            else:
+                logger.warning(f"Duplicate term found: {item['term']}")
+
+    def dedupe_near_duplicates(self, records: Iterable[Dict[str, Any]], threshold: float = 0.8,
+                               prefer_body_types: List[str] = (), prefer_entities: List[str] = (),
+                               report_file: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Drop records whose term + definition is a near-duplicate of another's
+        (MinHash estimated Jaccard similarity >= threshold), keeping one
+        canonical record per cluster. The canonical record has the most
+        preferred BodyType, then the most preferred Entity, then comes first.
+        Records are spooled to a temporary JSONL file between the two passes.
+        """
+        from near_duplicates import MinHashDeduper  # Needs numpy
+
+        deduper = MinHashDeduper(threshold=threshold)
+        body_ranks, entity_ranks, labels = array('i'), array('i'), []
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+            for item in records:
+                deduper.add(f"{item['term']} {item['definition']}")
+                body_ranks.append(_preference_rank(record_body_type(item), prefer_body_types))
+                entity_ranks.append(_preference_rank(record_entity(item), prefer_entities))
+                if report_file:
+                    labels.append((item['term'], record_entity(item), record_body_type(item)))
+                spool.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+            clusters = deduper.clusters()
+            keep = bytearray(b'\x01') * len(deduper)
+            report = []
+            for members in clusters:
+                canonical = min(members, key=lambda i: (body_ranks[i], entity_ranks[i], i))
+                for i in members:
+                    if i != canonical:
+                        keep[i] = 0
+                if report_file:
+                    report.append({
+                        'canonical': _cluster_label(labels[canonical]),
+                        'merged': [{**_cluster_label(labels[i]), 'similarity': round(deduper.similarity(canonical, i), 3)}
+                                   for i in members if i != canonical],
+                    })
+            merged = len(keep) - sum(keep)
+            logger.info(f"Found {len(clusters)} near-duplicate clusters; dropping {merged} records")
+            if report_file:
+                write_records(report, report_file)
+                logger.info(f"Wrote near-duplicate report to {report_file}")
+
+            spool.seek(0)
+            for i, line in enumerate(spool):
+                if keep[i]:
+                    yield json.loads(line)
+
+    def merge_datasets(self, input_files: List[str], output_file: str, workers: int = 1,
+                       dedupe: str = 'exact', **near_options):
+        """
+        Merge multiple datasets into one, dropping duplicate terms ('exact') or
+        near-duplicate term + definition pairs ('near'; options are passed to
+        dedupe_near_duplicates).
+        """
+        records = itertools.chain.from_iterable(
+            self.iter_terms(filepath, workers=workers) for filepath in input_files)
+        if dedupe == 'near':
+            unique = self.dedupe_near_duplicates(records, **near_options)
+        else:
+            unique = self.dedupe_terms(records)
+        count = self.save_json_data(unique, output_file)
+        logger.info(f"Merged {len(input_files)} files into {output_file} with {count} unique terms")
+
     def get_dataset_stats(self, filepath: str):
         """Get statistics about a dataset."""
-        data = self.load_json_data(filepath)
-        if not data:
-            return
-        
         stats = {
-            'total_terms': len(data),
+            'total_terms': 0,
             'sources': {},
             'categories': {},
             'avg_definition_length': 0
         }
-        
+
         total_length = 0
-        for item in data:
+        for item in self.iter_terms(filepath):
+            stats['total_terms'] += 1
+
             # Count sources
             source = item.get('source', 'Unknown')
             stats['sources'][source] = stats['sources'].get(source, 0) + 1
@@ -191,7 +217,9 @@ class DataProcessor:
             # Calculate definition length
             total_length += len(item['definition'])
         
-        stats['avg_definition_length'] = total_length / len(data)
+        if not stats['total_terms']:
+            return
+        stats['avg_definition_length'] = total_length / stats['total_terms']
         
         print(f"\n📊 Dataset Statistics for {filepath}")
         print(f"Total Terms: {stats['total_terms']}")
@@ -203,45 +231,315 @@ class DataProcessor:
         for category, count in sorted(stats['categories'].items(), key=lambda x: x[1], reverse=True):
             print(f"  {category}: {count}")
 
+
+# ============================================================================
+# Validation and cleaning
+# ============================================================================
+
+_CLEAN_MAP = {
+    # Fix common encoding issues
+    '\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'",
+    '\u2013': '-', '\u2014': '-', '\u2026': '...',
+    # Drop control and zero-width characters
+    **{chr(c): '' for c in [*range(0x20), *range(0x7F, 0xA0)] if not chr(c).isspace()},
+    '\u00ad': '', '\u200b': '', '\u200c': '', '\u200d': '', '\u2060': '', '\ufeff': '',
+}
+_CLEAN_CHARS = re.compile('[%s]' % ''.join(map(re.escape, _CLEAN_MAP)))
+
+
+def validate_term(term_data: Dict[str, Any]) -> bool:
+    """Validate that term data has required fields."""
+    required_fields = ['term', 'definition', 'source']
+    
+    # Check required fields
+    for field in required_fields:
+        if field not in term_data or not term_data[field]:
+            logger.warning(f"Missing required field: {field}")
+            return False
+    
+    # Validate data types
+    if not isinstance(term_data['term'], str):
+        logger.warning("Term must be a string")
+        return False
+    
+    if not isinstance(term_data['definition'], str):
+        logger.warning("Definition must be a string")
+        return False
+    
+    if len(term_data['definition']) < 10:
+        logger.warning("Definition too short")
+        return False
+    
+    return True
+
+
+def clean_text(text: str) -> str:
+    """
+    Normalize punctuation, drop control characters and collapse whitespace.
+    One precompiled regex pass replaces every special character, and split/join
+    collapses whitespace; both run in C, unlike a per-character Python loop.
+    """
+    if not text:
+        return ""
+    text = ' '.join(_CLEAN_CHARS.sub(_replace_clean_char, text).split())
+    if not text.isprintable():
+        # Rare non-printable characters outside the map
+        text = ' '.join(''.join(char for char in text if char.isprintable()).split())
+    return text
+
+
+def _replace_clean_char(match) -> str:
+    return _CLEAN_MAP[match.group()]
+
+
+def clean_record(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Clean the text fields of a validated record in place."""
+    item['term'] = clean_text(item['term'])
+    item['definition'] = clean_text(item['definition'])
+    return item
+
+
+def record_body_type(item: Dict[str, Any]) -> str:
+    """BodyType of a record in either the glossary or the term schema."""
+    return item.get('BodyType') or item.get('body_type') or ''
+
+
+def record_entity(item: Dict[str, Any]) -> str:
+    """Owning entity of a record; the term schema's source stands in for Entity."""
+    return item.get('Entity') or item.get('entity') or item.get('source') or ''
+
+
+def _preference_rank(value: str, preferences: List[str]) -> int:
+    try:
+        return preferences.index(value)
+    except ValueError:
+        return len(preferences)
+
+
+def _cluster_label(label: Tuple[str, str, str]) -> Dict[str, str]:
+    term, entity, body_type = label
+    return {'term': term, 'entity': entity, 'body_type': body_type}
+
+
+def _process_chunk(chunk: List[Any]) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """Process-pool task: (cleaned valid records, offsets of invalid ones)."""
+    valid, invalid = [], []
+    for i, item in enumerate(chunk):
+        if isinstance(item, dict) and validate_term(item):
+            valid.append(clean_record(item))
+        else:
+            invalid.append(i)
+    return valid, invalid
+
+
+# ============================================================================
+# Streaming readers and writers
+# ============================================================================
+
+def detect_format(filepath: str) -> str:
+    """Guess json, jsonl or csv from the file extension."""
+    suffix = Path(filepath).suffix.lower()
+    if suffix == '.csv':
+        return 'csv'
+    if suffix in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'json'
+
+
+def iter_json_array(filepath: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array one at a time.
+    Reads the file in chunks and decodes each item with raw_decode, so memory
+    use is bounded by the largest single item rather than the file size.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        eof = not buffer
+        pos = _skip_whitespace(buffer, 0)
+        while pos >= len(buffer) and not eof:
+            more = f.read(chunk_size)
+            eof = not more
+            buffer += more
+            pos = _skip_whitespace(buffer, pos)
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise ValueError("JSON data must be a list of objects")
+        pos += 1
+        expect_item = True
+        while True:
+            pos = _skip_whitespace(buffer, pos)
+            if pos < len(buffer):
+                char = buffer[pos]
+                if char == ']':
+                    return
+                if char == ',' and not expect_item:
+                    pos += 1
+                    expect_item = True
+                    continue
+                if expect_item:
+                    try:
+                        item, end = decoder.raw_decode(buffer, pos)
+                        after = _skip_whitespace(buffer, end)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        end = None
+                    # Without a following delimiter the value may be cut short (e.g. a number)
+                    if end is not None and (eof or (after < len(buffer) and buffer[after] in ',]')):
+                        yield item
+                        expect_item = False
+                        # Drop consumed text so the buffer holds at most one item plus a chunk
+                        buffer, pos = buffer[end:], 0
+                        continue
+                else:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            more = f.read(chunk_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+
+
+def _skip_whitespace(buffer: str, pos: int) -> int:
+    while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+        pos += 1
+    return pos
+
+
+def iter_jsonl(filepath: str) -> Iterator[Any]:
+    """Yield one decoded value per non-blank line."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv_records(filepath: str) -> Iterator[Dict[str, Any]]:
+    """Yield CSV rows mapped to the term schema."""
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            # Map CSV columns to our schema
+            yield {
+                'term': row.get('term', ''),
+                'definition': row.get('definition', ''),
+                'source': row.get('source', 'Unknown'),
+                'category': row.get('category', ''),
+                'tags': row.get('tags', '').split(',') if row.get('tags') else [],
+                'url': row.get('url', ''),
+                'last_updated': row.get('last_updated', '')
+            }
+
+
+def write_records(records: Iterable[Dict[str, Any]], filepath: str) -> int:
+    """
+    Write records to a JSONL file or a pretty-printed JSON array, one record
+    at a time, and return how many were written. Output goes to a temporary
+    file that replaces filepath when complete, so the input can be rewritten in
+    place; if records raises, the temporary file is removed and filepath is kept.
+    """
+    jsonl = detect_format(filepath) == 'jsonl'
+    tmp_path = f"{filepath}.tmp"
+    count = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for item in records:
+                if jsonl:
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+                else:
+                    # Same layout as json.dump(records, f, indent=2)
+                    f.write('[\n  ' if count == 0 else ',\n  ')
+                    f.write(json.dumps(item, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+                count += 1
+            if not jsonl:
+                f.write('\n]' if count else '[]')
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, filepath)
+    return count
+
+
 def main():
     """Main function for command-line usage."""
     import argparse
     
     parser = argparse.ArgumentParser(description="Data processing utilities for Gov Terms AI")
-    parser.add_argument('command', choices=['validate', 'convert', 'merge', 'stats', 'clean'],
+    parser.add_argument('command', choices=['validate', 'convert', 'merge', 'stats', 'clean', 'export-snapshot'],
                        help='Command to execute')
     parser.add_argument('--input', '-i', required=True, help='Input file(s)')
     parser.add_argument('--output', '-o', help='Output file')
-    parser.add_argument('--format', choices=['json', 'csv'], default='json', help='Input format')
+    parser.add_argument('--format', choices=['json', 'jsonl', 'csv'],
+                        help='Input format (default: from the file extension)')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Processes for validation and cleaning (0 = one per CPU core)')
+    parser.add_argument('--dedupe', choices=['exact', 'near'], default='exact',
+                        help='Merge: drop repeated terms, or near-duplicate term + definition pairs')
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help='Near-duplicate Jaccard similarity threshold (default: 0.8)')
+    parser.add_argument('--prefer-body-type', default='',
+                        help='Comma-separated BodyTypes, most preferred first, for the record kept per cluster')
+    parser.add_argument('--prefer-entity', default='',
+                        help='Comma-separated entities, most preferred first, for the record kept per cluster')
+    parser.add_argument('--report', help='Write merged near-duplicate clusters to this JSON/JSONL file')
     
     args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
     
     processor = DataProcessor()
     
-    if args.command == 'validate':
-        data = processor.load_json_data(args.input)
-        print(f"✅ Validation complete. {len(data)} valid terms found.")
+    # A failed read leaves any output untouched; exit non-zero so callers notice
+    try:
+        if args.command == 'validate':
+            count = sum(1 for _ in processor.iter_terms(args.input, args.format, workers))
+            print(f"✅ Validation complete. {count} valid terms found.")
     
-    elif args.command == 'convert':
-        if args.format == 'csv' and args.output:
-            processor.convert_csv_to_json(args.input, args.output)
-        else:
-            print("❌ Convert requires CSV input and JSON output file")
+        elif args.command == 'convert':
+            if args.output:
+                processor.save_json_data(processor.iter_terms(args.input, args.format, workers), args.output)
+            else:
+                print("❌ Convert requires an output file (.json or .jsonl)")
     
-    elif args.command == 'merge':
-        input_files = args.input.split(',')
-        if args.output:
-            processor.merge_datasets(input_files, args.output)
-        else:
-            print("❌ Merge requires output file")
+        elif args.command == 'merge':
+            input_files = args.input.split(',')
+            if args.output:
+                near_options = {}
+                if args.dedupe == 'near':
+                    near_options = {
+                        'threshold': args.threshold,
+                        'prefer_body_types': [v.strip() for v in args.prefer_body_type.split(',') if v.strip()],
+                        'prefer_entities': [v.strip() for v in args.prefer_entity.split(',') if v.strip()],
+                        'report_file': args.report,
+                    }
+                processor.merge_datasets(input_files, args.output, workers, args.dedupe, **near_options)
+            else:
+                print("❌ Merge requires output file")
+    
+        elif args.command == 'stats':
+            processor.get_dataset_stats(args.input)
     
-    elif args.command == 'stats':
-        processor.get_dataset_stats(args.input)
+        elif args.command == 'export-snapshot':
+            # Glossary rows (Term/Definition/Entity...) as served by the backend
+            sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+            from glossary_snapshot import source_digest, write_snapshot
+
+            output_file = args.output or f"{os.path.splitext(args.input)[0]}.snap"
+            count = write_snapshot(output_file, processor.iter_raw_records(args.input, args.format),
+                                   source_digest(args.input))
+            print(f"✅ Wrote {count} glossary rows to {output_file}")
     
-    elif args.command == 'clean':
-        data = processor.load_json_data(args.input)
-        output_file = args.output or args.input.replace('.json', '_cleaned.json')
-        processor.save_json_data(data, output_file)
+        elif args.command == 'clean':
+            stem, suffix = os.path.splitext(args.input)
+            output_file = args.output or f"{stem}_cleaned{suffix}"
+            processor.save_json_data(processor.iter_terms(args.input, args.format, workers), output_file)
+    except FileNotFoundError as e:
+        logger.error(f"File not found: {e.filename}")
+        sys.exit(1)
+    except ValueError as e:
+        # Includes json.JSONDecodeError
+        logger.error(f"Failed to read {args.input}: {e}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
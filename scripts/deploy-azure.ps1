@@ -8,6 +8,14 @@ $tag = "latest"  # or "1407" for date-based tag
 # Construct full image name with proper variable delimiting
 $acrImageName = "${ACRName}.azurecr.io/${BackendImageName}:${tag}"
 
+# Ship the glossary, and its snapshot and precomputed answers when built, in the image
+if (-not (Test-Path "./data/combined_glossary.json")) { throw "data/combined_glossary.json not found; the backend image needs the glossary" }
+Remove-Item ./backend/data -Recurse -Force -ErrorAction SilentlyContinue
+New-Item -ItemType Directory -Force ./backend/data | Out-Null
+foreach ($file in "combined_glossary.json", "combined_glossary.snap", "answer_store.bin") {
+    if (Test-Path "./data/$file") { Copy-Item "./data/$file" ./backend/data/ }
+}
+
 # Build Docker image locally with tag
 docker build --no-cache --pull --force-rm -t "${BackendImageName}:${tag}" ./backend
 if ($LASTEXITCODE -ne 0) { throw "Backend Docker build failed" }
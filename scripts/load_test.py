@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Load test for the Gov Terms AI backend query pipeline.
+Runs /api/query with the Pinecone and Gemini providers overridden by local
+stubs with fixed latencies and reports throughput at increasing client concurrency.
+The stubs can also inject faults (slow calls and 503s) for tail-latency tests.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import sys
+import time
+import types
+import logging
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Not a bare glossary term, so every request takes the full RAG path
+LOAD_TEST_QUERY = "What does NDIS stand for?"
+
+STUB_HITS = [
+    {
+        "_score": 0.912,
+        "fields": {
+            "text": "NDIS: National Disability Insurance Scheme",
+            "Entity": "National Disability Insurance Agency",
+            "BodyType": "Corporate Commonwealth entity",
+            "Portfolio": "Social Services",
+            "Url": "https://www.ndis.gov.au",
+        },
+    },
+    {
+        "_score": 0.874,
+        "fields": {
+            "text": "NDIS: National Disability Insurance Scheme, a scheme funding supports for people with disability",
+            "Entity": "Department of Social Services",
+            "BodyType": "Non-corporate Commonwealth entity",
+            "Portfolio": "Social Services",
+            "Url": "https://www.dss.gov.au",
+        },
+    },
+]
+
+STUB_ANSWER = json.dumps({
+    "definition": "NDIS: National Disability Insurance Scheme",
+    "elaboration": "A scheme that funds supports for people with permanent and significant disability.",
+    "source_entity": "National Disability Insurance Agency",
+    "source_index": 1,
+})
+
+
+class StubUpstreamError(Exception):
+    """Injected upstream failure, retryable like a real 503."""
+
+    status = 503
+
+
+class Faults:
+    """Randomly slow down or fail a fraction of stub calls."""
+
+    def __init__(self, slow_rate: float = 0.0, slow_latency: float = 2.0, error_rate: float = 0.0, seed: int = 0):
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def latency(self, base: float, timeout: float = None) -> float:
+        """Sleep for this call's latency, raising like the SDKs on an injected error or a client timeout."""
+        with self._lock:
+            roll = self._random.random()
+        latency = self.slow_latency if roll < self.slow_rate else base
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"stub call exceeded {timeout:.2f}s")
+        time.sleep(latency)
+        if self.slow_rate <= roll < self.slow_rate + self.error_rate:
+            raise StubUpstreamError("injected 503")
+        return latency
+
+
+class StubIndex:
+    """Pinecone index stand-in with a fixed, blocking search latency."""
+
+    def __init__(self, latency: float, faults: Faults = None):
+        self.latency = latency
+        self.faults = faults or Faults()
+
+    def search_records(self, namespace, query):
+        self.faults.latency(self.latency)
+        return {"result": {"hits": STUB_HITS}}
+
+    def describe_index_stats(self):
+        return types.SimpleNamespace(total_vector_count=len(STUB_HITS))
+
+
+class StubGenerativeModel:
+    """Gemini model stand-in with a fixed, blocking generation latency."""
+
+    def __init__(self, latency: float, faults: Faults = None):
+        self.latency = latency
+        self.faults = faults or Faults()
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        if stream:
+            return self._stream()
+        # Honour the per-call timeout like the SDK does
+        self.faults.latency(self.latency, (request_options or {}).get("timeout"))
+        item_ids = re.findall(r"^\s*Item (\d+):$", prompt, re.MULTILINE)
+        if item_ids:
+            # Batch prompt: one answer object per numbered item
+            answer = json.loads(STUB_ANSWER)
+            return types.SimpleNamespace(text=json.dumps([{"id": int(i), **answer} for i in item_ids]))
+        return types.SimpleNamespace(text=STUB_ANSWER)
+
+    def _stream(self, chunk_size=16):
+        # Spread the latency across chunks like a streamed completion
+        chunks = [STUB_ANSWER[i:i + chunk_size] for i in range(0, len(STUB_ANSWER), chunk_size)]
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            yield types.SimpleNamespace(text=chunk)
+
+
+def load_backend():
+    """Import backend/app.py; upstream clients are created lazily, so no credentials are needed."""
+    # Every request repeats the same query, so keep the caches out of the way
+    os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+    os.environ.setdefault("RETRIEVAL_CACHE_SIZE", "0")
+    os.environ.setdefault("WARM_PROVIDERS", "false")
+    sys.path.insert(0, str(BACKEND_DIR))
+    import app as backend_app
+    logging.getLogger("app").setLevel(logging.WARNING)
+    return backend_app
+
+
+def install_stub_providers(backend_app, retrieval_latency: float, generation_latency: float,
+                           retrieval_faults: Faults = None, generation_faults: Faults = None):
+    """Point the backend's retriever and Gemini providers at the stubs."""
+    from retrievers import PineconeRetriever
+
+    backend_app.providers.override("retriever", PineconeRetriever(
+        StubIndex(retrieval_latency, retrieval_faults), backend_app.PINECONE_INDEX_NAME, backend_app.PINECONE_NAMESPACE
+    ))
+    backend_app.providers.override("gemini_model", StubGenerativeModel(generation_latency, generation_faults))
+
+
+async def run_level(backend_app, clients: int, requests_per_client: int):
+    """Drive the query endpoint with a fixed number of concurrent clients."""
+
+    async def client(client_id: int):
+        for i in range(requests_per_client):
+            # Distinct queries, so concurrent requests aren't coalesced into one
+            await backend_app.query_endpoint({"query": f"{LOAD_TEST_QUERY} {client_id}-{i}"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(client_id) for client_id in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = clients * requests_per_client
+    return {
+        "clients": clients,
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+    }
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Load test the query pipeline against stub backends")
+    parser.add_argument('--clients', default='1,2,4,8,16', help='Comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=10, help='Requests per client at each level')
+    parser.add_argument('--retrieval-latency', type=float, default=0.05, help='Stub Pinecone latency (s)')
+    parser.add_argument('--generation-latency', type=float, default=0.2, help='Stub Gemini latency (s)')
+    args = parser.parse_args()
+
+    backend_app = load_backend()
+    install_stub_providers(backend_app, args.retrieval_latency, args.generation_latency)
+
+    async def run_all():
+        results = []
+        for clients in [int(c) for c in args.clients.split(',')]:
+            result = await run_level(backend_app, clients, args.requests)
+            print(f"clients={result['clients']:>3}  requests={result['requests']:>4}  "
+                  f"elapsed={result['elapsed_s']:>7.3f}s  throughput={result['throughput_rps']:>7.1f} req/s")
+            results.append(result)
+        return results
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for Gov Terms AI glossary records.
+MinHash signatures over word shingles of term + definition are split into
+locality-sensitive hash bands, so only records that share a band bucket are
+compared and the cost grows roughly linearly with the number of rows.
+"""
+
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_MAX_PAIRWISE_BUCKET = 32
+
+
+def shingles(text: str, size: int = 2) -> List[int]:
+    """CRC32 hashes of the distinct word n-grams of text."""
+    tokens = _WORD.findall(text.lower())
+    if len(tokens) <= size:
+        return [zlib.crc32(" ".join(tokens).encode("utf-8"))]
+    return list({zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)})
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Bands and rows per band whose S-curve best separates pairs above and below
+    threshold (minimizing the false positive plus false negative area).
+    """
+    steps = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        probability = 1 - (1 - steps ** rows) ** bands
+        # Mean over a uniform grid on [0, 1] approximates the integral
+        false_positive = np.where(steps < threshold, probability, 0).mean()
+        false_negative = np.where(steps >= threshold, 1 - probability, 0).mean()
+        if false_positive + false_negative < best_error:
+            best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+class MinHashDeduper:
+    """
+    Collect texts with add(), then call clusters() for groups of indices whose
+    estimated Jaccard similarity is at least threshold.
+    Signatures are computed in vectorized chunks and kept as uint32 rows
+    (num_perm * 4 bytes per record); the texts themselves are not retained.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 2,
+                 chunk_size: int = 1024, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.chunk_size = chunk_size
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        max_uint = np.iinfo(np.uint64).max
+        # Multiply-shift hashing: odd 64-bit multipliers, top 32 bits of the product
+        self.multipliers = rng.integers(0, max_uint, num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self.offsets = rng.integers(0, max_uint, num_perm, dtype=np.uint64, endpoint=True)
+        self.band_weights = rng.integers(0, max_uint, self.rows, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._chunks: List[np.ndarray] = []
+        self._pending: List[List[int]] = []
+        self._signatures = None
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self._chunks) + len(self._pending)
+
+    def add(self, text: str):
+        """Add the next record's text; its index is the number of texts added before it."""
+        self._pending.append(shingles(text, self.shingle_size))
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        lengths = np.fromiter((len(s) for s in self._pending), dtype=np.int64, count=len(self._pending))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        values = np.fromiter((h for s in self._pending for h in s), dtype=np.uint64, count=int(lengths.sum()))
+        with np.errstate(over="ignore"):
+            hashed = (self.multipliers[:, None] * values[None, :] + self.offsets[:, None]) >> np.uint64(32)
+        self._chunks.append(np.minimum.reduceat(hashed, starts, axis=1).T.astype(np.uint32))
+        self._pending = []
+        self._signatures = None
+
+    @property
+    def signatures(self) -> np.ndarray:
+        self._flush()
+        if self._signatures is None:
+            self._signatures = (np.concatenate(self._chunks) if self._chunks
+                                else np.empty((0, self.num_perm), dtype=np.uint32))
+        return self._signatures
+
+    def similarity(self, i: int, j: int) -> float:
+        """Estimated Jaccard similarity of records i and j."""
+        signatures = self.signatures
+        return float(np.mean(signatures[i] == signatures[j]))
+
+    def _buckets(self, band: int) -> List[np.ndarray]:
+        """Groups of record indices whose signatures agree on one band."""
+        columns = self.signatures[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+        with np.errstate(over="ignore"):
+            keys = (columns * self.band_weights).sum(axis=1)
+        return _groups(keys)
+
+    def clusters(self) -> List[List[int]]:
+        """Ascending index groups of near-duplicates (singletons omitted), ordered by first index."""
+        signatures = self.signatures
+        sets = _DisjointSet(len(signatures))
+        for band in range(self.bands):
+            for group in self._buckets(band):
+                if len(group) <= _MAX_PAIRWISE_BUCKET:
+                    pairs = ((a, b) for n, a in enumerate(group) for b in group[n + 1:])
+                else:
+                    # Very common band value: compare against the first member only
+                    pairs = ((group[0], b) for b in group[1:])
+                for a, b in pairs:
+                    if sets.find(a) != sets.find(b) and self.similarity(a, b) >= self.threshold:
+                        sets.union(a, b)
+
+        roots = sets.parent
+        while True:
+            # Point every index straight at its root
+            next_roots = roots[roots]
+            if np.array_equal(next_roots, roots):
+                break
+            roots = next_roots
+        return [group.tolist() for group in _groups(roots)]
+
+
+def _groups(keys: np.ndarray) -> List[np.ndarray]:
+    """Ascending index arrays of the values that occur more than once in keys."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    ends = np.append(starts[1:], len(keys))
+    repeated = ends - starts > 1
+    return [order[start:end] for start, end in zip(starts[repeated], ends[repeated])]
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Precompute answers for every glossary term into the backend's answer store.
+
+Runs the backend's own pipeline for each unique Term in
+combined_glossary.json: the exact-match selection rules, search_database and
+send_gemini_prompt, with the same prompt mode, index and retries as the live
+service. Terms with an unambiguous exact match get their `elaborate` answer
+(the plain one is already served without Gemini); the rest get the RAG
+answer, which the backend serves with or without `elaborate`.
+
+Each term whose answer parsed is appended to a JSONL checkpoint, so an
+interrupted or partly failed run picks up where it stopped when rerun; an
+answer Gemini didn't return as valid JSON counts as failed and is retried.
+The answer store is written from the checkpoint at the end. Rerun after
+scripts/update_pinecone.py or a glossary change; the backend ignores a store
+built from another glossary or index generation.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+GLOSSARY_PATH = DATA_DIR / "combined_glossary.json"
+STORE_PATH = DATA_DIR / "answer_store.bin"
+
+logger = logging.getLogger("precompute_answers")
+
+
+def load_checkpoint(path: str, metadata: Dict[str, Any], restart: bool) -> Dict[str, Dict[str, Any]]:
+    """Finished terms from a previous run with the same metadata, keyed by normalized term."""
+    if restart or not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"metadata": metadata}) + "\n")
+        return {}
+    done = {}
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+        previous = json.loads(first).get("metadata") if first.strip() else None
+        if previous != metadata:
+            raise SystemExit(f"Checkpoint {path} was written for {previous}, not {metadata}; "
+                             f"pass --restart to discard it.")
+        for line_number, line in enumerate(f, start=2):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of a killed run may be cut short
+                logger.warning(f"Skipping unreadable checkpoint line {line_number}")
+                continue
+            done[entry["key"]] = entry
+    return done
+
+
+def unique_terms(records: List[Dict[str, Any]], normalize) -> Dict[str, str]:
+    """Normalized term -> first spelling seen, in glossary order."""
+    terms: Dict[str, str] = {}
+    for rec in records:
+        term = (rec.get("Term") or "").strip()
+        if term:
+            terms.setdefault(normalize(term), term)
+    return terms
+
+
+def answer_term(backend_app, term: str, key: str) -> Tuple[List[str], Dict[str, Any]]:
+    """Store keys and response payload for one term, as query_endpoint would generate them."""
+    from answer_store import answer_key
+    from prompts import extract_json
+
+    match = backend_app.glossary_index.lookup(term)
+    if match:
+        served_by = "exact_match+gemini"
+        search_results = [match["selected_source"]]
+        keys = [answer_key(key, elaborate=True)]
+    else:
+        served_by = "rag"
+        search_results = backend_app.search_database(term)
+        keys = [answer_key(key, elaborate=False), answer_key(key, elaborate=True)]
+    gemini_result = backend_app.send_gemini_prompt(term, search_results)
+    # An unparsed answer would be served verbatim until the next rebuild; fail it so a rerun retries it
+    answer = extract_json(gemini_result["ai_response"])
+    if not isinstance(answer, dict) or not answer.get("definition"):
+        raise ValueError("Gemini's answer is not a valid JSON definition")
+    return keys, {
+        "ai_response": gemini_result["ai_response"],
+        "sources": search_results,
+        "selected_source": gemini_result["selected_source"],
+        "served_by": served_by,
+    }
+
+
+def run(backend_app, pending: List[Tuple[str, str]], checkpoint_path: str, workers: int) -> Tuple[int, int]:
+    """Answer pending (key, term) pairs with at most `workers` in flight; returns (done, failed)."""
+    done = failed = 0
+    started = last_report = time.monotonic()
+    items = iter(pending)
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight: Dict[Any, Tuple[str, str]] = {}
+
+        def submit_next() -> bool:
+            item = next(items, None)
+            if item is None:
+                return False
+            key, term = item
+            in_flight[executor.submit(answer_term, backend_app, term, key)] = item
+            return True
+
+        try:
+            # Only a small window is queued, so an interrupt doesn't leave thousands of calls behind
+            while len(in_flight) < workers * 2 and submit_next():
+                pass
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key, term = in_flight.pop(future)
+                    try:
+                        keys, payload = future.result()
+                    except Exception as e:
+                        failed += 1
+                        logger.error(f"{term!r} failed: {getattr(e, 'detail', None) or e}")
+                    else:
+                        checkpoint.write(json.dumps({"key": key, "term": term, "keys": keys, "answer": payload},
+                                                    ensure_ascii=False) + "\n")
+                        checkpoint.flush()
+                        done += 1
+                    submit_next()
+                if time.monotonic() - last_report >= 30:
+                    last_report = time.monotonic()
+                    rate = (done + failed) / (time.monotonic() - started)
+                    remaining = (len(pending) - done - failed) / rate if rate else 0
+                    logger.info(f"{done + failed}/{len(pending)} terms, {failed} failed, "
+                                f"{rate:.1f}/s, about {remaining / 60:.0f} min left")
+        except KeyboardInterrupt:
+            logger.warning("Interrupted; finishing the calls in flight. Rerun to resume.")
+            for future in in_flight:
+                future.cancel()
+            raise
+    return done, failed
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Precompute answers for every glossary term")
+    parser.add_argument('--input', '-i', default=str(GLOSSARY_PATH), help='Glossary JSON')
+    parser.add_argument('--output', '-o', default=str(STORE_PATH), help='Answer store to write')
+    parser.add_argument('--checkpoint', help='Progress file (default: <output>.checkpoint.jsonl)')
+    parser.add_argument('--workers', type=int, default=4, help='Terms answered concurrently')
+    parser.add_argument('--limit', type=int, help='Answer at most this many new terms (for trial runs)')
+    parser.add_argument('--restart', action='store_true', help='Discard the checkpoint and start over')
+    parser.add_argument('--write-only', action='store_true',
+                        help='Write the store from the checkpoint without generating anything')
+    args = parser.parse_args()
+
+    # Import the backend against this glossary, without loading the store being rebuilt
+    os.environ["GLOSSARY_PATH"] = args.input
+    os.environ["ANSWER_STORE_PATH"] = ""
+    os.environ.setdefault("WARM_PROVIDERS", "false")
+    sys.path.insert(0, str(BACKEND_DIR))
+    import app as backend_app
+    from answer_store import store_metadata, write_answer_store
+    from glossary_index import load_glossary, normalize_term
+
+    # The answers are only valid for the index contents they were retrieved from
+    generation = asyncio.run(backend_app.index_generation.refresh())
+    metadata = {
+        **store_metadata(args.input, backend_app.retriever.name, backend_app.retriever.namespace,
+                         backend_app.prompt_template.mode),
+        "index_generation": generation,
+    }
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint.jsonl"
+    finished = load_checkpoint(checkpoint_path, metadata, args.restart)
+    terms = unique_terms(load_glossary(args.input), normalize_term)
+    pending = [(key, term) for key, term in terms.items() if key not in finished]
+    logger.info(f"{len(terms)} unique terms, {len(finished)} already answered, {len(pending)} to go")
+
+    failed = 0
+    if pending and not args.write_only:
+        if args.limit is not None:
+            pending = pending[:args.limit]
+        done, failed = run(backend_app, pending, checkpoint_path, args.workers)
+        logger.info(f"Answered {done} terms, {failed} failed")
+        finished = load_checkpoint(checkpoint_path, metadata, restart=False)
+
+    # Terms removed from the glossary since the checkpoint was started are left out
+    entries = [(entry["keys"], entry["answer"]) for key, entry in finished.items() if key in terms]
+    write_answer_store(args.output, entries, {
+        **metadata, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    })
+    missing = len(terms) - len(entries)
+    if missing:
+        logger.warning(f"{missing} terms have no stored answer yet; rerun to retry them.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Prompt size comparison for Gov Terms AI.
+Builds the legacy inline prompt and the compact system-instruction prompt for
+the same query and search hits, and reports input tokens per request for each.
+Uses Gemini's count_tokens when GOOGLE_API_KEY is set, otherwise an estimate.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from prompts import PromptTemplate, estimate_tokens  # noqa: E402
+
+SAMPLE_HITS = [
+    {
+        "score": 0.912,
+        "text": "NDIS: National Disability Insurance Scheme",
+        "entity": "National Disability Insurance Agency",
+        "body_type": "Corporate Commonwealth entity",
+    },
+    {
+        "score": 0.874,
+        "text": "NDIS: National Disability Insurance Scheme, which funds reasonable and necessary supports "
+                "for Australians with permanent and significant disability so they can pursue their goals, "
+                "build capacity and take part in the community and the workforce. " * 3,
+        "entity": "Department of Social Services",
+        "body_type": "Non-corporate Commonwealth entity",
+    },
+    {
+        "score": 0.801,
+        "text": "NDIA: National Disability Insurance Agency",
+        "entity": "National Disability Insurance Agency",
+        "body_type": "Corporate Commonwealth entity",
+    },
+]
+
+
+def count_tokens(system_instruction, contents):
+    """Count input tokens with Gemini when configured, otherwise estimate them."""
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return estimate_tokens((system_instruction or "") + contents), "estimate"
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)  # type: ignore
+    model = genai.GenerativeModel('gemini-2.0-flash', system_instruction=system_instruction)  # type: ignore
+    return model.count_tokens(contents).total_tokens, "gemini"
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Compare legacy and compact prompt token counts")
+    parser.add_argument('--query', default='NDIS', help='User query')
+    parser.add_argument('--hits', help='JSON file with search_database hits (defaults to built-in sample)')
+    parser.add_argument('--max-text-chars', type=int, default=500, help='Compact mode text truncation')
+    args = parser.parse_args()
+
+    hits = SAMPLE_HITS
+    if args.hits:
+        with open(args.hits, encoding='utf-8') as f:
+            hits = json.load(f)
+
+    rows = []
+    for mode in ("legacy", "compact"):
+        template = PromptTemplate(mode=mode, max_text_chars=args.max_text_chars)
+        contents = template.build(args.query, hits)
+        tokens, method = count_tokens(template.system_instruction, contents)
+        rows.append((mode, len(template.system_instruction or ""), len(contents), tokens, method))
+
+    print(f"{'mode':<8} {'system chars':>12} {'content chars':>13} {'input tokens':>12}")
+    for mode, system_chars, content_chars, tokens, method in rows:
+        print(f"{mode:<8} {system_chars:>12} {content_chars:>13} {tokens:>12} ({method})")
+    saved = rows[0][3] - rows[1][3]
+    print(f"\nInput tokens saved per request: {saved} ({saved / rows[0][3]:.0%})")
+
+
+if __name__ == "__main__":
+    main()
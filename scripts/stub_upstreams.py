@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Local stub Pinecone and Gemini servers for benchmarks, with no network access.
+Each service is a small HTTP server on 127.0.0.1 that speaks the subset of the
+real REST API the backend uses (Pinecone search_records and
+describe_index_stats, Gemini generateContent and streamGenerateContent) and
+answers after a delay drawn from a configurable latency distribution.
+
+The backend can reach them through the real SDKs (PINECONE_HOST and
+GEMINI_API_ENDPOINT, see docs/API.md) or, where the SDKs aren't installed,
+through the small HTTP clients below installed as provider overrides.
+
+Latency specs: `0.05` or `fixed:0.05`, `uniform:LOW,HIGH`, `normal:MEAN,SD`,
+`lognormal:MEDIAN,SIGMA`, `exponential:MEAN`, optionally followed by
+`+tail:P,SECONDS` to make a share P of calls take SECONDS instead.
+"""
+
+import argparse
+import http.client
+import json
+import math
+import random
+import re
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+STUB_RECORDS = [
+    {
+        "text": "NDIS: National Disability Insurance Scheme",
+        "Entity": "National Disability Insurance Agency",
+        "BodyType": "Corporate Commonwealth entity",
+        "Portfolio": "Social Services",
+        "Url": "https://www.ndis.gov.au",
+    },
+    {
+        "text": "NDIS: National Disability Insurance Scheme, a scheme funding supports for people with disability",
+        "Entity": "Department of Social Services",
+        "BodyType": "Non-corporate Commonwealth entity",
+        "Portfolio": "Social Services",
+        "Url": "https://www.dss.gov.au",
+    },
+    {
+        "text": "NDIA: National Disability Insurance Agency, the agency administering the NDIS",
+        "Entity": "National Disability Insurance Agency",
+        "BodyType": "Corporate Commonwealth entity",
+        "Portfolio": "Social Services",
+        "Url": "https://www.ndis.gov.au/about-us",
+    },
+]
+
+STUB_ANSWER = {
+    "definition": "NDIS: National Disability Insurance Scheme",
+    "elaboration": "A scheme that funds supports for people with permanent and significant disability.",
+    "source_entity": "National Disability Insurance Agency",
+    "source_index": 1,
+}
+
+GEMINI_ROUTE = re.compile(r"^/v1(?:beta)?/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)$")
+PINECONE_SEARCH_ROUTE = re.compile(r"^/records/namespaces/(?P<namespace>[^/]+)/search$")
+BATCH_ITEM = re.compile(r"^\s*Item (\d+):$", re.MULTILINE)
+
+
+class LatencyDistribution:
+    """Per-call latency in seconds, parsed from a spec such as `lognormal:0.8,0.4+tail:0.02,3`."""
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, kind: str, params: Tuple[float, ...], tail_rate: float = 0.0, tail_latency: float = 0.0):
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f"{kind} takes {self.KINDS.get(kind, '?')} parameters, got {len(params)}")
+        self.kind = kind
+        self.params = params
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        body, _, tail = spec.partition("+tail:")
+        kind, _, args = body.partition(":")
+        if not args:
+            kind, args = "fixed", kind
+        tail_rate, tail_latency = (float(value) for value in tail.split(",")) if tail else (0.0, 0.0)
+        return cls(kind.strip(), tuple(float(value) for value in args.split(",")), tail_rate, tail_latency)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.tail_rate and rng.random() < self.tail_rate:
+            return self.tail_latency
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(rng.gauss(*self.params), 0.0)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+
+    def __str__(self) -> str:
+        spec = f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+        return spec + (f"+tail:{self.tail_rate:g},{self.tail_latency:g}" if self.tail_rate else "")
+
+
+class StubService:
+    """Latency and injected 503s for one stub upstream, plus call counters."""
+
+    def __init__(self, name: str, latency: LatencyDistribution, error_rate: float = 0.0, seed: int = 0):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, bool]:
+        """This call's latency and whether it should fail."""
+        with self._lock:
+            self.calls += 1
+            latency = self.latency.sample(self._random)
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+        return latency, failed
+
+    def stats(self) -> Dict[str, Any]:
+        return {"latency": str(self.latency), "error_rate": self.error_rate, "calls": self.calls, "errors": self.errors}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the pooled SDK connections
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _fail(self):
+        self._send_json(503, {"error": {"code": 503, "message": "injected failure", "status": "UNAVAILABLE"}})
+
+    def do_GET(self):
+        self.do_POST()
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        request = self._read_json() if self.command == "POST" else {}
+        service = self.server.service
+        if service.name == "pinecone" and path == "/describe_index_stats":
+            self._send_json(200, {"dimension": 1024, "indexFullness": 0.0, "totalVectorCount": len(STUB_RECORDS),
+                                  "namespaces": {}})
+            return
+        latency, failed = service.draw()
+        if service.name == "pinecone" and PINECONE_SEARCH_ROUTE.match(path):
+            time.sleep(latency)
+            if failed:
+                self._fail()
+                return
+            top_k = int(request.get("query", {}).get("top_k", 3))
+            hits = [{"_id": f"stub-{i}", "_score": round(0.92 - 0.03 * i, 3), "fields": record}
+                    for i, record in enumerate(STUB_RECORDS[:top_k])]
+            self._send_json(200, {"result": {"hits": hits}, "usage": {"read_units": 1, "embed_total_tokens": 8}})
+            return
+        route = GEMINI_ROUTE.match(path) if service.name == "gemini" else None
+        if route is None:
+            self._send_json(404, {"error": {"code": 404, "message": f"no stub route for {path}"}})
+            return
+        prompt = "".join(part.get("text", "") for content in request.get("contents", [])
+                         for part in content.get("parts", []))
+        text = stub_answer_text(prompt)
+        usage = {"promptTokenCount": (len(prompt) + 3) // 4, "candidatesTokenCount": (len(text) + 3) // 4}
+        usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+        if route.group("method") == "generateContent":
+            time.sleep(latency)
+            if failed:
+                self._fail()
+                return
+            self._send_json(200, gemini_response(text, usage))
+            return
+        if failed:
+            time.sleep(latency)
+            self._fail()
+            return
+        self._stream(text, usage, latency)
+
+    def _stream(self, text: str, usage: Dict[str, int], latency: float, chunk_size: int = 16):
+        """Server-sent events, spreading the latency across the chunks like a streamed completion."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        for i, chunk in enumerate(chunks):
+            time.sleep(latency / len(chunks))
+            body = gemini_response(chunk, usage if i == len(chunks) - 1 else None)
+            self.wfile.write(f"data: {json.dumps(body)}\r\n\r\n".encode())
+            self.wfile.flush()
+        self.close_connection = True
+
+
+def stub_answer_text(prompt: str) -> str:
+    """The canned answer, or one answer object per numbered item for a batch prompt."""
+    item_ids = BATCH_ITEM.findall(prompt)
+    if item_ids:
+        return json.dumps([{"id": int(i), **STUB_ANSWER} for i in item_ids])
+    return json.dumps(STUB_ANSWER)
+
+
+def gemini_response(text: str, usage: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    body: Dict[str, Any] = {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+        "modelVersion": "gemini-2.0-flash",
+    }
+    if usage:
+        body["usageMetadata"] = usage
+    return body
+
+
+class StubServer(ThreadingHTTPServer):
+    """One stub upstream on 127.0.0.1, served from a daemon thread."""
+
+    daemon_threads = True
+    # Benchmarks open many connections at once
+    request_queue_size = 1024
+
+    def __init__(self, service: StubService, port: int = 0):
+        super().__init__(("127.0.0.1", port), _StubHandler)
+        self.service = service
+        self._thread = threading.Thread(target=self.serve_forever, name=f"stub-{service.name}", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def start_stub_servers(pinecone_latency: str = "0.05", gemini_latency: str = "0.2", error_rate: float = 0.0,
+                       seed: int = 0, pinecone_port: int = 0, gemini_port: int = 0) -> Dict[str, StubServer]:
+    """Start stub Pinecone and Gemini servers; stop them with stop() when done."""
+    return {
+        "pinecone": StubServer(StubService("pinecone", LatencyDistribution.parse(pinecone_latency), error_rate, seed),
+                               pinecone_port).start(),
+        "gemini": StubServer(StubService("gemini", LatencyDistribution.parse(gemini_latency), error_rate, seed + 1),
+                             gemini_port).start(),
+    }
+
+
+# ============================================================================
+# HTTP clients standing in for the SDKs
+# ============================================================================
+
+class StubHTTPError(Exception):
+    """Non-200 answer from a stub server; `status` makes 503s retryable like the SDKs' errors."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class _KeepAliveClient:
+    """One keep-alive connection per calling thread, like a pooled SDK client."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port
+        self._local = threading.local()
+
+    def request(self, path: str, body: Dict[str, Any], timeout: Optional[float] = None,
+                stream: bool = False) -> http.client.HTTPResponse:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or stream:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+            if not stream:
+                self._local.connection = connection
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        payload = json.dumps(body).encode()
+        try:
+            connection.request("POST", path, payload, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+        except Exception:
+            connection.close()
+            if not stream:
+                self._local.connection = None
+            raise
+        if response.status != 200:
+            message = response.read().decode(errors="replace")
+            raise StubHTTPError(response.status, message)
+        return response
+
+    def post_json(self, path: str, body: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        return json.loads(self.request(path, body, timeout).read())
+
+
+class HttpStubIndex:
+    """The parts of pinecone.Index the backend calls, over HTTP to a stub server."""
+
+    def __init__(self, url: str):
+        self._client = _KeepAliveClient(url)
+
+    def search_records(self, namespace: str, query: Dict[str, Any]) -> Dict[str, Any]:
+        return self._client.post_json(f"/records/namespaces/{namespace}/search", {"query": query})
+
+    def describe_index_stats(self):
+        stats = self._client.post_json("/describe_index_stats", {})
+        return types.SimpleNamespace(total_vector_count=stats["totalVectorCount"])
+
+
+class _StubStream:
+    """Iterable of streamed chunks with usage_metadata filled in at the end, like the SDK's."""
+
+    def __init__(self, response: http.client.HTTPResponse):
+        self._response = response
+        self.usage_metadata = None
+
+    def __iter__(self) -> Iterator[types.SimpleNamespace]:
+        try:
+            for line in self._response:
+                if not line.startswith(b"data: "):
+                    continue
+                body = json.loads(line[6:])
+                if "usageMetadata" in body:
+                    self.usage_metadata = _usage(body["usageMetadata"])
+                yield types.SimpleNamespace(text=body["candidates"][0]["content"]["parts"][0]["text"])
+        finally:
+            self._response.close()
+
+
+def _usage(metadata: Dict[str, int]) -> types.SimpleNamespace:
+    return types.SimpleNamespace(prompt_token_count=metadata.get("promptTokenCount", 0),
+                                 candidates_token_count=metadata.get("candidatesTokenCount", 0))
+
+
+class HttpStubModel:
+    """The parts of genai.GenerativeModel the backend calls, over HTTP to a stub server."""
+
+    def __init__(self, url: str, model: str = "gemini-2.0-flash"):
+        self._client = _KeepAliveClient(url)
+        self._path = f"/v1beta/models/{model}"
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config: Any = None,
+                         request_options: Optional[Dict[str, Any]] = None):
+        timeout = (request_options or {}).get("timeout")
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}], "generationConfig": generation_config}
+        if stream:
+            return _StubStream(self._client.request(f"{self._path}:streamGenerateContent?alt=sse", body,
+                                                    timeout, stream=True))
+        response = self._client.post_json(f"{self._path}:generateContent", body, timeout)
+        return types.SimpleNamespace(text=response["candidates"][0]["content"]["parts"][0]["text"],
+                                     usage_metadata=_usage(response.get("usageMetadata", {})))
+
+
+def install_http_stubs(backend_app, servers: Dict[str, StubServer]):
+    """Point an imported backend's retriever and Gemini providers at running stub servers."""
+    from retrievers import PineconeRetriever
+
+    backend_app.providers.override("retriever", PineconeRetriever(
+        HttpStubIndex(servers["pinecone"].url), backend_app.PINECONE_INDEX_NAME, backend_app.PINECONE_NAMESPACE
+    ))
+    backend_app.providers.override("gemini_model", HttpStubModel(servers["gemini"].url))
+
+
+def sdk_environment(servers: Dict[str, StubServer]) -> Dict[str, str]:
+    """Environment pointing a backend process that has the real SDKs at the stub servers."""
+    return {
+        "PINECONE_API_KEY": "stub",
+        "GOOGLE_API_KEY": "stub",
+        "PINECONE_HOST": servers["pinecone"].url,
+        "GEMINI_API_ENDPOINT": servers["gemini"].url,
+    }
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Run stub Pinecone and Gemini servers for benchmarks")
+    parser.add_argument('--pinecone-latency', default='lognormal:0.05,0.3', help='Pinecone latency spec (s)')
+    parser.add_argument('--gemini-latency', default='lognormal:0.8,0.4', help='Gemini latency spec (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of calls answered with a 503')
+    parser.add_argument('--pinecone-port', type=int, default=5081, help='Pinecone stub port')
+    parser.add_argument('--gemini-port', type=int, default=5082, help='Gemini stub port')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for latencies and errors')
+    args = parser.parse_args()
+
+    servers = start_stub_servers(args.pinecone_latency, args.gemini_latency, args.error_rate, args.seed,
+                                 args.pinecone_port, args.gemini_port)
+    print("Start the backend against the stubs with:")
+    print("  " + " ".join(f"{key}={value}" for key, value in sdk_environment(servers).items()) + " uvicorn app:app")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for name, server in servers.items():
+            print(f"{name}: {server.service.stats()}")
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
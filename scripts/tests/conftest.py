@@ -0,0 +1,12 @@
+"""
+Shared setup for the script tests.
+The scripts are run as `python scripts/<name>.py`, so they are imported flat
+from scripts/; backend/ is on the path too for the scripts that import it.
+"""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR.parent / "backend"))
@@ -0,0 +1,41 @@
+import logging
+
+import pytest
+
+from data_utils import DataProcessor, clean_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", ""),
+    (None, ""),
+    ("  plain   text\n\twith  spaces ", "plain text with spaces"),
+    ("“quoted” ‘single’ en–em—dash…", "\"quoted\" 'single' en-em-dash..."),
+    ("zero\u200bwidth soft\u00adhyphen\ufeff", "zerowidth softhyphen"),
+    ("bell\x07 and\x1b escape \x85next", "bell and escape next"),
+    ("keeps ünïcode ✓", "keeps ünïcode ✓"),
+    ("private\ue000use", "privateuse"),
+])
+def test_clean_text(text, expected):
+    assert clean_text(text) == expected
+
+
+def records(n):
+    for i in range(n):
+        if i % 7 == 3:
+            yield {"term": f"bad {i}", "definition": "short", "source": "x"}
+        else:
+            yield {"term": f" term’{i} ", "definition": f"definition  number {i} — long enough", "source": "x"}
+
+
+def test_parallel_processing_matches_serial_order(tmp_path, caplog):
+    processor = DataProcessor(str(tmp_path))
+    serial = list(processor.clean_records(processor.validate_records(records(50))))
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="data_utils"):
+        parallel = list(processor.process_records_parallel(records(50), workers=2, chunk_size=6))
+    assert parallel == serial
+    assert len(parallel) == 43
+    # Invalid rows are reported by their position in the whole input, not in their chunk
+    invalid = sorted(int(r.getMessage().rsplit(" ", 1)[1]) for r in caplog.records
+                     if r.getMessage().startswith("Invalid data at index"))
+    assert invalid == [i for i in range(50) if i % 7 == 3]
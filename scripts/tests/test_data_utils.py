@@ -0,0 +1,125 @@
+import json
+import sys
+
+import pytest
+
+from data_utils import DataProcessor, iter_json_array, main, write_records
+
+ITEMS = [
+    {"term": "NDIS", "definition": "National Disability Insurance Scheme", "source": "NDIA"},
+    {"term": "Quote \"and\" brackets ]", "definition": "A definition with [brackets], {braces} and a comma",
+     "source": "Test"},
+    12345678901234567890,
+    -1.5e-3,
+    "plain string",
+    None,
+    [],
+    {"term": "Ünïcode ✓", "definition": "Non-ASCII text across chunk boundaries", "source": "Test"},
+]
+
+
+def write_json(path, items, **dump_options):
+    path.write_text(json.dumps(items, **dump_options), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 16, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_array_matches_json_load(tmp_path, chunk_size, indent):
+    path = write_json(tmp_path / "items.json", ITEMS, indent=indent, ensure_ascii=False)
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == ITEMS
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ ]  ", "\n[\n]\n"])
+def test_iter_json_array_empty(tmp_path, text):
+    path = tmp_path / "empty.json"
+    path.write_text(text, encoding="utf-8")
+    assert list(iter_json_array(str(path), chunk_size=2)) == []
+
+
+@pytest.mark.parametrize("text, error", [
+    ('{"term": "not a list"}', ValueError),
+    ("", ValueError),
+    ('[{"a": 1}, {"b": 2}', json.JSONDecodeError),
+    ('[{"a": 1} {"b": 2}]', json.JSONDecodeError),
+    ('[{"a": 1}, {"b": ]', json.JSONDecodeError),
+])
+def test_iter_json_array_rejects_malformed_input(tmp_path, text, error):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(error):
+        list(iter_json_array(str(path), chunk_size=4))
+
+
+def test_write_records_matches_json_dump_layout(tmp_path):
+    records = [item for item in ITEMS if isinstance(item, dict)]
+    path = tmp_path / "out.json"
+    assert write_records(iter(records), str(path)) == len(records)
+    assert path.read_text(encoding="utf-8") == json.dumps(records, indent=2, ensure_ascii=False)
+    write_records([], str(path))
+    assert path.read_text(encoding="utf-8") == "[]"
+
+
+def test_write_records_can_rewrite_its_input_in_place(tmp_path):
+    path = str(tmp_path / "terms.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(item) + "\n" for item in ITEMS[:2])
+    processor = DataProcessor(str(tmp_path))
+    assert write_records(processor.iter_raw_records(path), path) == 2
+    assert [json.loads(line) for line in open(path, encoding="utf-8")] == ITEMS[:2]
+
+
+def test_iter_terms_streams_valid_cleaned_terms(tmp_path):
+    path = write_json(tmp_path / "terms.json", [
+        {"term": "  ATO ", "definition": "Australian “Taxation”   Office", "source": "ATO"},
+        {"term": "Short", "definition": "too short", "source": "x"},
+        {"definition": "No term at all here", "source": "x"},
+        "not a record",
+    ])
+    terms = list(DataProcessor(str(tmp_path)).iter_terms(path))
+    assert terms == [{"term": "ATO", "definition": 'Australian "Taxation" Office', "source": "ATO"}]
+
+
+def test_iter_terms_reads_csv(tmp_path):
+    path = tmp_path / "terms.csv"
+    path.write_text("term,definition,source,tags\nNDIS,National Disability Insurance Scheme,NDIA,\"a,b\"\n",
+                    encoding="utf-8")
+    terms = list(DataProcessor(str(tmp_path)).iter_terms(str(path)))
+    assert terms[0]["term"] == "NDIS" and terms[0]["tags"] == ["a", "b"]
+
+
+def test_iter_terms_raises_on_malformed_json(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text('[{"term": "NDIS", "definition": "National Disability Insurance Scheme", "source": "NDIA"}, ',
+                    encoding="utf-8")
+    terms = DataProcessor(str(tmp_path)).iter_terms(str(path))
+    assert next(terms)["term"] == "NDIS"
+    with pytest.raises(ValueError):
+        next(terms)
+
+
+def test_write_records_keeps_the_output_when_reading_fails(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text("[]", encoding="utf-8")
+
+    def records():
+        yield ITEMS[0]
+        raise ValueError("malformed")
+
+    with pytest.raises(ValueError):
+        write_records(records(), str(path))
+    assert path.read_text(encoding="utf-8") == "[]"
+    assert not (tmp_path / "out.json.tmp").exists()
+
+
+def test_clean_in_place_exits_non_zero_and_keeps_a_malformed_input(tmp_path, monkeypatch):
+    good = {"term": "NDIS", "definition": "National Disability Insurance Scheme", "source": "NDIA"}
+    text = json.dumps([good, good, good]).replace('"NDIA"}]', '"NDIA"]')
+    path = tmp_path / "g.json"
+    path.write_text(text, encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["data_utils.py", "clean", "-i", str(path), "-o", str(path)])
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 1
+    assert path.read_text(encoding="utf-8") == text
+    assert not (tmp_path / "g.json.tmp").exists()
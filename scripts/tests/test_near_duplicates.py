@@ -0,0 +1,95 @@
+import json
+from itertools import combinations
+
+import numpy as np
+
+from data_utils import DataProcessor
+from near_duplicates import MinHashDeduper, lsh_params, shingles
+
+BASE = ("the national disability insurance scheme funds reasonable and necessary supports for australians "
+        "under sixty five with a permanent and significant disability administered by the agency")
+
+
+def jaccard(a, b):
+    a, b = set(shingles(a)), set(shingles(b))
+    return len(a & b) / len(a | b)
+
+
+def test_shingles_are_case_and_punctuation_insensitive():
+    assert set(shingles("Tax, Office!")) == set(shingles("tax office"))
+    assert len(shingles("one")) == 1
+
+
+def test_lsh_params_use_every_permutation_sensibly():
+    bands, rows = lsh_params(0.8, 128)
+    assert bands * rows <= 128
+    # The S-curve midpoint (1/b)^(1/r) sits near the threshold
+    assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.1
+
+
+def test_similarity_estimates_jaccard():
+    edited = BASE.replace("reasonable", "sensible")
+    deduper = MinHashDeduper(num_perm=256)
+    deduper.add(BASE)
+    deduper.add(edited)
+    assert abs(deduper.similarity(0, 1) - jaccard(BASE, edited)) < 0.1
+
+
+def test_clusters_group_near_duplicates_only():
+    texts = [
+        BASE,
+        "an unrelated definition of the goods and services tax charged on most goods",
+        BASE + " nationally",
+        BASE.replace("agency", "national agency"),
+        "another unrelated entry about the australian taxation office and its role",
+    ]
+    deduper = MinHashDeduper(threshold=0.8, chunk_size=2)
+    for text in texts:
+        deduper.add(text)
+    assert len(deduper) == 5
+    assert deduper.clusters() == [[0, 2, 3]]
+
+
+def test_clusters_match_brute_force_on_random_edits():
+    rng = np.random.default_rng(7)
+    words = BASE.split()
+    texts = []
+    for _ in range(60):
+        edited = list(words)
+        for i in rng.choice(len(edited), size=rng.integers(0, 12), replace=False):
+            edited[i] = f"w{rng.integers(1000)}"
+        texts.append(" ".join(edited))
+    deduper = MinHashDeduper(threshold=0.8)
+    for text in texts:
+        deduper.add(text)
+    cluster_of = {i: n for n, cluster in enumerate(deduper.clusters()) for i in cluster}
+    # Pairs well above the threshold must end up in the same cluster
+    close = [(i, j) for i, j in combinations(range(len(texts)), 2) if jaccard(texts[i], texts[j]) >= 0.95]
+    assert close
+    for i, j in close:
+        assert i in cluster_of and cluster_of[i] == cluster_of.get(j)
+
+
+def test_empty_deduper_has_no_clusters():
+    assert MinHashDeduper().clusters() == []
+
+
+def test_merge_keeps_the_preferred_record_of_each_cluster(tmp_path):
+    records = [
+        {"term": "NDIS", "definition": BASE, "source": "Department of Social Services", "BodyType": "Other"},
+        {"term": "NDIS", "definition": BASE + " nationally", "source": "NDIA",
+         "BodyType": "Non-corporate Commonwealth entity"},
+        {"term": "GST", "definition": "goods and services tax charged on most goods", "source": "ATO"},
+    ]
+    source = tmp_path / "in.json"
+    source.write_text(json.dumps(records), encoding="utf-8")
+    output, report = tmp_path / "out.json", tmp_path / "report.json"
+    DataProcessor(str(tmp_path)).merge_datasets(
+        [str(source)], str(output), dedupe="near",
+        prefer_body_types=["Non-corporate Commonwealth entity"], report_file=str(report),
+    )
+    merged = json.loads(output.read_text(encoding="utf-8"))
+    assert [item["source"] for item in merged] == ["NDIA", "ATO"]
+    clusters = json.loads(report.read_text(encoding="utf-8"))
+    assert clusters[0]["canonical"]["entity"] == "NDIA"
+    assert clusters[0]["merged"][0]["entity"] == "Department of Social Services"
@@ -0,0 +1,33 @@
+import json
+import types
+
+import pytest
+
+from precompute_answers import answer_term, unique_terms
+
+ANSWER = {"definition": "NDIS: National Disability Insurance Scheme", "elaboration": "", "source_index": 1}
+
+
+def fake_app(ai_response):
+    return types.SimpleNamespace(
+        glossary_index=types.SimpleNamespace(lookup=lambda term: None),
+        search_database=lambda term: [{"entity": "NDIA"}],
+        send_gemini_prompt=lambda term, results: {"ai_response": ai_response, "selected_source": results[0]},
+    )
+
+
+def test_unique_terms_keeps_the_first_spelling():
+    records = [{"Term": "NDIS"}, {"Term": "ndis "}, {"Term": ""}, {"Term": "ATO"}]
+    assert unique_terms(records, lambda term: term.strip().lower()) == {"ndis": "NDIS", "ato": "ATO"}
+
+
+def test_answer_term_stores_a_parsed_answer_under_both_keys():
+    keys, payload = answer_term(fake_app(json.dumps(ANSWER)), "disability scheme", "disability scheme")
+    assert keys == ["plain:disability scheme", "elaborate:disability scheme"]
+    assert payload["served_by"] == "rag"
+    assert payload["selected_source"] == {"entity": "NDIA"}
+
+
+def test_answer_term_fails_an_unparsed_answer():
+    with pytest.raises(ValueError):
+        answer_term(fake_app("Sorry, I can't help with that."), "disability scheme", "disability scheme")
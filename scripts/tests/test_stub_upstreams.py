@@ -0,0 +1,63 @@
+import json
+import random
+
+import pytest
+
+from stub_upstreams import (
+    STUB_ANSWER, STUB_RECORDS, HttpStubIndex, HttpStubModel, LatencyDistribution, StubHTTPError, start_stub_servers,
+)
+
+
+@pytest.fixture
+def servers():
+    servers = start_stub_servers(pinecone_latency="0", gemini_latency="0")
+    yield servers
+    for server in servers.values():
+        server.stop()
+
+
+def test_latency_specs_round_trip():
+    for spec in ("fixed:0.05", "uniform:0.1,0.3", "lognormal:0.8,0.4+tail:0.02,3"):
+        assert str(LatencyDistribution.parse(spec)) == spec
+    assert str(LatencyDistribution.parse("0.05")) == "fixed:0.05"
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("uniform:0.1")
+
+
+def test_latency_samples_follow_the_distribution():
+    rng = random.Random(0)
+    uniform = LatencyDistribution.parse("uniform:0.1,0.3")
+    assert all(0.1 <= uniform.sample(rng) <= 0.3 for _ in range(200))
+    tail = LatencyDistribution.parse("fixed:0.05+tail:0.5,3")
+    samples = [tail.sample(rng) for _ in range(1000)]
+    assert set(samples) == {0.05, 3.0}
+    assert 400 < samples.count(3.0) < 600
+
+
+def test_stub_index_answers_searches(servers):
+    index = HttpStubIndex(servers["pinecone"].url)
+    hits = index.search_records("ns", {"inputs": {"text": "NDIS"}, "top_k": 2})["result"]["hits"]
+    assert [hit["fields"]["text"] for hit in hits] == [record["text"] for record in STUB_RECORDS[:2]]
+    assert index.describe_index_stats().total_vector_count >= len(STUB_RECORDS)
+    assert servers["pinecone"].service.calls >= 1
+
+
+def test_stub_model_answers_and_streams(servers):
+    model = HttpStubModel(servers["gemini"].url)
+    response = model.generate_content("What is the NDIS?")
+    assert json.loads(response.text)["definition"] == STUB_ANSWER["definition"]
+    assert response.usage_metadata.prompt_token_count > 0
+    stream = model.generate_content("What is the NDIS?", stream=True)
+    assert json.loads("".join(chunk.text for chunk in stream)) == json.loads(response.text)
+    assert stream.usage_metadata is not None
+
+
+def test_stub_injects_retryable_errors():
+    servers = start_stub_servers(pinecone_latency="0", gemini_latency="0", error_rate=1.0)
+    try:
+        with pytest.raises(StubHTTPError) as failed:
+            HttpStubIndex(servers["pinecone"].url).search_records("ns", {"inputs": {"text": "NDIS"}, "top_k": 1})
+        assert failed.value.status == 503
+    finally:
+        for server in servers.values():
+            server.stop()
@@ -0,0 +1,52 @@
+import update_pinecone
+from update_pinecone import load_manifest, prepare_records, record_id, run_batches, save_manifest
+
+ROW = {"Term": "NDIS", "Definition": "National Disability Insurance Scheme", "Entity": "NDIA"}
+
+
+def test_record_id_is_stable_and_content_based():
+    assert record_id({"a": 1, "b": 2}) == record_id({"b": 2, "a": 1})
+    assert record_id({"a": 1}) != record_id({"a": 2})
+
+
+def test_prepare_records_collapses_identical_rows_and_skips_empty_terms():
+    prepared = prepare_records([ROW, dict(ROW), {"Term": "", "Definition": "orphan"}])
+    assert len(prepared) == 1
+    (rec_id, record), = prepared.items()
+    assert record["_id"] == rec_id
+    assert record["text"] == "NDIS: National Disability Insurance Scheme"
+    assert "Term" not in record
+
+
+def test_an_edited_row_gets_a_new_id():
+    before = set(prepare_records([ROW]))
+    after = set(prepare_records([{**ROW, "Definition": "National Disability Insurance Scheme (NDIS)"}]))
+    assert before.isdisjoint(after)
+
+
+def test_manifest_round_trip(tmp_path):
+    path = tmp_path / "manifest.json"
+    assert load_manifest(path) is None
+    save_manifest(path, {"term_b", "term_a"})
+    assert load_manifest(path) == {"term_a", "term_b"}
+
+
+def test_manifest_for_another_namespace_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "manifest.json"
+    save_manifest(path, {"term_a"})
+    monkeypatch.setattr(update_pinecone, "PINECONE_NAMESPACE", "other")
+    assert load_manifest(path) is None
+
+
+def test_run_batches_returns_only_batches_that_succeeded(monkeypatch):
+    monkeypatch.setattr(update_pinecone.time, "sleep", lambda _: None)
+    attempts = {}
+
+    def upsert(batch):
+        attempts[batch[0]] = attempts.get(batch[0], 0) + 1
+        if batch[0] == "bad" or (batch[0] == "flaky" and attempts["flaky"] < 3):
+            raise ConnectionError("reset")
+
+    done = run_batches([["ok"], ["flaky"], ["bad"]], upsert, "Upsert", workers=2)
+    assert sorted(batch[0] for batch in done) == ["flaky", "ok"]
+    assert attempts == {"ok": 1, "flaky": 3, "bad": 5}
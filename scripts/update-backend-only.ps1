@@ -21,6 +21,17 @@ try {
     docker system prune -f
     docker builder prune -f
     
+    # Ship the glossary, and its snapshot and precomputed answers when built, in the image
+    Write-Host "📚 Staging glossary data into the build context..." -ForegroundColor Yellow
+    if (-not (Test-Path "./data/combined_glossary.json")) {
+        throw "data/combined_glossary.json not found; the backend image needs the glossary"
+    }
+    Remove-Item ./backend/data -Recurse -Force -ErrorAction SilentlyContinue
+    New-Item -ItemType Directory -Force ./backend/data | Out-Null
+    foreach ($file in "combined_glossary.json", "combined_glossary.snap", "answer_store.bin") {
+        if (Test-Path "./data/$file") { Copy-Item "./data/$file" ./backend/data/ }
+    }
+
     # Step 2: Build Backend (force fresh build, no cache, no layer reuse)
     Write-Host "📦 Building backend with completely fresh build (no cache, no layers)..." -ForegroundColor Yellow
     docker build --no-cache --pull --force-rm -t gov-terms-backend:latest ./backend
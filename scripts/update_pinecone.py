@@ -1,81 +1,224 @@
+#!/usr/bin/env python3
 """
-Script to update Pinecone index 'multilingual-e5-large-index' in namespace 'gov-terms' from combined_glossary.json.
+Script to update Pinecone index 'all-e5-large' in namespace 'gov-terms2' from combined_glossary.json.
 Assumes Pinecone handles embedding generation (field: 'text').
+
+Record IDs are content hashes, so a run only upserts rows that were added or
+changed since the last run and deletes rows that were removed. What is already
+indexed is tracked in a local manifest; without one, the IDs are listed from
+the namespace instead.
 """
 
-import os
+import argparse
+import hashlib
 import json
 import logging
-from pinecone import Pinecone
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
 # Config
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+REDIS_URL = os.getenv("REDIS_URL")
 PINECONE_INDEX_NAME = "all-e5-large"
 PINECONE_NAMESPACE = "gov-terms2"
-GLOSSARY_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "combined_glossary.json")
+# Must match cache.index_generation_key() in the backend
+GENERATION_KEY = f"govterms:{PINECONE_NAMESPACE}:generation"
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+GLOSSARY_PATH = DATA_DIR / "combined_glossary.json"
+MANIFEST_PATH = DATA_DIR / f"pinecone_manifest.{PINECONE_NAMESPACE}.json"
+
+BATCH_SIZE = 90  # upsert_records limit is 96 records per request
+DELETE_BATCH_SIZE = 1000
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("update_pinecone")
 
-if not PINECONE_API_KEY:
-    raise RuntimeError("PINECONE_API_KEY environment variable not set.")
-
-# Load data
-with open(GLOSSARY_PATH, encoding="utf-8") as f:
-    records = json.load(f)
-
-logger.info(f"Loaded {len(records)} records from {GLOSSARY_PATH}")
-
-# Prepare Pinecone records
-pinecone_records = []
-for i, rec in enumerate(records):
-    # Compose a unique id: term_01, term_02, ...  
-    rec_id = f"term_{i+1:02d}"
-    Term = rec.get("Term", "")
-    Definition = rec.get("Definition", "")
-    text = Term + ": " + Definition
-    Entity = rec.get("Entity", "")
-    Portfolio = rec.get("Portfolio", "")
-    BodyType = rec.get("BodyType", "")
-    Url = rec.get("Url", "")
-
-    if not text:
-        logger.warning(f"Skipping record {rec_id}: no term.")
-        continue
-    # Add all fields as metadata
-    pinecone_record = {
-        "_id": rec_id, 
-        "text": text,
-        "Definition": Defintion,
-        "Entity": Entity,
-        "Portfolio": Portfolio,
-        "BodyType": BodyType,
-        "Url": Url}
-    for k, v in rec.items():
-        if k != "Term":
-            pinecone_record[k] = v
-    pinecone_records.append(pinecone_record)
-
-logger.info(f"Prepared {len(pinecone_records)} records for Pinecone upsert.")
-
-# Upsert to Pinecone using upsert_records (recommended for serverless)
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(PINECONE_INDEX_NAME)
-
-# Insert the first record and ask for confirmation
-first_record = pinecone_records[0:1]
-logger.info(f"About to upsert the first record: {first_record[0]}")
-index.upsert_records(PINECONE_NAMESPACE, first_record)
-logger.info("First record upserted.")
-
-confirm = input("Do you want to continue upserting the remaining records in batches? (y/n): ").strip().lower()
-if confirm != 'y':
-    logger.info("Aborting batch upsert as per user request.")
-    exit(0)
-
-BATCH_SIZE = 90
-for i in range(1, len(pinecone_records), BATCH_SIZE):
-    batch = pinecone_records[i:i+BATCH_SIZE]
-    index.upsert_records(PINECONE_NAMESPACE, batch)
-    logger.info(f"Upserted records {i+1}-{min(i+BATCH_SIZE, len(pinecone_records))}")
-logger.info("Pinecone index update complete.")
+
+def record_id(record):
+    """Stable ID derived from the record's content."""
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return "term_" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+def prepare_records(records):
+    """Pinecone records keyed by content-hash ID; identical rows collapse into one."""
+    prepared = {}
+    for i, rec in enumerate(records):
+        Term = rec.get("Term", "")
+        Definition = rec.get("Definition", "")
+        if not Term:
+            logger.warning(f"Skipping row {i + 1}: no term.")
+            continue
+        # Add all fields as metadata
+        pinecone_record = {
+            "text": Term + ": " + Definition,
+            "Definition": Definition,
+            "Entity": rec.get("Entity", ""),
+            "Portfolio": rec.get("Portfolio", ""),
+            "BodyType": rec.get("BodyType", ""),
+            "Url": rec.get("Url", "")}
+        for k, v in rec.items():
+            if k != "Term":
+                pinecone_record[k] = v
+        rec_id = record_id(pinecone_record)
+        prepared[rec_id] = {"_id": rec_id, **pinecone_record}
+    return prepared
+
+
+def load_manifest(path):
+    """IDs recorded as indexed by previous runs, or None if there is no manifest."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("index") != PINECONE_INDEX_NAME or manifest.get("namespace") != PINECONE_NAMESPACE:
+        logger.warning(f"Manifest {path} is for another index or namespace; ignoring it.")
+        return None
+    return set(manifest.get("ids", []))
+
+
+def save_manifest(path, ids):
+    """Write the manifest atomically so an interrupted run leaves the previous one intact."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"index": PINECONE_INDEX_NAME, "namespace": PINECONE_NAMESPACE, "ids": sorted(ids)}, f, indent=0)
+    os.replace(tmp_path, path)
+
+
+def list_index_ids(index):
+    """All record IDs currently in the namespace."""
+    ids = set()
+    for page in index.list(namespace=PINECONE_NAMESPACE):
+        ids.update(page)
+    return ids
+
+
+def with_retries(action, description, attempts=5, base_delay=1.0):
+    """Run action(), retrying failures with exponential backoff and full jitter."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return action()
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            delay = random.uniform(0, base_delay * 2 ** (attempt - 1))
+            logger.warning(f"{description} failed (attempt {attempt}/{attempts}): {e}; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def run_batches(batches, action, description, workers):
+    """Run action(batch) concurrently; returns the batches that succeeded."""
+    done = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(with_retries, lambda b=batch: action(b), f"{description} of {len(batch)}"): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                future.result()
+                done.append(batch)
+                logger.info(f"{description}: {len(batch)} records")
+            except Exception as e:
+                logger.error(f"{description} of {len(batch)} records gave up: {e}")
+    return done
+
+
+def chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def bump_generation():
+    """Bump the index generation so backend replicas drop cached retrieval hits and responses."""
+    if REDIS_URL:
+        import redis
+        generation = redis.Redis.from_url(REDIS_URL).incr(GENERATION_KEY)
+        logger.info(f"Index generation bumped to {generation}.")
+    else:
+        logger.warning("REDIS_URL not set; call POST /admin/cache/invalidate on each backend to drop cached results.")
+
+
+def main():
+    """Main function for command-line usage."""
+    parser = argparse.ArgumentParser(description="Sync the glossary into the Pinecone namespace")
+    parser.add_argument('--input', '-i', default=str(GLOSSARY_PATH), help='Glossary JSON')
+    parser.add_argument('--manifest', default=str(MANIFEST_PATH), help='Manifest of indexed record IDs')
+    parser.add_argument('--from-index', action='store_true',
+                        help='Ignore the manifest and list the IDs already in the namespace')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent upsert/delete requests')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Records per upsert request')
+    parser.add_argument('--dry-run', action='store_true', help='Report the changes without applying them')
+    parser.add_argument('--yes', '-y', action='store_true',
+                        help='Apply without asking for confirmation (implied when stdin is not a terminal)')
+    args = parser.parse_args()
+
+    if not PINECONE_API_KEY:
+        raise RuntimeError("PINECONE_API_KEY environment variable not set.")
+
+    # Load data
+    with open(args.input, encoding="utf-8") as f:
+        records = json.load(f)
+    logger.info(f"Loaded {len(records)} records from {args.input}")
+
+    prepared = prepare_records(records)
+    logger.info(f"Prepared {len(prepared)} unique records for Pinecone.")
+
+    from pinecone import Pinecone
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+    index = pc.Index(PINECONE_INDEX_NAME)
+
+    indexed = None if args.from_index else load_manifest(args.manifest)
+    if indexed is None:
+        logger.info(f"Listing record IDs in namespace '{PINECONE_NAMESPACE}'")
+        indexed = list_index_ids(index)
+
+    to_upsert = [prepared[rec_id] for rec_id in sorted(prepared.keys() - indexed)]
+    to_delete = sorted(indexed - prepared.keys())
+    logger.info(f"{len(to_upsert)} records to upsert, {len(to_delete)} to delete, "
+                f"{len(prepared) - len(to_upsert)} unchanged.")
+
+    if not to_upsert and not to_delete:
+        save_manifest(args.manifest, indexed)
+        logger.info("Pinecone index is up to date.")
+        return
+    if args.dry_run:
+        return
+    if not args.yes and sys.stdin.isatty():
+        confirm = input("Apply these changes? (y/n): ").strip().lower()
+        if confirm != 'y':
+            logger.info("Aborting update as per user request.")
+            return
+
+    # Upsert to Pinecone using upsert_records (recommended for serverless)
+    upserted = run_batches(
+        chunks(to_upsert, args.batch_size),
+        lambda batch: index.upsert_records(PINECONE_NAMESPACE, batch),
+        "Upserted", args.workers)
+    for batch in upserted:
+        indexed.update(rec["_id"] for rec in batch)
+    save_manifest(args.manifest, indexed)
+
+    deleted = run_batches(
+        chunks(to_delete, DELETE_BATCH_SIZE),
+        lambda batch: index.delete(ids=batch, namespace=PINECONE_NAMESPACE),
+        "Deleted", args.workers)
+    for batch in deleted:
+        indexed.difference_update(batch)
+    save_manifest(args.manifest, indexed)
+
+    failed = (len(to_upsert) - sum(map(len, upserted))) + (len(to_delete) - sum(map(len, deleted)))
+    if upserted or deleted:
+        bump_generation()
+    if failed:
+        logger.error(f"{failed} records were not synced; rerun to retry them.")
+        sys.exit(1)
+    logger.info("Pinecone index update complete.")
+
+
+if __name__ == "__main__":
+    main()